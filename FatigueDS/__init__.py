@@ -4,5 +4,16 @@ A project template for the sdPy effort..
 
 __version__ = "0.1.0"
 from .spec_dev import SpecificationDevelopment
+from .filter_bank import FilterBank
+from .integral_table import IntegralTable
+from .prefetch import Prefetcher
+from .statistics import SpectrumStatistics
+from .monte_carlo import monte_carlo
 from . import tools
-from . import signals
\ No newline at end of file
+from . import backends
+from . import compute
+from . import jobs
+from . import signals
+from . import work_units
+from . import planner
+from . import plotting
\ No newline at end of file
@@ -0,0 +1,317 @@
+"""
+Registry of compute backends for the hot kernels of the package.
+
+Every kernel has a reference NumPy/SciPy implementation (backend ``'numpy'``, defined in `tools`) and can have accelerated
+implementations. The kernels are:
+
+- ``sdof_turning_points(time_data, dt, f_0, damp, dtype=np.float64, interpolate_peak=False, scale=1, offset=0)``: turning points of the relative 
+  displacement response to ``scale * time_data + offset`` (``time_data`` can be raw integer counts or a memmap, which must not be copied in full),
+- ``rainflow_damage(z, k)``: rainflow damage sum of a signal,
+- ``rainflow_residue(z, k)``: four-point rainflow damage sum of the closed cycles, their number and the residue of a part of a signal,
+- ``integrals_b(h, b, damp)``: integrals I_b of the PSD method (backend ``'table'``: interpolation of the integrals,
+  tabulated once per damping ratio, see `integral_table.IntegralTable`; never selected automatically),
+- ``sweep_integral(h, M_h, a, k, Q)``: sine sweep damage integral.
+
+By default, the available backend with the highest priority is used for each kernel (``'numba'`` if Numba is installed).
+The selection can be overridden with `set_backend`.
+"""
+import math
+
+import numpy as np
+
+from . import tools
+from .integral_table import IntegralTable
+
+_registry = {}
+_override = {}
+
+
+def register(kernel, name, priority=0):
+    """
+    Decorator for registering the function as the ``name`` backend of ``kernel``. Backends with higher ``priority`` are preferred.
+
+    :param kernel: kernel name
+    :param name: backend name
+    :param priority: priority of automatic selection (default: 0)
+    """
+    def decorator(function):
+        _registry.setdefault(kernel, {})[name] = (priority, function)
+        return function
+    return decorator
+
+
+def available(kernel):
+    """
+    Returns the names of the backends of ``kernel``, ordered by decreasing priority.
+    """
+    backends = _registry[kernel]
+    return sorted(backends, key=lambda name: -backends[name][0])
+
+
+def set_backend(name=None, kernel=None):
+    """
+    Override the automatic backend selection.
+
+    :param name: backend name. If None, automatic selection is restored (default: None)
+    :param kernel: kernel name. If None, the override applies to all kernels that implement the backend ``name`` (default: None)
+    """
+    kernels = [kernel] if kernel is not None else list(_registry)
+    if name is not None and kernel is not None and name not in _registry[kernel]:
+        raise ValueError(f"Backend ``{name}`` is not available for kernel ``{kernel}``. Available backends: {available(kernel)}")
+
+    for k in kernels:
+        if name is None:
+            _override.pop(k, None)
+        elif name in _registry[k]:
+            _override[k] = name
+
+
+def selected(kernel):
+    """
+    Returns the name of the backend used for ``kernel``: the override set with `set_backend` or the available backend 
+    with the highest priority.
+    """
+    return _override.get(kernel) or available(kernel)[0]
+
+
+def get(kernel, backend=None):
+    """
+    Returns the implementation of ``kernel``: the requested ``backend`` or the selected backend (see `selected`).
+    """
+    return _registry[kernel][backend or selected(kernel)][1]
+
+
+# Reference implementations
+
+@register('sdof_turning_points', 'numpy')
+def _sdof_turning_points_numpy(time_data, dt, f_0, damp, dtype=np.float64, interpolate_peak=False, scale=1, offset=0):
+    return tools.sdof_turning_points(time_data, dt, f_0, damp, dtype=dtype, interpolate_peak=interpolate_peak, scale=scale, offset=offset)
+
+
+@register('rainflow_damage', 'numpy')
+def _rainflow_damage_numpy(z, k):
+    return tools.rainflow_damage(z, k)
+
+
+@register('rainflow_residue', 'numpy')
+def _rainflow_residue_numpy(z, k):
+    return tools.rainflow_residue(z, k)
+
+
+@register('integrals_b', 'numpy')
+def _integrals_b_numpy(h, b, damp):
+    return tools.integrals_b(h, b, damp)
+
+
+@register('integrals_b', 'table', priority=-10)
+def _integrals_b_table(h, b, damp):
+    return IntegralTable.cached(damp)(h, b)
+
+
+@register('sweep_integral', 'numpy')
+def _sweep_integral_numpy(h, M_h, a, k, Q):
+    return tools.sweep_integral(h, M_h, a, k, Q)
+
+
+# Numba implementations (optional)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _sdof_turning_points_kernel(x, b1, a1, a2, interpolate_peak, scale, offset):
+        # recursive filter (see `tools.sdof_filter_coefficients`), fused with scaling of the raw signal and turning point detection
+        n = len(x)
+        tp = np.empty(min(n, 1024 + n // 8))
+        n_tp = 1
+        tp[0] = 0.0  # response starts at rest
+
+        z_1 = 0.0  # z[i-1]
+        z_2 = 0.0  # z[i-2]
+        last = 0.0  # last distinct value
+        direction = 0.0
+
+        i_max = 0
+        z_max = 0.0
+        z_max_prev = 0.0
+        z_max_next = 0.0
+
+        for i in range(1, n):
+            z = b1 * (x[i - 1] * scale + offset) - a1 * z_1 - a2 * z_2
+            z_2 = z_1
+            z_1 = z
+
+            if i == i_max + 1:
+                z_max_next = z
+            if z > z_max:
+                i_max = i
+                z_max = z
+                z_max_prev = z_2
+
+            if z != last:
+                new_direction = 1.0 if z > last else -1.0
+                if direction != 0.0 and new_direction != direction:
+                    if n_tp == len(tp):
+                        grown = np.empty(2 * len(tp))
+                        grown[:n_tp] = tp[:n_tp]
+                        tp = grown
+                    tp[n_tp] = last
+                    n_tp += 1
+                direction = new_direction
+                last = z
+
+        if n_tp == len(tp):
+            grown = np.empty(n_tp + 1)
+            grown[:n_tp] = tp[:n_tp]
+            tp = grown
+        tp[n_tp] = z_1
+        n_tp += 1
+        tp = tp[:n_tp].copy()
+
+        if interpolate_peak and 0 < i_max < n - 1:
+            curvature = z_max_prev - 2 * z_max + z_max_next
+            if curvature != 0.0:
+                tp[np.argmax(tp)] = z_max - (z_max_prev - z_max_next)**2 / (8 * curvature)
+
+        return tp
+
+    @register('sdof_turning_points', 'numba', priority=10)
+    def _sdof_turning_points_numba(time_data, dt, f_0, damp, dtype=np.float64, interpolate_peak=False, scale=1, offset=0):
+        if len(time_data) < 3:
+            return tools.sdof_turning_points(time_data, dt, f_0, damp, dtype=dtype, interpolate_peak=interpolate_peak, scale=scale, offset=offset)
+        b, a = tools.sdof_filter_coefficients(f_0, dt, damp)
+        # the kernel is compiled for the data type of the raw signal, which is converted sample by sample
+        tp = _sdof_turning_points_kernel(np.asarray(time_data), b[1], a[1], a[2], interpolate_peak, float(scale), float(offset))
+        return tp.astype(dtype, copy=False)
+
+    @numba.njit(cache=True)
+    def _rainflow_damage_kernel(z, k):
+        # ASTM E1049 three-point rainflow counting, as in the ``rainflow`` package
+        n = len(z)
+        points = np.empty(n)
+        lo = 0
+        hi = 0
+        damage = 0.0
+
+        for j in range(n + 1):
+            # reversals of the signal (first and last points included)
+            if j == 0:
+                if n < 2:
+                    break
+                point = z[0]
+                x_last = z[0]
+                x = z[1]
+                d_last = x - x_last
+            elif j < n - 1:
+                x_next = z[j + 1]
+                if x_next == x:
+                    continue
+                d_next = x_next - x
+                if d_last * d_next >= 0:
+                    x_last = x
+                    x = x_next
+                    d_last = d_next
+                    continue
+                point = x
+                x_last = x
+                x = x_next
+                d_last = d_next
+            elif j == n - 1 and n > 2:
+                point = z[n - 1]
+            else:
+                break
+
+            points[hi] = point
+            hi += 1
+            while hi - lo >= 3:
+                X = abs(points[hi - 1] - points[hi - 2])
+                Y = abs(points[hi - 2] - points[hi - 3])
+                if X < Y:
+                    break
+                elif hi - lo == 3:
+                    damage += 0.5 * 2 * (Y / 2)**k
+                    lo += 1
+                else:
+                    damage += 1.0 * 2 * (Y / 2)**k
+                    last = points[hi - 1]
+                    hi -= 3
+                    points[hi] = last
+                    hi += 1
+
+        while hi - lo > 1:
+            damage += 0.5 * 2 * (abs(points[lo] - points[lo + 1]) / 2)**k
+            lo += 1
+
+        return damage
+
+    @register('rainflow_damage', 'numba', priority=10)
+    def _rainflow_damage_numba(z, k):
+        return _rainflow_damage_kernel(np.asarray(z, dtype=np.float64), float(k))
+
+    @numba.njit(cache=True)
+    def _rainflow_residue_kernel(z, k):
+        residue = np.empty(len(z))
+        n = 0
+        damage = 0.0
+        n_cycles = 0
+        for x in z:
+            residue[n] = x
+            n += 1
+            while n >= 4:
+                s = abs(residue[n - 2] - residue[n - 3])
+                if s > abs(residue[n - 3] - residue[n - 4]) or s > abs(residue[n - 1] - residue[n - 2]):
+                    break
+                damage += 2 * (s / 2)**k
+                n_cycles += 1
+                residue[n - 3] = residue[n - 1]
+                n -= 2
+        return damage, n_cycles, residue[:n].copy()
+
+    @register('rainflow_residue', 'numba', priority=10)
+    def _rainflow_residue_numba(z, k):
+        return _rainflow_residue_kernel(np.asarray(z, dtype=np.float64), float(k))
+
+    @numba.vectorize(['float64(float64, int64, float64)'], cache=True)
+    def _integrals_b_kernel(h, b, damp):
+        alpha = 2 * math.sqrt(1 - damp**2)
+        beta = 2 * (1 - 2 * damp**2)
+        C0 = damp / (math.pi * alpha)
+        log_C1 = math.log((h**2 + alpha * h + 1) / (h**2 - alpha * h + 1))
+        C5 = math.atan((2 * h + alpha) / (2 * damp)) + math.atan((2 * h - alpha) / (2 * damp))
+        I0 = C0 * log_C1 + C5 / math.pi
+        I2 = -C0 * log_C1 + C5 / math.pi
+        if b == 0:
+            return I0
+        elif b == 1:
+            C6 = damp * alpha
+            return 2 / (math.pi * alpha) * (math.atan((h**2 - beta / 2) / C6) + math.atan(beta / 2 / C6))
+        elif b == 2:
+            return I2
+        else:
+            return 4 * damp / math.pi * h + beta * I2 - I0
+
+    @register('integrals_b', 'numba', priority=10)
+    def _integrals_b_numba(h, b, damp):
+        if b not in [0, 1, 2, 4]:
+            raise ValueError(f"Invalid exponent ``b``='{b}'. Supported exponents: 0, 1, 2 and 4.")
+        return _integrals_b_kernel(np.asarray(h, dtype=np.float64), b, float(damp))
+
+    @numba.njit(cache=True)
+    def _sweep_integral_kernel(h, M_h, exponent, k, Q):
+        integral = 0.0
+        y_last = 0.0
+        for i in range(len(h)):
+            h_i = float(h[i])
+            y = M_h[i] * h_i**exponent / ((1 - h_i**2)**2 + (h_i / Q)**2)**(k / 2)
+            if i > 0:
+                integral += (h_i - h[i - 1]) * (y + y_last) / 2
+            y_last = y
+        return integral
+
+    @register('sweep_integral', 'numba', priority=10)
+    def _sweep_integral_numba(h, M_h, a, k, Q):
+        return _sweep_integral_kernel(h, M_h, float(a * k - 1), float(k), float(Q))
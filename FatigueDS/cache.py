@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of SDOF responses, bounded by the total size of the stored arrays.
+
+    Entries are numpy arrays (turning points of the relative displacement response), keyed by
+    ``(load identity, f0, damp)``. When adding an entry exceeds ``max_bytes``, the least
+    recently used entries are evicted. The cache can be shared between threads.
+    """
+
+    def __init__(self, max_bytes=256 * 1024**2):
+        """
+        :param max_bytes: memory budget of the cache [bytes]. Use 0 to disable caching.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        """
+        Return the cached array for ``key`` (or None) and mark it as recently used.
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store ``value`` under ``key``, evicting least recently used entries to stay within ``max_bytes``.
+        Arrays larger than the whole budget are not stored.
+
+        :return: True if the value was stored
+        """
+        if value.nbytes > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data.pop(key).nbytes
+            self._data[key] = value
+            self.nbytes += value.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return True
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
@@ -0,0 +1,307 @@
+"""
+Command line tool for calculating the ERS and FDS of a directory of recordings.
+
+Example::
+
+    fatigueds recordings/*.npy --fs 5120 --f0 10 2000 5 --Q 10 --k 5 --unit g -o spectra
+
+Every input file is processed in a pool of worker processes and its spectra are written to ``<output>/<name>.npz``
+(``f0_range``, ``ers``, ``fds`` and the ``settings`` they were calculated with). Files with an existing output calculated
+with the same settings (see `SPECTRUM_OPTIONS`) are skipped, so an interrupted run can be resumed. The aggregated spectra of all files (envelope, sum, mean, see `SpectrumStatistics`)
+are written to ``<output>/envelope.npz``.
+
+Inputs:
+
+- ``.npy`` time histories (1D arrays, memory-mapped) with sampling frequency ``--fs``,
+- ``.bin``/``.raw`` raw time histories of type ``--raw-dtype``, converted with ``--scale`` and ``--offset``,
+- ``.npy`` PSDs with ``--signal psd`` (2D arrays with frequency and PSD columns) and duration ``--T``.
+
+Options can also be given in a JSON file (``--config``), with the option names as keys (e.g. ``{"f0": [10, 2000, 5], "k": 5}``);
+command line options override the file.
+
+With ``--workers 1``, ``--prefetch N`` reads up to ``N`` files into memory in a background thread while the current file is
+processed (see `prefetch.Prefetcher`).
+"""
+import os
+import sys
+import glob
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from .spec_dev import SpecificationDevelopment
+from .compute import SPECTRAL_METHODS
+from .statistics import SpectrumStatistics
+from .prefetch import Prefetcher, read_array
+
+TIME_EXTENSIONS = ['.npy', '.bin', '.raw']
+
+# options that determine the spectra of a file; outputs calculated with other values are not reused
+SPECTRUM_OPTIONS = ['signal', 'fs', 'T', 'unit', 'raw_dtype', 'scale', 'offset', 'f0', 'damp', 'Q', 'k', 'C', 'p', 'method', 'bins',
+                    'multirate', 'repeat', 'spectral_method']
+
+
+def get_parser():
+    """
+    Returns the argument parser of the command line tool.
+    """
+    parser = argparse.ArgumentParser(prog='fatigueds', description='Calculate the ERS and FDS of recorded time histories or PSDs.')
+    parser.add_argument('inputs', nargs='+', help='input files, directories or glob patterns')
+    parser.add_argument('-o', '--output', required=True, help='output directory')
+    parser.add_argument('--config', help='JSON file with options')
+
+    parser.add_argument('--signal', choices=['time', 'psd'], default='time', help='type of the input files (default: time)')
+    parser.add_argument('--fs', type=float, help='sampling frequency of time histories [Hz]')
+    parser.add_argument('--T', type=float, help='duration of PSD loads [s]')
+    parser.add_argument('--unit', choices=['ms2', 'g'], default='ms2', help='unit of the signal (default: ms2)')
+    parser.add_argument('--raw-dtype', default='int16', help='data type of raw (.bin/.raw) files (default: int16)')
+    parser.add_argument('--scale', type=float, default=1, help='calibration factor of raw (.bin/.raw) files (default: 1)')
+    parser.add_argument('--offset', type=float, default=0, help='offset of raw (.bin/.raw) files (default: 0)')
+
+    parser.add_argument('--f0', type=float, nargs=3, default=[10, 2000, 5], metavar=('START', 'STOP', 'STEP'), help='natural frequencies [Hz] (default: 10 2000 5)')
+    parser.add_argument('--damp', type=float, help='damping ratio')
+    parser.add_argument('--Q', type=float, default=10, help='damping Q-factor, used if --damp is not given (default: 10)')
+    parser.add_argument('--k', type=float, help='S-N curve slope; if not given, only the ERS is calculated')
+    parser.add_argument('--C', type=float, default=1, help='material constant (default: 1)')
+    parser.add_argument('--p', type=float, default=1, help='constant of proportionality between stress and deformation (default: 1)')
+    parser.add_argument('--method', choices=['convolution', 'psd_averaging', 'segmented'], default='convolution', help='method for time histories (default: convolution)')
+    parser.add_argument('--bins', type=int, help='number of bins of the psd_averaging and segmented methods')
+    parser.add_argument('--multirate', action='store_true', help='use the multirate scheme for time histories')
+    parser.add_argument('--repeat', type=int, default=1, help='number of repetitions of the time histories (default: 1)')
+    parser.add_argument('--spectral-method', choices=SPECTRAL_METHODS, default='narrowband', help='damage estimator of PSD-based FDS (default: narrowband)')
+
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--prefetch', type=int, default=0, help='number of files read ahead in a background thread with --workers 1 (default: 0)')
+    parser.add_argument('--cache-size', type=float, default=64, help='response cache of each worker [MB] (default: 64)')
+    return parser
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line arguments; options from the ``--config`` file are used as defaults.
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.config is not None:
+        with open(args.config) as f:
+            config = json.load(f)
+        unknown = set(config) - {action.dest for action in parser._actions}
+        if unknown:
+            parser.error(f'unknown options in {args.config}: {", ".join(sorted(unknown))}')
+        # convert and check the values as if they were given on the command line
+        for action in parser._actions:
+            if action.dest not in config or config[action.dest] is None:
+                continue
+            value = config[action.dest]
+            if action.type is not None:
+                value = [action.type(v) for v in value] if isinstance(value, list) else action.type(value)
+            if action.choices is not None and value not in action.choices:
+                parser.error(f'invalid value of {action.dest} in {args.config}: {value!r}')
+            config[action.dest] = value
+        parser.set_defaults(**config)
+        args = parser.parse_args(argv)
+
+    if args.signal == 'time' and args.fs is None:
+        parser.error('--fs is required for time histories')
+    if args.signal == 'psd' and args.T is None:
+        parser.error('--T is required for PSD loads')
+    return args
+
+
+def find_files(inputs, signal='time'):
+    """
+    Returns the sorted list of input files, given as files, directories or glob patterns.
+    """
+    extensions = TIME_EXTENSIONS if signal == 'time' else ['.npy']
+    files = set()
+    for pattern in inputs:
+        for path in glob.glob(pattern) or [pattern]:
+            if os.path.isdir(path):
+                files.update(os.path.join(path, name) for name in os.listdir(path) if os.path.splitext(name)[1] in extensions)
+            elif os.path.isfile(path):
+                files.add(path)
+            else:
+                raise FileNotFoundError(f'Input not found: {pattern}')
+    return sorted(files)
+
+
+def output_path(output, filename):
+    """
+    Returns the path of the per-file output of the input ``filename``.
+    """
+    return os.path.join(output, os.path.splitext(os.path.basename(filename))[0] + '.npz')
+
+
+def read_input(filename, config, in_memory=False):
+    """
+    Returns the data of one input file. Time histories are memory-mapped, or read into memory if ``in_memory`` is True
+    (used by the prefetching of the sequential mode, see `prefetch.Prefetcher`).
+
+    :param filename: input file
+    :param config: dictionary of options (see `get_parser`)
+    :param in_memory: read time histories into memory instead of memory-mapping them
+
+    :return: PSD array (frequency and PSD columns) or time history array
+    """
+    if config['signal'] == 'psd':
+        return np.load(filename)
+    dtype = None if os.path.splitext(filename)[1] == '.npy' else config['raw_dtype']
+    if in_memory:
+        return read_array(filename, dtype=dtype)
+    if dtype is None:
+        return np.load(filename, mmap_mode='r')
+    return np.memmap(filename, dtype=dtype, mode='r')
+
+
+def process_data(filename, data, config):
+    """
+    Calculate the ERS and FDS of the data of one input file.
+
+    :param filename: input file (the extension determines the conversion of raw time histories)
+    :param data: data of the file (see `read_input`)
+    :param config: dictionary of options (see `get_parser`)
+
+    :return: ERS, FDS (None if ``k`` is not given)
+    """
+    sd = SpecificationDevelopment(freq_data=tuple(config['f0']), damp=config['damp'], Q=config['Q'],
+                                  cache_size=int(config['cache_size'] * 1024**2), progress_bar=False)
+
+    if config['signal'] == 'psd':
+        sd.set_random_load((data[:, 1], data[:, 0]), T=config['T'], unit=config['unit'])
+    else:
+        if os.path.splitext(filename)[1] == '.npy':
+            scale, offset = 1, 0
+        else:
+            scale, offset = config['scale'], config['offset']
+        sd.set_random_load((data, 1 / config['fs']), unit=config['unit'], method=config['method'], bins=config['bins'],
+                           multirate=config['multirate'], scale=scale, offset=offset, repeat=config['repeat'])
+
+    sd.get_ers()
+    fds = None
+    if config['k'] is not None:
+        sd.get_fds(k=config['k'], C=config['C'], p=config['p'], spectral_method=config['spectral_method'])
+        fds = sd.fds
+    return sd.f0_range, sd.ers, fds
+
+
+def process_file(filename, config):
+    """
+    Calculate the ERS and FDS of one input file (executed in a worker process). Time histories are memory-mapped, so the
+    memory of a worker is bounded by the SDOF responses and the response cache, not by the file size.
+
+    :param filename: input file
+    :param config: dictionary of options (see `get_parser`)
+
+    :return: ERS, FDS (None if ``k`` is not given)
+    """
+    return process_data(filename, read_input(filename, config), config)
+
+
+def spectrum_settings(config):
+    """
+    Returns the options that determine the spectra of a file (see `SPECTRUM_OPTIONS`) as a JSON string.
+    """
+    return json.dumps({name: config[name] for name in SPECTRUM_OPTIONS}, sort_keys=True)
+
+
+def save_spectra(path, f0_range, ers, fds, settings):
+    """
+    Write the spectra and the ``settings`` they were calculated with (see `spectrum_settings`) to ``path`` atomically, so
+    an interrupted run never leaves an incomplete output.
+    """
+    spectra = dict(f0_range=f0_range, ers=ers, settings=settings)
+    if fds is not None:
+        spectra['fds'] = fds
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **spectra)
+    os.replace(tmp_path, path)
+
+
+def load_spectra(path, f0_range, with_fds, settings):
+    """
+    Returns the ERS and FDS of an existing output, or None if it does not exist or was calculated with other settings.
+    """
+    if not os.path.isfile(path):
+        return None
+    with np.load(path) as data:
+        if 'settings' not in data or data['settings'].item() != settings:
+            return None
+        if not np.array_equal(data['f0_range'], f0_range) or (with_fds and 'fds' not in data):
+            return None
+        return data['ers'], data['fds'] if with_fds else None
+
+
+def main(argv=None):
+    """
+    Entry point of the ``fatigueds`` command.
+    """
+    args = parse_args(argv)
+    config = vars(args)
+    files = find_files(args.inputs, args.signal)
+    os.makedirs(args.output, exist_ok=True)
+
+    f0_range = SpecificationDevelopment(freq_data=tuple(args.f0), progress_bar=False).f0_range
+    with_fds = args.k is not None
+    settings = spectrum_settings(config)
+    statistics = {'ERS': SpectrumStatistics(len(f0_range)), 'FDS': SpectrumStatistics(len(f0_range)) if with_fds else None}
+
+    def collect(ers, fds):
+        statistics['ERS'].update(ers)
+        if with_fds:
+            statistics['FDS'].update(fds)
+
+    pending_files = []
+    for filename in files:
+        spectra = load_spectra(output_path(args.output, filename), f0_range, with_fds, settings)
+        if spectra is None:
+            pending_files.append(filename)
+        else:
+            collect(*spectra)
+    print(f'{len(files)} files, {len(files) - len(pending_files)} already processed', file=sys.stderr)
+
+    def finish(filename, result):
+        _, ers, fds = result
+        save_spectra(output_path(args.output, filename), f0_range, ers, fds, settings)
+        collect(ers, fds)
+        print(f'Processed {filename}', file=sys.stderr)
+
+    if args.workers == 1 and args.prefetch > 0:
+        with Prefetcher(pending_files, lambda filename: read_input(filename, config, in_memory=True), depth=args.prefetch) as records:
+            for filename, data in records:
+                finish(filename, process_data(filename, data, config))
+        print(f'Prefetch: {records.overlap:.0%} of {records.read_time:.1f} s reading overlapped, waited {records.wait_time:.1f} s',
+              file=sys.stderr)
+    elif args.workers == 1:
+        for filename in pending_files:
+            finish(filename, process_file(filename, config))
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            queue = iter(pending_files)
+            pending = {}
+            while True:
+                # bounded number of files in flight
+                for filename in queue:
+                    pending[executor.submit(process_file, filename, config)] = filename
+                    if len(pending) >= 2 * args.workers:
+                        break
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(pending.pop(future), future.result())
+
+    if statistics['ERS'].count > 0:
+        envelope = dict(f0_range=f0_range, count=statistics['ERS'].count, ers_max=statistics['ERS'].max, ers_min=statistics['ERS'].min,
+                        ers_mean=statistics['ERS'].mean)
+        if with_fds:
+            envelope.update(fds_max=statistics['FDS'].max, fds_sum=statistics['FDS'].sum, fds_mean=statistics['FDS'].mean)
+        np.savez(os.path.join(args.output, 'envelope.npz'), **envelope)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
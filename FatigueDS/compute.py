@@ -0,0 +1,318 @@
+"""
+Stateless calculation of the ERS and FDS.
+
+A load is described by an immutable `Load` object (created with `sine_load`, `sine_sweep_load` or `random_load`) and the
+spectra are calculated with `ers` and `fds`, which take the natural frequencies, damping and material parameters as
+arguments and return the spectrum. Nothing is written to the load, so one load can be shared by many threads (e.g. a
+thread pool of a service) without copying. `SpecificationDevelopment` is a thin wrapper over these functions.
+"""
+import itertools
+import threading
+
+import numpy as np
+
+from . import tools
+from . import signals
+from .cache import ResponseCache
+
+# unique identity of every random time load, used as part of the response cache key
+_load_counter = itertools.count()
+
+SPECTRAL_METHODS = ['narrowband', 'dirlik', 'tovo_benasciutti', 'zhao_baker']
+
+SRS_TYPES = signals.SRS_TYPES
+
+
+class Load:
+    """
+    Immutable description of a load: signal type, signal parameters and unit scale.
+
+    Arrays are stored as read-only views, without copying; the arrays passed to the constructor functions must not be
+    modified afterwards. Random time loads additionally hold the decimated copies of the time history used by the
+    multirate scheme (see `tools.decimated_load`), which are created on demand under a lock, and the averaged PSDs of the
+    ``psd_averaging`` method (see `tools.psd_averaging`).
+    """
+
+    def __init__(self, signal_type, unit_scale, **parameters):
+        """
+        :param signal_type: 'sine', 'sine_sweep', 'random_psd', 'random_time' or 'shock'
+        :param unit_scale: scale of the signal to SI units (9.81 for 'g', 1 for 'ms2')
+        :param parameters: signal parameters
+        """
+        for name, value in parameters.items():
+            if isinstance(value, np.ndarray):
+                value = value.view()
+                value.flags.writeable = False
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, 'signal_type', signal_type)
+        object.__setattr__(self, 'unit_scale', unit_scale)
+
+        if signal_type == 'random_time':
+            object.__setattr__(self, '_load_id', next(_load_counter))
+            object.__setattr__(self, '_decimated_data', {1: self.time_data})
+            object.__setattr__(self, '_lock', threading.Lock())
+            object.__setattr__(self, '_psd_cache', {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Load is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Load is immutable')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if '_lock' in state:
+            # decimated copies are recreated on demand in the new process
+            del state['_lock']
+            state['_decimated_data'] = {1: self.time_data}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'time_data' in state:
+            object.__setattr__(self, '_load_id', next(_load_counter))
+            object.__setattr__(self, '_lock', threading.Lock())
+
+
+class _Context:
+    """
+    Internal read-only view of a load together with the calculation parameters, passed to the `signals` functions.
+    """
+
+    def __init__(self, load, **parameters):
+        self.__dict__.update(parameters)
+        self._load = load
+
+    def __getattr__(self, name):
+        return getattr(self._load, name)
+
+
+def _unit_scale(unit):
+    """
+    Internal function for converting the unit of the signal to the scale to SI units.
+    """
+    if unit == 'g':
+        return 9.81
+    elif unit == 'ms2':
+        return 1
+    else:
+        raise ValueError("Invalid unit selected. Supported units: 'g' and 'ms2'.")
+
+
+def _excitation_exponent(exc_type):
+    """
+    Internal function for converting the excitation type to the exponent ``a`` of the excitation frequency.
+    """
+    if exc_type == 'acc':
+        return 0
+    elif exc_type == 'vel':
+        return 1
+    elif exc_type == 'disp':
+        return 2
+    else:
+        raise ValueError(f"Invalid excitation type. Supported types: ``acc``, ``vel`` and ``disp``.")
+
+
+def sine_load(sine_freq=None, amp=None, t_total=None, exc_type='acc', unit='ms2'):
+    """
+    Sine signal load, see `SpecificationDevelopment.set_sine_load`.
+
+    :return: `Load` object
+    """
+    if not all([sine_freq, amp, exc_type]):
+        raise ValueError('Missing parameter(s). ``sine_freq`` and ``amp`` must be provided')
+
+    parameters = dict(sine_freq=sine_freq, amp=amp, exc_type=exc_type)
+    if isinstance(t_total, (int, float)):
+        parameters['t_total'] = t_total
+
+    a = _excitation_exponent(exc_type)
+    return Load('sine', _unit_scale(unit), a=a, **parameters)
+
+
+def sine_sweep_load(const_amp=None, const_f_range=None, exc_type='acc', dt=1, sweep_type=None, sweep_rate=None, unit='ms2'):
+    """
+    Sine sweep signal load, see `SpecificationDevelopment.set_sine_sweep_load`.
+
+    :return: `Load` object
+    """
+    if None in [const_amp, const_f_range, exc_type, dt, sweep_type, sweep_rate]:
+        raise ValueError('Missing parameter(s). ``const_amp``, ``const_f_range``, ``sweep_type`` and ``sweep_rate`` must be provided')
+
+    a = _excitation_exponent(exc_type)
+    return Load('sine_sweep', _unit_scale(unit), const_amp=const_amp, const_f_range=const_f_range, sweep_type=sweep_type,
+                sweep_rate=sweep_rate, exc_type=exc_type, dt=dt, a=a)
+
+
+def random_load(signal_data=None, T=None, unit='ms2', method='convolution', bins=None, multirate=False, window='boxcar', overlap=0.5, scale=1, offset=0,
+                repeat=1):
+    """
+    Random signal load, defined by time history or PSD, see `SpecificationDevelopment.set_random_load`.
+
+    :return: `Load` object
+    """
+    if not (isinstance(signal_data, tuple) and len(signal_data) == 2):
+        raise ValueError('Invalid input. Expected a tuple containing (time history data, fs) or (psd data, frequency vector)')
+    unit_scale = _unit_scale(unit)
+
+    # If input is time signal
+    if isinstance(signal_data[0], np.ndarray) and isinstance(signal_data[1], (int, float)):
+        time_data, dt = signal_data
+        if not (np.issubdtype(time_data.dtype, np.integer) or np.issubdtype(time_data.dtype, np.floating)):
+            raise ValueError('Time history data must be an integer or floating point array')
+        if not all(isinstance(attr, (int, float)) for attr in [scale, offset]):
+            raise ValueError('``scale`` and ``offset`` must be numbers')
+
+        if method not in ['convolution', 'psd_averaging', 'segmented']:
+            raise ValueError('Invalid method. Supported methods: ``convolution``, ``psd_averaging`` and ``segmented``')
+
+        if not 0 <= overlap < 1:
+            raise ValueError('``overlap`` must be in the range [0, 1)')
+
+        if not (isinstance(repeat, (int, np.integer)) and repeat >= 1):
+            raise ValueError('Number of repetitions ``repeat`` must be a positive integer')
+        if repeat > 1 and multirate:
+            raise ValueError('Repetitions of the time history are not supported with the multirate scheme')
+
+        parameters = dict(time_data=time_data, dt=dt, method=method, multirate=multirate, window=window, overlap=overlap, 
+                          scale=scale, offset=offset, repeat=int(repeat), T=len(time_data) * dt * repeat)
+        if isinstance(bins, int):
+            parameters['bins'] = bins
+        if isinstance(T, (int, float)):
+            print('Time duration ``T`` is not needed for random time signal')
+        return Load('random_time', unit_scale, **parameters)
+
+    # If input is PSD
+    elif isinstance(signal_data[0], np.ndarray) and isinstance(signal_data[1], np.ndarray):
+        if not isinstance(T, (int, float)):
+            raise ValueError('Time duration ``T`` must be provided')
+        return Load('random_psd', unit_scale, psd_data=signal_data[0], psd_freq=signal_data[1], T=T)
+
+    else:
+        raise ValueError('Invalid input. Expected a tuple containing (time history data, fs) or (psd data, frequency vector)')
+
+
+def shock_load(shock_data=None, dt=None, unit='ms2'):
+    """
+    Shock load: a set of equal-length transient events, see `SpecificationDevelopment.set_shock_load`.
+
+    :return: `Load` object
+    """
+    if not isinstance(shock_data, np.ndarray) or shock_data.ndim not in [1, 2]:
+        raise ValueError('``shock_data`` must be a 1D array (one event) or a 2D array of shape (n_events, n_samples)')
+    if not (np.issubdtype(shock_data.dtype, np.integer) or np.issubdtype(shock_data.dtype, np.floating)):
+        raise ValueError('Shock data must be an integer or floating point array')
+    if not isinstance(dt, (int, float)) or dt <= 0:
+        raise ValueError('Time step ``dt`` must be a positive number')
+
+    return Load('shock', _unit_scale(unit), shock_data=np.atleast_2d(shock_data), dt=dt)
+
+
+def check_fds_parameters(k, C, p, spectral_method):
+    """
+    Validate the material parameters and the spectral method of the FDS calculation (see `fds`).
+    """
+    if not all(isinstance(attr, (int, float)) for attr in [k, C, p]):
+        raise ValueError('Material parameters: k, C and p must be provided')
+
+    if spectral_method not in SPECTRAL_METHODS:
+        raise ValueError("Invalid spectral method. Supported methods: 'narrowband', 'dirlik', 'tovo_benasciutti' and 'zhao_baker'")
+
+
+def ers(load, f0_range, damp, dtype=np.float64, cache=None, filter_bank=None, progress_bar=False, sensitivity=False):
+    """
+    Calculate the extreme response spectrum (ERS) of a load, see `SpecificationDevelopment.get_ers`.
+
+    :param load: `Load` object
+    :param f0_range: natural frequencies [Hz]
+    :param damp: damping ratio [/]
+    :param dtype: floating point precision, see `SpecificationDevelopment` (default: np.float64)
+    :param cache: `ResponseCache` for the SDOF responses of random time loads, can be shared between calls and threads (default: None, no caching)
+    :param filter_bank: precomputed `FilterBank` for random time loads (default: None)
+    :param progress_bar: show a progress bar for the time domain (convolution) calculation (default: False)
+    :param sensitivity: also return the derivatives of the ERS with respect to the PSD values, only for random PSD loads (default: False)
+
+    :return: ERS at ``f0_range`` (and the sensitivity matrix of shape (n_f0, n_bins), if ``sensitivity`` is True)
+    """
+    return _spectrum(load, 'ERS', f0_range, damp, dtype=dtype, cache=cache, filter_bank=filter_bank, progress_bar=progress_bar,
+                     sensitivity=sensitivity)
+
+
+def fds(load, f0_range, damp, k, C=1, p=1, spectral_method='narrowband', dtype=np.float64, cache=None, filter_bank=None, progress_bar=False,
+        sensitivity=False):
+    """
+    Calculate the fatigue damage spectrum (FDS) of a load, see `SpecificationDevelopment.get_fds`.
+
+    :param load: `Load` object
+    :param f0_range: natural frequencies [Hz]
+    :param damp: damping ratio [/]
+    :param k: S-N curve slope from Basquin equation
+    :param C: material constant from Basquin equation (default: C=1)
+    :param p: constant of proportionality between stress and deformation (default: p=1)
+    :param spectral_method: damage estimator for PSD-based calculation (default: 'narrowband')
+    :param dtype: floating point precision, see `SpecificationDevelopment` (default: np.float64)
+    :param cache: `ResponseCache` for the SDOF responses of random time loads, can be shared between calls and threads (default: None, no caching)
+    :param filter_bank: precomputed `FilterBank` for random time loads (default: None)
+    :param progress_bar: show a progress bar for the time domain (convolution) calculation (default: False)
+    :param sensitivity: also return the derivatives of the FDS with respect to the PSD values, only for random PSD loads (default: False)
+
+    :return: FDS at ``f0_range`` (and the sensitivity matrix of shape (n_f0, n_bins), if ``sensitivity`` is True)
+    """
+    check_fds_parameters(k, C, p, spectral_method)
+    return _spectrum(load, 'FDS', f0_range, damp, dtype=dtype, cache=cache, filter_bank=filter_bank, progress_bar=progress_bar,
+                     sensitivity=sensitivity, k=k, C=C, p=p, spectral_method=spectral_method)
+
+
+def srs(load, f0_range, damp, dtype=np.float64):
+    """
+    Calculate the shock response spectra (SRS) of the events of a shock load, see `SpecificationDevelopment.get_srs`.
+
+    :param load: `Load` object of a shock load
+    :param f0_range: natural frequencies [Hz]
+    :param damp: damping ratio [/]
+    :param dtype: floating point precision of the SDOF responses (default: np.float64)
+
+    :return: dictionary of the primary/residual positive/negative and maximax SRS (see ``SRS_TYPES``), arrays of shape (n_events, n_f0)
+    """
+    if load.signal_type != 'shock':
+        raise ValueError('The SRS can only be calculated for shock loads, see ``shock_load``')
+    context = _Context(load, f0_range=np.asarray(f0_range, dtype=float), damp=damp, dtype=dtype)
+    return signals.shock(context)
+
+
+def _spectrum(load, output, f0_range, damp, dtype, cache, filter_bank, progress_bar, sensitivity=False, **parameters):
+    """
+    Internal function for calculating the ERS or FDS (``output``) of a load.
+    """
+    context = _Context(load, f0_range=np.asarray(f0_range, dtype=float), damp=damp, Q=1 / (2 * damp), dtype=dtype,
+                       progress_bar=progress_bar, filter_bank=filter_bank, _response_cache=cache if cache is not None else ResponseCache(0),
+                       **parameters)
+
+    if sensitivity:
+        if load.signal_type != 'random_psd':
+            raise ValueError('Sensitivities with respect to the PSD are only available for random PSD loads')
+        return signals.random_psd_sensitivity(context, output=output)
+
+    if load.signal_type == 'shock':
+        raise ValueError('The ERS and FDS are not defined for shock loads, use ``srs``')
+
+    if load.signal_type == 'sine':
+        return signals.sine(context, output=output)
+
+    if load.signal_type == 'sine_sweep':
+        return signals.sine_sweep(context, output=output)
+
+    if load.signal_type == 'random_psd':
+        return signals.random_psd(context, output=output)
+
+    if load.signal_type == 'random_time':
+        if load.method == 'convolution':
+            return signals.random_time(context, output=output)
+        elif load.method == 'psd_averaging':
+            psd_freq, psd_data = tools.psd_averaging(context)
+            return signals.random_psd(_Context(context, psd_freq=psd_freq, psd_data=psd_data), output=output)
+        elif load.method == 'segmented':
+            # the damage of the stationary segments is summed, the extreme response is their envelope
+            spectra = [signals.random_psd(_Context(context, psd_freq=psd_freq, psd_data=psd_data, T=T * load.repeat), output=output)
+                       for T, psd_freq, psd_data in tools.segmented_psd(context)]
+            return np.sum(spectra, axis=0) if output == 'FDS' else np.max(spectra, axis=0)
@@ -0,0 +1,86 @@
+import numpy as np
+from scipy import signal
+
+from . import tools
+
+
+class FilterBank:
+    """
+    Precomputed recursive SDOF filters for a fixed time step, natural frequency range and damping ratio.
+
+    The filters are equivalent to the convolution in `tools.response_relative_displacement` (see `tools.sdof_filter_coefficients`),
+    but require only 5 coefficients per natural frequency. A filter bank is built once and can be passed to any number of
+    SpecificationDevelopment objects with the same ``dt``, ``f0_range`` and damping, pickled to worker processes, or stored 
+    with `save` and restored with `load`.
+    """
+
+    def __init__(self, dt, f0_range, damp):
+        """
+        :param dt: time step of the signals [s]
+        :param f0_range: natural frequencies [Hz]
+        :param damp: damping ratio [/]
+        """
+        self.dt = float(dt)
+        self.f0_range = np.asarray(f0_range, dtype=float)
+        self.damp = float(damp)
+        self.b, self.a = tools.sdof_filter_coefficients(self.f0_range, self.dt, self.damp)
+        self._index = {f_0: i for i, f_0 in enumerate(self.f0_range)}
+
+    def __contains__(self, f_0):
+        return f_0 in self._index
+
+    def __getstate__(self):
+        return {'dt': self.dt, 'f0_range': self.f0_range, 'damp': self.damp, 'b': self.b, 'a': self.a}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._index = {f_0: i for i, f_0 in enumerate(self.f0_range)}
+
+    def matches(self, dt, damp):
+        """
+        Check if the filter bank is valid for the time step ``dt`` and damping ratio ``damp``.
+        """
+        return np.isclose(self.dt, dt, rtol=1e-12, atol=0) and np.isclose(self.damp, damp, rtol=1e-12, atol=0)
+
+    def response(self, time_data, f_0):
+        """
+        Returns the relative response displacement of the SDOF system with natural frequency ``f_0``.
+
+        :param time_data: signal time data [m/s^2]
+        :param f_0: system natural frequency, must be one of ``f0_range`` [Hz]
+
+        :return: relative response displacement [m]
+        """
+        i = self._index[f_0]
+        dtype = time_data.dtype if time_data.dtype == np.float32 else np.float64
+        return signal.lfilter(self.b[i].astype(dtype), self.a[i].astype(dtype), time_data)
+
+    def turning_points(self, time_data, f_0, dtype=np.float64, scale=1, offset=0):
+        """
+        Returns the turning points of the relative response displacement of the SDOF system with natural frequency ``f_0``
+        to the signal ``scale * time_data + offset``, filtered block by block (see `tools.filtered_turning_points`).
+
+        :param time_data: signal time data [m/s^2] or raw counts
+        :param f_0: system natural frequency, must be one of ``f0_range`` [Hz]
+        :param dtype: floating point precision of the response (default: np.float64)
+        :param scale: scale of the raw signal (default: 1)
+        :param offset: offset of the raw signal (default: 0)
+
+        :return: turning points of the relative response displacement [m]
+        """
+        i = self._index[f_0]
+        return tools.filtered_turning_points(time_data, self.b[i], self.a[i], dtype=dtype, scale=scale, offset=offset)
+
+    def save(self, filename):
+        """
+        Save the filter bank to a ``.npz`` file.
+        """
+        np.savez(filename, dt=self.dt, f0_range=self.f0_range, damp=self.damp)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a filter bank, saved with `save`.
+        """
+        data = np.load(filename)
+        return cls(float(data['dt']), data['f0_range'], float(data['damp']))
@@ -0,0 +1,198 @@
+import math
+
+import numpy as np
+
+from . import tools
+
+# default maximum absolute error of the tabulated integrals I_b
+TABLE_TOL = 1e-10
+# exponents b of the tabulated integrals
+TABLE_EXPONENTS = (0, 1, 2, 4)
+
+
+class IntegralTable:
+    """
+    Tabulated integrals I_b of the PSD method (see `tools.integrals_b`) for a fixed damping ratio.
+
+    For a fixed damping, the integrals are smooth functions of the frequency ratio ``h`` alone. The table stores quintic
+    Hermite interpolants of I_0, I_1, I_2 and I_4 (from their exact values and first two derivatives) on a uniform axis of
+    ``log(h)`` between ``h_min`` and ``h_max``. The axis is refined until the interpolation error is below ``tol`` at the quarter
+    points of every interval, where the interpolation error is largest; the largest error found is stored as ``max_error``.
+    Outside of the table, the integrals are evaluated with their series expansions for small and large ``h``, whose
+    truncation errors are below 1e-15.
+
+    A table is built once per damping ratio (see `cached`) and can be used for any PSD and natural frequency range,
+    pickled to worker processes, or stored with `save` and restored with `load`. It is used by the ``'table'`` backend of
+    the ``integrals_b`` kernel (see `backends`)::
+
+        backends.set_backend('table', kernel='integrals_b')
+    """
+
+    _cache = {}
+
+    def __init__(self, damp, tol=TABLE_TOL, h_min=1e-3, h_max=1e3, points_per_decade=8):
+        """
+        :param damp: damping ratio [/]
+        :param tol: maximum absolute error of the interpolation (default: ``TABLE_TOL``)
+        :param h_min: smallest tabulated frequency ratio [/] (default: 1e-3)
+        :param h_max: largest tabulated frequency ratio [/] (default: 1e3)
+        :param points_per_decade: initial number of intervals per decade of ``h``, doubled until ``tol`` is reached (default: 8)
+        """
+        if not 0 < damp < 1 / np.sqrt(2):
+            raise ValueError('Damping ratio ``damp`` must be in the range (0, 1/sqrt(2))')
+        if not 0 < h_min < 1 < h_max:
+            raise ValueError('Table range must satisfy ``0 < h_min < 1 < h_max``')
+        self.damp = float(damp)
+        self.tol = float(tol)
+        self.h_min = float(h_min)
+        self.h_max = float(h_max)
+
+        n = int(np.ceil(points_per_decade * np.log10(h_max / h_min)))
+        while True:
+            self.step = np.log(h_max / h_min) / n
+            self.coefficients = self._coefficients(np.log(h_min) + self.step * np.arange(n + 1))
+
+            log_h_check = np.log(h_min) + self.step * (np.arange(n) + np.array([0.25, 0.5, 0.75])[:, None]).ravel()
+            error = max(np.max(np.abs(self._interpolate(log_h_check, b) - tools.integrals_b(np.exp(log_h_check), b, damp)))
+                        for b in TABLE_EXPONENTS)
+            if error <= tol:
+                break
+            n *= 2
+
+        self.max_error = float(error)
+
+    def __call__(self, h, b):
+        """
+        Returns the integral I_b.
+
+        :param h: frequency ratio (frequency vs natural frequency) [/], non-negative
+        :param b: exponent b [/] (0, 1, 2 or 4)
+
+        :return: I_b integral value
+        """
+        if b not in TABLE_EXPONENTS:
+            raise ValueError(f"Invalid exponent ``b``='{b}'. Supported exponents: 0, 1, 2 and 4.")
+
+        if np.ndim(h) == 0:
+            return self._scalar(float(h), b)
+
+        h = np.asarray(h, dtype=float)
+        result = self._interpolate(np.log(np.clip(h, self.h_min, self.h_max)), b)
+        small = h < self.h_min
+        if np.any(small):
+            result[small] = self._small(h[small], b)
+        large = h > self.h_max
+        if np.any(large):
+            result[large] = self._large(h[large], b)
+        return result[()]
+
+    def _coefficients(self, log_h):
+        """
+        Internal function returning the polynomial coefficients (in the position ``t`` in [0, 1] within the interval) of the
+        quintic Hermite interpolants of I_b on the axis ``log_h``, shape (len(TABLE_EXPONENTS), 6, len(log_h) - 1).
+        """
+        h = np.exp(log_h)
+        D = (1 - h**2)**2 + (2 * self.damp * h)**2
+        dD = 4 * h**2 * (h**2 - 1 + 2 * self.damp**2)  # h * dD/dh
+        coefficients = []
+        for b in TABLE_EXPONENTS:
+            y = tools.integrals_b(h, b, self.damp)
+            # first and second derivatives with respect to log(h), scaled to the interval length
+            dy = self.step * 4 * self.damp / np.pi * h**(b + 1) / D
+            d2y = self.step * dy * (b + 1 - dD / D)
+            y0, y1, d0, d1, s0, s1 = y[:-1], y[1:], dy[:-1], dy[1:], d2y[:-1], d2y[1:]
+            coefficients.append([y0, d0, s0 / 2,
+                                 10 * (y1 - y0) - 6 * d0 - 4 * d1 - (3 * s0 - s1) / 2,
+                                 -15 * (y1 - y0) + 8 * d0 + 7 * d1 + (3 * s0 - 2 * s1) / 2,
+                                 6 * (y1 - y0) - 3 * (d0 + d1) - (s0 - s1) / 2])
+        return np.array(coefficients)
+
+    def _interpolate(self, log_h, b):
+        """
+        Internal function evaluating the interpolant of I_b at ``log_h`` (inside the table) with Horner's scheme.
+        """
+        c = self.coefficients[TABLE_EXPONENTS.index(b)]
+        u = (log_h - np.log(self.h_min)) / self.step
+        i = np.minimum(u.astype(np.intp), c.shape[1] - 1)
+        u -= i
+        result = np.take(c[-1], i)
+        for j in range(len(c) - 2, -1, -1):
+            result *= u
+            result += np.take(c[j], i)
+        return result
+
+    def _scalar(self, h, b):
+        """
+        Internal function returning I_b for a scalar ``h`` (without the overhead of array operations).
+        """
+        if h < self.h_min:
+            return self._small(h, b)
+        if h > self.h_max:
+            return self._large(h, b)
+        c = self.coefficients[TABLE_EXPONENTS.index(b)]
+        u = (math.log(h) - math.log(self.h_min)) / self.step
+        i = min(int(u), c.shape[1] - 1)
+        u -= i
+        result = 0.0
+        for c_j in c[::-1, i].tolist():
+            result = result * u + c_j
+        return result
+
+    def _small(self, h, b):
+        """
+        Internal function returning I_b for small ``h``: the integrand ``x**b / (1 - beta * x**2 + x**4)`` is expanded in
+        powers of ``x``.
+        """
+        beta = 2 * (1 - 2 * self.damp**2)
+        return 4 * self.damp / np.pi * (h**(b + 1) / (b + 1) + beta * h**(b + 3) / (b + 3) + (beta**2 - 1) * h**(b + 5) / (b + 5))
+
+    def _large(self, h, b):
+        """
+        Internal function returning I_b for large ``h``: the integral to infinity minus the tail of the integrand, expanded
+        in powers of ``1 / x``. I_4 is obtained from I_0 and I_2 with equation [A6.24] (see `tools.integrals_b`).
+        """
+        alpha = 2 * np.sqrt(1 - self.damp**2)
+        beta = 2 * (1 - 2 * self.damp**2)
+        if b == 4:
+            return 4 * self.damp / np.pi * h + beta * self._large(h, 2) - self._large(h, 0)
+        elif b == 1:
+            total = 2 / (np.pi * alpha) * (np.pi / 2 + np.arctan(beta / (2 * self.damp * alpha)))
+        else:
+            total = 1
+        tail = h**(b - 3) / (3 - b) + beta * h**(b - 5) / (5 - b) + (beta**2 - 1) * h**(b - 7) / (7 - b)
+        return total - 4 * self.damp / np.pi * tail
+
+    def matches(self, damp):
+        """
+        Check if the table is valid for the damping ratio ``damp``.
+        """
+        return np.isclose(self.damp, damp, rtol=1e-12, atol=0)
+
+    @classmethod
+    def cached(cls, damp, tol=TABLE_TOL):
+        """
+        Returns the table for the damping ratio ``damp``, built on first use and kept for the lifetime of the process.
+        """
+        key = (float(damp), float(tol))
+        if key not in cls._cache:
+            cls._cache[key] = cls(damp, tol=tol)
+        return cls._cache[key]
+
+    def save(self, filename):
+        """
+        Save the table to a ``.npz`` file.
+        """
+        np.savez(filename, damp=self.damp, tol=self.tol, h_min=self.h_min, h_max=self.h_max, step=self.step,
+                 coefficients=self.coefficients, max_error=self.max_error)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a table, saved with `save`, without rebuilding it.
+        """
+        data = np.load(filename)
+        table = cls.__new__(cls)
+        for name in ['damp', 'tol', 'h_min', 'h_max', 'step', 'max_error']:
+            setattr(table, name, float(data[name]))
+        table.coefficients = data['coefficients']
+        return table
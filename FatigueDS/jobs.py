@@ -0,0 +1,170 @@
+"""
+Asynchronous calculation of the ERS and FDS.
+
+`submit_ers` and `submit_fds` calculate the spectrum of a `compute.Load` in an executor (by default a shared thread pool)
+and return a `Job` immediately. The natural frequencies are processed in chunks; after every chunk a progress event is
+passed to the ``progress`` callback, a cancellation request is checked and the time budget is checked. When the time budget
+is exhausted, the job finishes with the partially completed spectrum. The `Job` wraps a `concurrent.futures.Future`, which
+can be awaited in asyncio with ``asyncio.wrap_future(job.future)``.
+
+Progress events are dictionaries containing the ``job``, the ``output`` ('ERS' or 'FDS'), the number of ``completed`` and
+``total`` natural frequencies, the natural frequencies ``f0`` and spectrum ``values`` of the chunk and the ``elapsed`` time
+since the job started [s]. The callback is called in the executor thread.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+import numpy as np
+
+from . import compute
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def _get_default_executor():
+    """
+    Internal function returning the shared thread pool, created on first use.
+    """
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='FatigueDS')
+        return _default_executor
+
+
+class Job:
+    """
+    Handle of a submitted ERS or FDS calculation.
+
+    The spectrum is calculated in the order of ``f0_range``; ``completed`` is the number of natural frequencies calculated so
+    far. `result` returns the spectrum, with NaN at the natural frequencies that were not calculated before the time budget
+    was exhausted (``timed_out`` is then True).
+    """
+
+    def __init__(self, output, f0_range):
+        self.output = output
+        self.f0_range = f0_range
+        self.completed = 0
+        self.timed_out = False
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """
+        Request cancellation. A job that has not started is never run; a running job stops after the current chunk.
+        `result` then raises ``concurrent.futures.CancelledError``.
+        """
+        self._cancel_event.set()
+        self.future.cancel()
+
+    def cancelled(self):
+        """
+        Returns True if cancellation was requested.
+        """
+        return self._cancel_event.is_set()
+
+    def done(self):
+        """
+        Returns True if the job finished, was cancelled or failed.
+        """
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """
+        Wait for the job and return the (possibly partial) spectrum.
+
+        :param timeout: maximum waiting time [s] (default: None, wait until finished)
+
+        :return: spectrum at ``f0_range``
+        """
+        return self.future.result(timeout=timeout)
+
+
+def submit_ers(load, f0_range, damp, executor=None, chunk_size=8, progress=None, time_budget=None, **options):
+    """
+    Submit the calculation of the extreme response spectrum (ERS) of a load, see `compute.ers`.
+
+    :param load: `compute.Load` object
+    :param f0_range: natural frequencies [Hz]
+    :param damp: damping ratio [/]
+    :param executor: ``concurrent.futures`` executor running the job (default: None, shared thread pool)
+    :param chunk_size: number of natural frequencies calculated between progress events and cancellation checks (default: 8)
+    :param progress: callback receiving progress events (default: None)
+    :param time_budget: maximum time from submission to the last started chunk [s]. When exhausted, the job returns the
+        partially completed spectrum (default: None, no limit)
+    :param options: additional arguments of `compute.ers` (``dtype``, ``cache``, ``filter_bank``)
+
+    :return: `Job`
+    """
+    return _submit('ERS', load, f0_range, damp, executor, chunk_size, progress, time_budget, options)
+
+
+def submit_fds(load, f0_range, damp, k, C=1, p=1, spectral_method='narrowband', executor=None, chunk_size=8, progress=None, time_budget=None, **options):
+    """
+    Submit the calculation of the fatigue damage spectrum (FDS) of a load, see `compute.fds`.
+
+    :param load: `compute.Load` object
+    :param f0_range: natural frequencies [Hz]
+    :param damp: damping ratio [/]
+    :param k: S-N curve slope from Basquin equation
+    :param C: material constant from Basquin equation (default: C=1)
+    :param p: constant of proportionality between stress and deformation (default: p=1)
+    :param spectral_method: damage estimator for PSD-based calculation (default: 'narrowband')
+    :param executor: ``concurrent.futures`` executor running the job (default: None, shared thread pool)
+    :param chunk_size: number of natural frequencies calculated between progress events and cancellation checks (default: 8)
+    :param progress: callback receiving progress events (default: None)
+    :param time_budget: maximum time from submission to the last started chunk [s]. When exhausted, the job returns the
+        partially completed spectrum (default: None, no limit)
+    :param options: additional arguments of `compute.fds` (``dtype``, ``cache``, ``filter_bank``)
+
+    :return: `Job`
+    """
+    compute.check_fds_parameters(k, C, p, spectral_method)
+    options = dict(options, k=k, C=C, p=p, spectral_method=spectral_method)
+    return _submit('FDS', load, f0_range, damp, executor, chunk_size, progress, time_budget, options)
+
+
+def _submit(output, load, f0_range, damp, executor, chunk_size, progress, time_budget, options):
+    """
+    Internal function for submitting a job to the executor.
+    """
+    if chunk_size < 1:
+        raise ValueError('``chunk_size`` must be a positive integer')
+
+    f0_range = np.asarray(f0_range, dtype=float)
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+    job = Job(output, f0_range)
+    if executor is None:
+        executor = _get_default_executor()
+    job.future = executor.submit(_run, job, load, damp, chunk_size, progress, deadline, options)
+    return job
+
+
+def _run(job, load, damp, chunk_size, progress, deadline, options):
+    """
+    Internal function calculating the spectrum of a job chunk by chunk (executed in the executor).
+    """
+    calculate = compute.ers if job.output == 'ERS' else compute.fds
+    spectrum = np.full(len(job.f0_range), np.nan)
+    start = time.monotonic()
+
+    for i in range(0, len(job.f0_range), chunk_size):
+        if job.cancelled():
+            raise CancelledError()
+        if deadline is not None and time.monotonic() >= deadline:
+            job.timed_out = True
+            break
+
+        f0 = job.f0_range[i:i + chunk_size]
+        spectrum[i:i + len(f0)] = calculate(load, f0, damp, **options)
+        job.completed = i + len(f0)
+
+        if progress is not None:
+            progress(dict(job=job, output=job.output, completed=job.completed, total=len(job.f0_range), f0=f0,
+                          values=spectrum[i:i + len(f0)], elapsed=time.monotonic() - start))
+
+    return spectrum
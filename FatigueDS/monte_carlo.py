@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pyExSi as es
+from tqdm import tqdm
+
+from .filter_bank import FilterBank
+from .statistics import SpectrumStatistics
+
+
+def monte_carlo(sd, n_realizations, fs, k=None, C=1, p=1, seed=None, n_workers=None, relative_accuracy=0.01,
+                multirate=True, progress_bar=True):
+    """
+    Monte-Carlo estimation of the statistical scatter of the ERS and FDS of a random load, defined by PSD.
+
+    ``n_realizations`` stationary Gaussian time histories with duration ``sd.T`` are synthesized from the PSD of ``sd``
+    (using pyExSi) and their ERS and FDS are calculated in the time domain (convolution method, by default with the 
+    approximate multirate scheme, see `tools.response_turning_points`, and the response cache, so each SDOF response is 
+    computed once for both spectra). Every realization is generated from
+    an independent random stream, spawned from ``seed``, so the results do not depend on the number of workers.
+    Realizations are evaluated in a process pool and only ``2 * n_workers`` of them exist at the same time; their spectra
+    are streamed into `SpectrumStatistics` (mean, variance and percentiles at each natural frequency).
+
+    :param sd: SpecificationDevelopment object with random PSD load (see `set_random_load`)
+    :param n_realizations: number of realizations
+    :param fs: sampling frequency of the synthesized time histories [Hz]
+    :param k: S-N curve slope from Basquin equation. If None, only the ERS is calculated (default: None)
+    :param C: material constant from Basquin equation (default: C=1)
+    :param p: constant of proportionality between stress and deformation (default: p=1)
+    :param seed: seed of the random streams (default: None)
+    :param n_workers: number of worker processes. If 1, realizations are evaluated in the calling process (default: number of CPUs)
+    :param relative_accuracy: relative accuracy of the percentile estimates (default: 0.01)
+    :param multirate: use the multirate scheme for the realizations; False gives the exact full-rate responses (default: True)
+    :param progress_bar: show the progress of the realizations (default: True)
+
+    :return: dictionary with `SpectrumStatistics` of the ``'ERS'`` and ``'FDS'`` (None if ``k`` is None)
+    """
+    if getattr(sd, 'signal_type', None) != 'random_psd':
+        raise ValueError('Monte-Carlo simulation requires a random load defined by PSD.')
+
+    N = int(sd.T * fs)
+    freq = np.fft.rfftfreq(N, d=1 / fs)
+    psd = np.interp(freq, sd.psd_freq, sd.psd_data, left=0, right=0)
+    unit = 'g' if sd.unit_scale == 9.81 else 'ms2'
+
+    filter_bank = FilterBank(1 / fs, sd.f0_range, sd.damp)  # shared by all realizations
+    config = dict(filter_bank=filter_bank, psd=psd, N=N, fs=fs, unit=unit, k=k, C=C, p=p, dtype=sd.dtype, multirate=multirate)
+    seeds = np.random.SeedSequence(seed).spawn(n_realizations)
+
+    results = {'ERS': SpectrumStatistics(len(sd.f0_range), relative_accuracy)}
+    results['FDS'] = SpectrumStatistics(len(sd.f0_range), relative_accuracy) if k is not None else None
+
+    def collect(ers, fds):
+        results['ERS'].update(ers)
+        if fds is not None:
+            results['FDS'].update(fds)
+
+    if n_workers is None:
+        n_workers = os.cpu_count()
+
+    if n_workers == 1:
+        for seed_sequence in tqdm(seeds, disable=not progress_bar):
+            collect(*_realization(config, seed_sequence))
+        return results
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor, tqdm(total=n_realizations, disable=not progress_bar) as progress:
+        seeds = iter(seeds)
+        pending = set()
+        while True:
+            # bounded number of realizations in flight
+            for seed_sequence in seeds:
+                pending.add(executor.submit(_realization, config, seed_sequence))
+                if len(pending) >= 2 * n_workers:
+                    break
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(*future.result())
+                progress.update()
+
+    return results
+
+
+def _realization(config, seed_sequence):
+    """
+    Internal function for calculating the ERS and FDS of one synthesized realization (executed in a worker process).
+    """
+    from .spec_dev import SpecificationDevelopment
+
+    rg = np.random.default_rng(seed_sequence)
+    time_data = es.random_gaussian(config['N'], config['psd'], config['fs'], rg=rg)
+
+    sd = SpecificationDevelopment(filter_bank=config['filter_bank'], dtype=config['dtype'], progress_bar=False)
+    sd.set_random_load((time_data, 1 / config['fs']), unit=config['unit'], multirate=config['multirate'])
+    sd.get_ers()
+    if config['k'] is None:
+        return sd.ers, None
+
+    sd.get_fds(k=config['k'], C=config['C'], p=config['p'])
+    return sd.ers, sd.fds
@@ -0,0 +1,302 @@
+"""
+Cost model of the ERS and FDS calculation paths.
+
+`estimate` predicts the runtime and the peak memory of every calculation path that is applicable to a load, from the
+problem dimensions (length of the time history, natural frequencies, sine sweep grid, PSD length) and the per-element
+costs in ``COSTS``. `Plan` selects the fastest path that meets an accuracy tolerance and a memory budget, reports the
+estimates without calculating anything (`Plan.dry_run`) and runs the selected path (`Plan.run`)::
+
+    plan = sd.plan('FDS', k=5, tol=1e-2, memory_budget=2 * 1024**3)
+    print(plan.dry_run())
+    sd.fds = plan.run()
+
+Random time loads can be calculated with the exact convolution, the multirate scheme, the PSD averaging method or, if
+the convolution exceeds the memory budget, in time segments (``tiled``, see `work_units`). Paths that do not fit the
+memory budget are never selected; if no path fits, `Plan.run` raises ``MemoryError``.
+
+The default costs were measured on a typical desktop CPU; `calibrate` measures them on the current machine.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy import signal
+
+from . import tools
+from . import compute
+from . import backends
+from . import work_units
+
+# runtime per element [s]
+COSTS = {
+    'fft': 1.1e-8,  # FFT convolution, per sample and log2 of the FFT length
+    'lfilter': 6e-9,  # recursive SDOF filter, per sample
+    'turning_points': 2.2e-8,  # turning point detection, per sample
+    'sdof_numba': 2e-8,  # fused filter and turning point kernel, per sample
+    'rainflow_numpy': 2.4e-6,  # rainflow counting, per turning point
+    'rainflow_numba': 2e-8,
+    'decimate': 1.8e-8,  # anti-aliased decimation, per sample
+    'welch': 2.2e-8,  # Welch PSD estimate, per sample
+    'integral': 6e-8,  # PSD method integral I_b, per natural frequency and PSD bin
+    'sweep': 1e-7,  # sine sweep integration grid and integral, per grid point
+}
+
+# nominal relative error of the approximate paths
+MULTIRATE_ERROR = 1e-2
+PSD_AVERAGING_ERROR = 1e-1
+
+# relative error of the response at the start of a time segment of the tiled path, see `work_units.warm_up_samples`
+TILED_EPS = 1e-12
+
+Estimate = namedtuple('Estimate', ['method', 'time', 'memory', 'error', 'options'])
+Estimate.__doc__ = """
+Estimate of a calculation path: method name, runtime [s], peak memory [bytes], nominal relative error and the options
+of the path (e.g. ``bins`` of the PSD averaging method or ``n_segments`` of the tiled path).
+"""
+
+
+def calibrate(n=2**18):
+    """
+    Measure the per-element costs in ``COSTS`` on the current machine, with a signal of ``n`` samples.
+
+    :param n: number of samples of the test signal (default: 2**18)
+
+    :return: ``COSTS``
+    """
+    x = np.random.default_rng(0).normal(size=n)
+    b, a = tools.sdof_filter_coefficients(100, 1e-4, 0.05)
+    tp = tools.turning_points(np.cumsum(x))
+    h = np.linspace(0.1, 3, n)
+
+    def timed(function):
+        function()  # warm-up (e.g. compilation of the Numba kernels)
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+
+    COSTS['fft'] = timed(lambda: tools.response_relative_displacement(x, 1e-4, 100, 0.05)) / (n * np.log2(2 * n))
+    COSTS['lfilter'] = timed(lambda: signal.lfilter(b, a, x)) / n
+    COSTS['turning_points'] = timed(lambda: tools.turning_points(x)) / n
+    if 'numba' in backends.available('sdof_turning_points'):
+        COSTS['sdof_numba'] = timed(lambda: backends.get('sdof_turning_points', 'numba')(x, 1e-4, 100, 0.05)) / n
+    for name in backends.available('rainflow_damage'):
+        COSTS[f'rainflow_{name}'] = timed(lambda: backends.get('rainflow_damage', name)(tp, 5)) / len(tp)
+    COSTS['decimate'] = timed(lambda: tools.decimate_by_2(x)) / n
+    COSTS['welch'] = timed(lambda: tools.welch_psd(x, 1e4, 2**12)) / n
+    COSTS['integral'] = timed(lambda: backends.get('integrals_b')(h, 2, 0.05)) / n
+    COSTS['sweep'] = 6 * timed(lambda: backends.get('sweep_integral')(h, h, 0, 5, 10)) / n
+    return COSTS
+
+
+def _response_cost(n, n_tp, itemsize, raw):
+    """
+    Internal function returning the runtime and memory of the turning points of one SDOF response of ``n`` samples.
+    """
+    tp_memory = 16 * n_tp  # turning points and their growth
+    if backends.selected('sdof_turning_points') == 'numba':
+        return COSTS['sdof_numba'] * n, tp_memory
+    if raw:
+        return (COSTS['lfilter'] + COSTS['turning_points']) * n, 6 * min(n, tools.BLOCK_SIZE) * itemsize + tp_memory
+    # time vector, impulse response, response and the FFT buffers of the convolution
+    return COSTS['fft'] * n * np.log2(2 * n) + COSTS['turning_points'] * n, 12 * n * itemsize + tp_memory
+
+
+def _random_time_estimates(load, f0_range, damp, output, dtype, memory_budget):
+    """
+    Internal function returning the estimates of the calculation paths of a random time load.
+    """
+    N = len(load.time_data)
+    itemsize = np.dtype(dtype).itemsize
+    raw = load.scale != 1 or load.offset != 0 or load.time_data.dtype != dtype
+    rainflow = COSTS[f"rainflow_{backends.selected('rainflow_damage')}"] if output == 'FDS' else 0
+    # a narrowband response has 2 turning points per period; broadband content of the load adds more (measured 2-8 per
+    # period for white noise, increasing towards low natural frequencies), so 4 per period is assumed
+    n_tp = np.minimum(N, 4 * f0_range * N * load.dt)
+    # repetitions of the time history: the first repetitions and one steady-state repetition are calculated
+    blocks = np.array([min(load.repeat, 2 + tools.warm_up_samples(f_0, damp, load.dt) // N) for f_0 in f0_range])
+
+    estimates = []
+
+    costs = [_response_cost(N, n, itemsize, raw) for n in n_tp]
+    estimates.append(Estimate('convolution', sum(c[0] * b for c, b in zip(costs, blocks)) + rainflow * np.sum(n_tp * blocks), 
+                              max(c[1] for c in costs), 0.0, {}))
+
+    q = np.array([tools.multirate_factor(f_0, load.dt) for f_0 in f0_range])
+    if np.any(q > 1) and load.repeat == 1:
+        n_q = -(-N // q)
+        costs = [_response_cost(n, min(n, n_t), itemsize, raw and q_i == 1) for n, n_t, q_i in zip(n_q, n_tp, q)]
+        decimation = COSTS['decimate'] * N * np.log2(q.max())
+        decimated_memory = N * itemsize * (1 - 1 / q.max())  # decimated copies N/2 + N/4 + ...
+        estimates.append(Estimate('multirate', decimation + sum(c[0] for c in costs) + rainflow * np.sum(np.minimum(n_q, n_tp)),
+                                  decimated_memory + max(c[1] for c in costs), MULTIRATE_ERROR, {}))
+
+    # the PSD resolution must resolve the half-power bandwidth of the lowest natural frequency
+    nperseg = int(np.ceil(1 / (load.dt * damp * f0_range.min())))
+    bins = getattr(load, 'bins', N // nperseg)
+    if bins >= 1:
+        nperseg = N // bins
+        n_freq = nperseg // 2 + 1
+        n_integrals = 6 if output == 'FDS' else 4
+        estimates.append(Estimate('psd_averaging', COSTS['welch'] * N + COSTS['integral'] * n_integrals * n_freq * len(f0_range),
+                                  8 * (6 * min(N, max(2**20, nperseg)) + 8 * n_freq + 4 * n_freq * len(f0_range)), PSD_AVERAGING_ERROR, {'bins': bins}))
+
+    # time segments with a warm-up, so only one segment of the response is in memory
+    if memory_budget is not None and estimates[0].memory > memory_budget and load.repeat == 1:
+        warm_up = work_units.warm_up_samples(f0_range.min(), damp, load.dt, eps=TILED_EPS)
+        for n_segments in 2**np.arange(1, int(np.log2(N)) + 1):
+            n = N // n_segments + 1 + warm_up
+            memory = 3 * n * 8 + 16 * min(n, n_tp.max())
+            if memory <= memory_budget:
+                estimates.append(Estimate('tiled', len(f0_range) * (COSTS['lfilter'] + COSTS['turning_points']) * n * n_segments
+                                          + rainflow * np.sum(n_tp), memory, TILED_EPS, {'n_segments': int(n_segments)}))
+                break
+
+    return estimates
+
+
+def estimate(load, f0_range, damp, output='ERS', dtype=np.float64, memory_budget=None):
+    """
+    Estimate the runtime and the peak memory of the calculation paths of the ERS or FDS of a load.
+
+    :param load: `compute.Load` object
+    :param f0_range: natural frequencies [Hz]
+    :param damp: damping ratio [/]
+    :param output: 'ERS' or 'FDS' (default: 'ERS')
+    :param dtype: floating point precision, see `SpecificationDevelopment` (default: np.float64)
+    :param memory_budget: memory budget [bytes]; if exceeded by the convolution of a random time load, a tiled path is added (default: None)
+
+    :return: list of `Estimate`
+    """
+    f0_range = np.asarray(f0_range, dtype=float)
+    n_f0 = len(f0_range)
+    itemsize = np.dtype(dtype).itemsize
+
+    if load.signal_type == 'random_time':
+        return _random_time_estimates(load, f0_range, damp, output, dtype, memory_budget)
+
+    if load.signal_type == 'random_psd':
+        n_freq = len(load.psd_freq)
+        n_integrals = 6 if output == 'FDS' else 4
+        return [Estimate('analytic', COSTS['integral'] * n_integrals * n_freq * n_f0, 8 * (8 * n_freq + 16 * n_f0 + 4 * n_freq * n_f0), 0.0, {})]
+
+    if load.signal_type == 'sine_sweep' and output == 'FDS':
+        # the integration grid of every sweep segment covers the sweep time ``tb`` with the time step ``dt``
+        f_range = load.const_f_range
+        if load.sweep_type in ['lin', 'linear']:
+            tb = (f_range[-1] - f_range[0]) / load.sweep_rate * 60
+        else:
+            tb = 60 * np.log(f_range[-1] / f_range[0]) / (load.sweep_rate * np.log(2))
+        n_grid = int(np.ceil(tb / load.dt))
+        return [Estimate('sweep_grid', COSTS['sweep'] * n_grid * n_f0 * len(load.const_amp), 6 * n_grid * itemsize, 0.0, {'n_grid': n_grid})]
+
+    return [Estimate('analytic', 1e-6 * n_f0, 8 * 8 * n_f0, 0.0, {})]
+
+
+def _format_bytes(n):
+    """
+    Internal function formatting a number of bytes.
+    """
+    for unit in ['B', 'kB', 'MB', 'GB']:
+        if n < 1024:
+            return f'{n:.1f} {unit}'
+        n /= 1024
+    return f'{n:.1f} TB'
+
+
+class Plan:
+    """
+    Selection of the calculation path of the ERS or FDS of a load, see `estimate`.
+    """
+
+    def __init__(self, load, f0_range, damp, output='ERS', k=None, C=1, p=1, spectral_method='narrowband', dtype=np.float64,
+                 tol=1e-6, memory_budget=None):
+        """
+        :param load: `compute.Load` object
+        :param f0_range: natural frequencies [Hz]
+        :param damp: damping ratio [/]
+        :param output: 'ERS' or 'FDS' (default: 'ERS')
+        :param k: S-N curve slope from Basquin equation, required for the FDS (default: None)
+        :param C: material constant from Basquin equation (default: C=1)
+        :param p: constant of proportionality between stress and deformation (default: p=1)
+        :param spectral_method: damage estimator for PSD-based calculation (default: 'narrowband')
+        :param dtype: floating point precision, see `SpecificationDevelopment` (default: np.float64)
+        :param tol: accepted nominal relative error of the path (default: 1e-6, exact paths only)
+        :param memory_budget: memory budget [bytes] (default: None, no limit)
+        """
+        if output not in ['ERS', 'FDS']:
+            raise ValueError("``output`` must be 'ERS' or 'FDS'")
+        if output == 'FDS':
+            compute.check_fds_parameters(k, C, p, spectral_method)
+
+        self.load = load
+        self.f0_range = np.asarray(f0_range, dtype=float)
+        self.damp = damp
+        self.output = output
+        self.fds_parameters = dict(k=k, C=C, p=p, spectral_method=spectral_method)
+        self.dtype = dtype
+        self.tol = tol
+        self.memory_budget = memory_budget
+
+        self.estimates = estimate(load, self.f0_range, damp, output=output, dtype=dtype, memory_budget=memory_budget)
+        feasible = [e for e in self.estimates if e.error <= tol and (memory_budget is None or e.memory <= memory_budget)]
+        self.selected = min(feasible, key=lambda e: e.time) if feasible else None
+
+    def dry_run(self):
+        """
+        Returns a report of the estimates and the selected path, without calculating anything.
+        """
+        lines = [f'{self.output} of a {self.load.signal_type} load, {len(self.f0_range)} natural frequencies '
+                 f'(tolerance {self.tol:g}, memory budget {"none" if self.memory_budget is None else _format_bytes(self.memory_budget)})']
+        for e in self.estimates:
+            marker = '*' if e is self.selected else ' '
+            options = ', '.join(f'{name}={value}' for name, value in e.options.items())
+            lines.append(f'{marker} {e.method:<14} time {e.time:10.3g} s   memory {_format_bytes(e.memory):>10}   error {e.error:<8g} {options}')
+        if self.selected is None:
+            lines.append('No calculation path meets the tolerance and the memory budget.')
+        return '\n'.join(lines)
+
+    def run(self, cache=None, filter_bank=None, progress_bar=False):
+        """
+        Calculate the spectrum with the selected path.
+
+        :param cache: `ResponseCache` for the SDOF responses of random time loads (default: None)
+        :param filter_bank: precomputed `FilterBank` for random time loads (default: None)
+        :param progress_bar: show a progress bar for the time domain calculation (default: False)
+
+        :return: ERS or FDS at ``f0_range``
+        """
+        if self.selected is None:
+            raise MemoryError('No calculation path meets the tolerance and the memory budget:\n' + self.dry_run())
+
+        method = self.selected.method
+        load = self.load
+        if load.signal_type == 'random_time':
+            load = _random_time_load(load, method, self.selected.options.get('bins'))
+
+        if method == 'tiled':
+            k = self.fds_parameters['k'] if self.output == 'FDS' else None
+            units = work_units.split(load, self.f0_range, self.damp, k=k, C=self.fds_parameters['C'], p=self.fds_parameters['p'],
+                                     n_segments=self.selected.options['n_segments'], eps=TILED_EPS)
+            _, ers, fds = work_units.merge(work_units.run_unit(unit, dtype=self.dtype) for unit in units)
+            return ers if self.output == 'ERS' else fds
+
+        options = dict(dtype=self.dtype, cache=cache, filter_bank=filter_bank, progress_bar=progress_bar)
+        if self.output == 'ERS':
+            return compute.ers(load, self.f0_range, self.damp, **options)
+        return compute.fds(load, self.f0_range, self.damp, **self.fds_parameters, **options)
+
+
+def _random_time_load(load, method, bins=None):
+    """
+    Internal function returning the random time load with the calculation path ``method``.
+    """
+    parameters = dict(time_data=load.time_data, dt=load.dt, window=load.window, overlap=load.overlap, scale=load.scale,
+                      offset=load.offset, repeat=load.repeat, T=load.T, method='convolution', multirate=False)
+    if method == 'multirate':
+        parameters['multirate'] = True
+    elif method == 'psd_averaging':
+        parameters['method'] = 'psd_averaging'
+        parameters['bins'] = bins
+    if (parameters['method'], parameters['multirate'], bins) == (load.method, load.multirate, getattr(load, 'bins', None)):
+        return load
+    return compute.Load('random_time', load.unit_scale, **parameters)
@@ -0,0 +1,153 @@
+"""
+Plotting of large collections of spectra (e.g. the ERS or FDS of a fleet of recordings) on the object-oriented
+matplotlib API.
+
+All spectra of a collection are drawn as one ``LineCollection`` (`plot_spectra`) or as shaded percentile bands
+(`plot_percentile_bands`), instead of one line per spectrum. Dense natural frequency grids are reduced to at most
+``max_points`` points per spectrum by min-max decimation (`decimate_minmax`), which keeps the extremes of every group of
+neighbouring points, so peaks and notches remain visible. The functions draw on the given ``ax``; if it is not given, a
+new ``matplotlib.figure.Figure`` is created, which is not managed by pyplot (save it with ``ax.figure.savefig``).
+"""
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
+
+from .statistics import SpectrumStatistics
+
+
+def _bucket_indices(n, max_points):
+    """
+    Internal function returning the indices of ``n`` points grouped into buckets of equal size (shape (n_buckets, size));
+    the last bucket is padded with the last index.
+    """
+    n_buckets = max(max_points // 2, 1)
+    size = -(-n // n_buckets)
+    return np.minimum(np.arange(-(-n // size) * size).reshape(-1, size), n - 1)
+
+
+def decimate_minmax(f0_range, spectra, max_points=1000):
+    """
+    Min-max decimation of spectra for plotting: the natural frequencies are grouped into ``max_points / 2`` buckets of
+    neighbouring points, and the minimum and the maximum of every bucket are kept (in their original order), together
+    with the first and the last point.
+
+    :param f0_range: natural frequencies [Hz], shape (n_f0,)
+    :param spectra: spectrum (shape (n_f0,)) or spectra (shape (n_spectra, n_f0))
+    :param max_points: maximum number of points per spectrum; None disables decimation (default: 1000)
+
+    :return: decimated natural frequencies, decimated spectra (same number of dimensions as ``spectra``)
+    """
+    f0_range = np.asarray(f0_range)
+    spectra = np.asarray(spectra)
+    y = np.atleast_2d(spectra)
+    n = y.shape[1]
+    if max_points is None or n <= max_points:
+        return np.broadcast_to(f0_range, spectra.shape), spectra
+
+    buckets = _bucket_indices(n, max_points - 2)
+    values = y[:, buckets]
+    i_min = np.take_along_axis(np.broadcast_to(buckets, values.shape), np.argmin(values, axis=2)[..., None], axis=2)[..., 0]
+    i_max = np.take_along_axis(np.broadcast_to(buckets, values.shape), np.argmax(values, axis=2)[..., None], axis=2)[..., 0]
+    first_last = np.broadcast_to([0, n - 1], (len(y), 2))
+    indices = np.sort(np.concatenate((first_last, i_min, i_max), axis=1), axis=1)
+
+    f0_decimated, y_decimated = f0_range[indices], np.take_along_axis(y, indices, axis=1)
+    if spectra.ndim == 1:
+        return f0_decimated[0], y_decimated[0]
+    return f0_decimated, y_decimated
+
+
+def _get_axes(ax):
+    """
+    Internal function returning ``ax`` or the axes of a new figure, which is not managed by pyplot.
+    """
+    if ax is None:
+        ax = Figure().add_subplot()
+    return ax
+
+
+def _set_labels(ax, output, yscale):
+    """
+    Internal function setting the axis labels and scales of a spectrum plot.
+    """
+    ax.set_xlabel('Frequency [Hz]')
+    if output is not None:
+        ax.set_ylabel(output)
+    if yscale is not None:
+        ax.set_yscale(yscale)
+
+
+def plot_spectra(f0_range, spectra, ax=None, max_points=1000, output=None, yscale=None, **kwargs):
+    """
+    Plot a collection of spectra as one ``LineCollection``.
+
+    :param f0_range: natural frequencies [Hz], shape (n_f0,)
+    :param spectra: spectra, shape (n_spectra, n_f0)
+    :param ax: matplotlib axes (default: None, new figure)
+    :param max_points: maximum number of points per spectrum, see `decimate_minmax` (default: 1000)
+    :param output: label of the y axis, e.g. 'ERS [g]' (default: None)
+    :param yscale: scale of the y axis, e.g. 'log' for the FDS (default: None)
+    :param kwargs: ``LineCollection`` properties (e.g. ``colors``, ``linewidths``, ``alpha``, ``label``, or ``array`` and ``cmap``)
+
+    :return: ``LineCollection``
+    """
+    ax = _get_axes(ax)
+    f0_decimated, spectra_decimated = decimate_minmax(f0_range, np.atleast_2d(spectra), max_points=max_points)
+    kwargs.setdefault('linewidths', 0.5)
+
+    lines = LineCollection(np.stack((f0_decimated, spectra_decimated), axis=-1), **kwargs)
+    ax.add_collection(lines)
+    _set_labels(ax, output, yscale)
+    ax.autoscale_view()
+    return lines
+
+
+def plot_percentile_bands(f0_range, spectra, ax=None, bands=((5, 95), (25, 75)), median=True, max_points=1000, output=None,
+                          yscale=None, color='C0', alpha=0.25, **kwargs):
+    """
+    Plot the percentile bands of a collection of spectra, shaded with increasing opacity towards the median.
+
+    :param f0_range: natural frequencies [Hz], shape (n_f0,)
+    :param spectra: spectra (shape (n_spectra, n_f0)) or `SpectrumStatistics` of the spectra
+    :param ax: matplotlib axes (default: None, new figure)
+    :param bands: pairs of lower and upper percentiles [0-100] (default: ((5, 95), (25, 75)))
+    :param median: plot the median (default: True)
+    :param max_points: maximum number of points of the bands, see `decimate_minmax` (default: 1000)
+    :param output: label of the y axis, e.g. 'ERS [g]' (default: None)
+    :param yscale: scale of the y axis, e.g. 'log' for the FDS (default: None)
+    :param color: color of the bands and the median (default: 'C0')
+    :param alpha: opacity of each band (default: 0.25)
+    :param kwargs: properties of the median line (e.g. ``label``)
+
+    :return: list of the band ``PolyCollection`` objects, median ``Line2D`` (None if ``median`` is False)
+    """
+    ax = _get_axes(ax)
+    f0_range = np.asarray(f0_range)
+    if isinstance(spectra, SpectrumStatistics):
+        percentile = spectra.percentile
+    else:
+        spectra = np.asarray(spectra)
+        percentile = lambda q: np.percentile(spectra, q, axis=0)
+
+    if max_points is not None and len(f0_range) > max_points:
+        # bucket envelope: the bands are never narrower than without decimation
+        buckets = _bucket_indices(len(f0_range), max_points)
+        f0_band = np.stack((f0_range[buckets[:, 0]], f0_range[buckets[:, -1]]), axis=1).ravel()
+        lower_envelope = lambda y: np.repeat(np.min(y[buckets], axis=1), 2)
+        upper_envelope = lambda y: np.repeat(np.max(y[buckets], axis=1), 2)
+    else:
+        f0_band = f0_range
+        lower_envelope = upper_envelope = lambda y: y
+
+    polygons = []
+    for lower, upper in bands:
+        y = percentile([lower, upper])
+        polygons.append(ax.fill_between(f0_band, lower_envelope(y[0]), upper_envelope(y[1]), color=color, alpha=alpha, linewidth=0))
+
+    line = None
+    if median:
+        f0_median, y_median = decimate_minmax(f0_range, np.ravel(percentile(50)), max_points=max_points)
+        line, = ax.plot(f0_median, y_median, color=color, **kwargs)
+
+    _set_labels(ax, output, yscale)
+    return polygons, line
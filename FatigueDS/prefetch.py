@@ -0,0 +1,172 @@
+"""
+Reading the next records in a background thread while the current one is processed.
+
+`Prefetcher` iterates over ``(item, data)`` pairs, where ``data = read(item)`` is evaluated in a background thread, at most
+``depth`` records ahead of the consumer. When the queue is full, the reading thread blocks until the consumer takes the
+next record (backpressure), so the memory is bounded by ``depth + 1`` records. Reading is I/O bound (numpy and file reads
+release the GIL), so it overlaps with the calculation of the ERS and FDS in the main thread::
+
+    with Prefetcher(files, read_array, depth=2) as records:
+        for filename, time_data in records:
+            sd.set_random_load((time_data, dt), unit='g')
+            sd.get_ers()
+    print(records.overlap)
+
+The counters ``records``, ``nbytes``, ``read_time`` (time spent reading), ``wait_time`` (time the consumer waited for a
+record) and ``blocked_time`` (time the reading thread waited for free space in the queue) are updated while iterating.
+``overlap`` is the fraction of the reading time that was hidden behind the calculation.
+"""
+import time
+import queue
+import threading
+
+import numpy as np
+
+CHUNK_BYTES = 64 * 1024**2
+
+_END = object()
+
+
+def read_array(filename, dtype=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Read a 1D or 2D array from a ``.npy`` file or a raw binary file (of type ``dtype``) into memory. The file is
+    memory-mapped and copied in chunks of ``chunk_bytes``, so the pages are read in the calling thread.
+
+    :param filename: ``.npy`` or raw binary file
+    :param dtype: data type of raw binary files (ignored for ``.npy`` files)
+    :param chunk_bytes: size of the copied chunks [bytes]
+
+    :return: array in memory
+    """
+    if str(filename).endswith('.npy'):
+        mapped = np.load(filename, mmap_mode='r')
+    elif dtype is None:
+        raise ValueError('The data type of raw binary files must be given.')
+    else:
+        mapped = np.memmap(filename, dtype=dtype, mode='r')
+
+    data = np.empty(mapped.shape, dtype=mapped.dtype)
+    if data.size == 0:
+        return data
+    rows = max(1, chunk_bytes // (data.nbytes // len(data)))
+    for i in range(0, len(data), rows):
+        data[i:i + rows] = mapped[i:i + rows]
+    return data
+
+
+class Prefetcher:
+    """
+    Iterator over ``(item, read(item))``, reading up to ``depth`` records ahead in a background thread.
+
+    Exceptions raised by ``read`` are raised by the iterator, at the position of the failed record. The reading thread
+    is stopped by `close` (also at the end of a ``with`` block or when the iterator is exhausted).
+    """
+
+    def __init__(self, items, read, depth=2):
+        """
+        :param items: items to read (e.g. file names), in the order of processing
+        :param read: function returning the data of an item
+        :param depth: maximum number of records read ahead (default: 2)
+        """
+        if not isinstance(depth, (int, np.integer)) or depth < 1:
+            raise ValueError('Prefetch depth must be a positive integer.')
+        self.depth = depth
+        self.records = 0
+        self.nbytes = 0
+        self.read_time = 0
+        self.wait_time = 0
+        self.blocked_time = 0
+
+        self._read = read
+        self._items = iter(items)
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='FatigueDS-prefetch', daemon=True)
+        self._thread.start()
+
+    @property
+    def overlap(self):
+        """
+        Fraction of the reading time hidden behind the processing of the previous records (1 if the consumer never waited).
+        """
+        if self.read_time == 0:
+            return 1.
+        return max(0., 1 - self.wait_time / self.read_time)
+
+    def stats(self):
+        """
+        Returns the counters as a dictionary.
+        """
+        return dict(records=self.records, nbytes=self.nbytes, read_time=self.read_time, wait_time=self.wait_time,
+                    blocked_time=self.blocked_time, overlap=self.overlap)
+
+    def _put(self, entry):
+        """
+        Internal function putting an entry into the queue; blocks while the queue is full. Returns False if the prefetcher
+        was closed in the meantime.
+        """
+        start = time.perf_counter()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    self._queue.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        finally:
+            self.blocked_time += time.perf_counter() - start
+
+    def _run(self):
+        """
+        Internal function executed in the reading thread.
+        """
+        for item in self._items:
+            if self._stop_event.is_set():
+                return
+            start = time.perf_counter()
+            try:
+                data, error = self._read(item), None
+            except Exception as e:
+                data, error = None, e
+            self.read_time += time.perf_counter() - start
+            if error is None:
+                self.nbytes += getattr(data, 'nbytes', 0)
+            if not self._put((item, data, error)) or error is not None:
+                return
+        self._put(_END)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._stop_event.is_set():
+            raise StopIteration
+        start = time.perf_counter()
+        entry = self._queue.get()
+        self.wait_time += time.perf_counter() - start
+        if entry is _END:
+            self.close()
+            raise StopIteration
+
+        item, data, error = entry
+        if error is not None:
+            self.close()
+            raise error
+        self.records += 1
+        return item, data
+
+    def close(self):
+        """
+        Stop the reading thread and discard the records read ahead.
+        """
+        self._stop_event.set()
+        self._thread.join()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
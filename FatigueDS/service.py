@@ -0,0 +1,376 @@
+"""
+Local HTTP/JSON service for calculating the ERS and FDS on demand.
+
+The service keeps the library imported and a pool of worker processes running, so client tools do not pay the import and
+setup cost per request. Arrays are uploaded in the binary ``.npy`` format (``np.save``) and referenced by id, so large
+time histories are never encoded as JSON numbers. Only the standard library is used (``http.server``); the service is
+intended for localhost and has no authentication.
+
+Endpoints:
+
+- ``POST /arrays``: upload an array (``.npy`` body), returns ``{"id": ...}``. Ids are content hashes, so uploading the same
+  array twice returns the same id. Returns status 413 when the array is larger than the memory budget of the arrays.
+- ``POST /jobs``: submit a job (JSON body, see below), returns ``{"id": ..., "status": ...}``. Returns status 503 when
+  the job queue is full.
+- ``GET /jobs/<id>``: job status (``queued``, ``running``, ``done`` or ``failed``, with ``error`` message). Only the
+  ``max_jobs`` most recent finished jobs are kept; older job ids return status 404.
+- ``GET /jobs/<id>/result``: ``.npz`` file with ``f0_range``, ``ers`` and ``fds`` (if requested).
+- ``DELETE /jobs/<id>``: cancel a queued job.
+
+Job request::
+
+    {
+        "f0": [10, 2000, 5],                    # (start, stop, step) or "f0_range": [...]
+        "Q": 10,                                 # or "damp"
+        "load": {"type": "random_time", "time_data": {"array": "<id>"}, "dt": 0.001, "unit": "g"},
+        "fds": {"k": 5, "C": 1, "p": 1}          # optional
+    }
+
+Load types are ``sine``, ``sine_sweep`` (arguments of the corresponding ``set_*_load`` methods), ``random_psd``
+(``psd_data``, ``psd_freq``, ``T``) and ``random_time`` (``time_data``, ``dt`` and the arguments of `set_random_load`).
+Identical requests (same parameters and array contents) are answered from the result cache. The filter banks of random
+time loads are cached in the worker processes.
+
+Run the service with ``python -m FatigueDS.service --port 8000``.
+"""
+import io
+import os
+import json
+import uuid
+import hashlib
+import argparse
+import threading
+import functools
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .cache import ResponseCache
+from .filter_bank import FilterBank
+from .spec_dev import SpecificationDevelopment
+
+LOAD_TYPES = ['sine', 'sine_sweep', 'random_psd', 'random_time']
+
+
+class ArrayTooLarge(ValueError):
+    """
+    Raised when an uploaded array exceeds the memory budget of the arrays.
+    """
+
+
+class SpectrumService:
+    """
+    HTTP service with a bounded job queue, a worker process pool and caches of uploaded arrays and results.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, n_workers=None, max_queue=16, max_array_bytes=1024**3, max_results=256,
+                 max_jobs=1024):
+        """
+        :param host: host name (default: '127.0.0.1')
+        :param port: port, 0 selects a free port (default: 0)
+        :param n_workers: number of worker processes (default: number of CPUs)
+        :param max_queue: maximum number of queued and running jobs (default: 16)
+        :param max_array_bytes: memory budget of uploaded arrays [bytes]; least recently used arrays are removed (default: 1 GB)
+        :param max_results: number of cached results (default: 256)
+        :param max_jobs: number of kept records of finished jobs; the oldest are removed (default: 1024)
+        """
+        self.max_queue = max_queue
+        self.max_results = max_results
+        self.max_jobs = max_jobs
+        self.arrays = ResponseCache(max_bytes=max_array_bytes)
+        self.jobs = OrderedDict()
+        self._results = OrderedDict()
+        self._active = 0
+        self._lock = threading.Lock()
+
+        self._executor = ProcessPoolExecutor(max_workers=n_workers)
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.service = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Base URL of the service.
+        """
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """
+        Start serving in a background thread.
+
+        :return: self
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Serve in the calling thread until interrupted.
+        """
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """
+        Stop the server and the worker processes.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_array(self, data):
+        """
+        Store an uploaded array (``.npy`` bytes) and return its id. Raises `ArrayTooLarge` if the array exceeds the memory
+        budget of the arrays.
+        """
+        array = np.load(io.BytesIO(data), allow_pickle=False)
+        array_id = hashlib.sha256(data).hexdigest()[:32]
+        if array_id not in self.arrays and not self.arrays.put(array_id, array):
+            raise ArrayTooLarge(f'Array of {array.nbytes} bytes exceeds the memory budget of {self.arrays.max_bytes} bytes')
+        return array_id, array
+
+    def submit(self, request):
+        """
+        Submit a job request (see module documentation) and return the job record.
+        """
+        load = request.get('load')
+        if not isinstance(load, dict) or load.get('type') not in LOAD_TYPES:
+            raise ValueError(f'``load`` must be an object with ``type`` in {LOAD_TYPES}')
+        if 'f0' not in request and 'f0_range' not in request:
+            raise ValueError('``f0`` or ``f0_range`` must be provided')
+
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+        job = {'id': uuid.uuid4().hex, 'key': key, 'status': 'queued', 'error': None, 'future': None}
+
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                job['status'] = 'done'
+                self._add_job(job)
+                return job
+
+            if self._active >= self.max_queue:
+                return None
+
+            arrays = _resolve_arrays(load, self.arrays)
+            self._active += 1
+            self._add_job(job)
+
+        job['future'] = self._executor.submit(_compute, request, arrays)
+        job['future'].add_done_callback(functools.partial(self._finish, job))
+        return job
+
+    def _add_job(self, job):
+        """
+        Internal method adding a job record (called with the lock held).
+        """
+        self.jobs[job['id']] = job
+        self._remove_finished_jobs()
+
+    def _remove_finished_jobs(self):
+        """
+        Internal method removing the oldest finished jobs beyond ``max_jobs`` (called with the lock held). Queued and
+        running jobs are never removed.
+        """
+        n_finished = len(self.jobs) - self._active
+        for job_id in list(self.jobs):
+            if n_finished <= self.max_jobs:
+                break
+            if self.jobs[job_id]['status'] in ('done', 'failed', 'cancelled'):
+                del self.jobs[job_id]
+                n_finished -= 1
+
+    def result(self, job):
+        """
+        Returns the ``.npz`` bytes of a finished job, or None if the result is no longer cached.
+        """
+        with self._lock:
+            return self._results.get(job['key'])
+
+    def _finish(self, job, future):
+        """
+        Internal method storing the result of a finished job.
+        """
+        with self._lock:
+            self._active -= 1
+            job['future'] = None  # the result is kept only in the result cache
+            if future.cancelled():
+                job['status'] = 'cancelled'
+            elif future.exception() is not None:
+                job['status'] = 'failed'
+                job['error'] = str(future.exception())
+            else:
+                buffer = io.BytesIO()
+                np.savez(buffer, **future.result())
+                self._results[job['key']] = buffer.getvalue()
+                while len(self._results) > self.max_results:
+                    self._results.popitem(last=False)
+                job['status'] = 'done'
+            self._remove_finished_jobs()
+
+
+def _resolve_arrays(load, arrays):
+    """
+    Internal function returning the uploaded arrays referenced in the load (values ``{"array": id}``).
+    """
+    resolved = {}
+    for name, value in load.items():
+        if isinstance(value, dict) and 'array' in value:
+            array = arrays.get(value['array'])
+            if array is None:
+                raise KeyError(f"Array ``{value['array']}`` not found, upload it to /arrays")
+            resolved[name] = array
+    return resolved
+
+
+@functools.lru_cache(maxsize=32)
+def _filter_bank(dt, f0_range, damp):
+    """
+    Internal function returning the filter bank of a worker process, cached between jobs.
+    """
+    return FilterBank(dt, np.array(f0_range), damp)
+
+
+def _compute(request, arrays):
+    """
+    Internal function calculating the spectra of a job request (executed in a worker process).
+    """
+    freq_data = tuple(request['f0']) if 'f0' in request else np.asarray(request['f0_range'], dtype=float)
+    sd = SpecificationDevelopment(freq_data=freq_data, damp=request.get('damp'), Q=request.get('Q', 10), progress_bar=False)
+
+    load = dict(request['load'], **arrays)
+    load_type = load.pop('type')
+    if load_type == 'sine':
+        sd.set_sine_load(**load)
+    elif load_type == 'sine_sweep':
+        sd.set_sine_sweep_load(**load)
+    elif load_type == 'random_psd':
+        sd.set_random_load((load.pop('psd_data'), load.pop('psd_freq')), **load)
+    elif load_type == 'random_time':
+        dt = float(load.pop('dt'))
+        sd.filter_bank = _filter_bank(dt, tuple(sd.f0_range), sd.damp)
+        sd.set_random_load((load.pop('time_data'), dt), **load)
+
+    sd.get_ers()
+    result = {'f0_range': sd.f0_range, 'ers': sd.ers}
+    if request.get('fds') is not None:
+        sd.get_fds(**request['fds'])
+        result['fds'] = sd.fds
+    return result
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Internal HTTP request handler of `SpectrumService`.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        if content_type == 'application/json':
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) < 2 or parts[0] != 'jobs' or parts[1] not in self.server.service.jobs:
+            self._send(404, {'error': 'Job not found'})
+            return None, parts
+        return self.server.service.jobs[parts[1]], parts
+
+    def do_POST(self):
+        service = self.server.service
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            if self.path == '/arrays':
+                array_id, array = service.add_array(body)
+                self._send(201, {'id': array_id, 'shape': list(array.shape), 'dtype': str(array.dtype)})
+            elif self.path == '/jobs':
+                job = service.submit(json.loads(body))
+                if job is None:
+                    self._send(503, {'error': 'Job queue is full'})
+                else:
+                    self._send(202, {'id': job['id'], 'status': job['status']})
+            else:
+                self._send(404, {'error': 'Not found'})
+        except ArrayTooLarge as e:
+            self._send(413, {'error': str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok'})
+            return
+
+        job, parts = self._job()
+        if job is None:
+            return
+        future = job['future']  # set to None when the job finishes
+        if job['status'] == 'queued' and future is not None and future.running():
+            job['status'] = 'running'
+
+        if len(parts) == 2:
+            self._send(200, {'id': job['id'], 'status': job['status'], 'error': job['error']})
+        elif len(parts) == 3 and parts[2] == 'result':
+            if job['status'] != 'done':
+                self._send(409, {'error': f"Job is {job['status']}", 'status': job['status']})
+                return
+            result = self.server.service.result(job)
+            if result is None:
+                self._send(410, {'error': 'Result is no longer cached'})
+            else:
+                self._send(200, result, content_type='application/octet-stream')
+        else:
+            self._send(404, {'error': 'Not found'})
+
+    def do_DELETE(self):
+        job, parts = self._job()
+        if job is None:
+            return
+        future = job['future']
+        cancelled = future is not None and future.cancel()
+        self._send(200, {'id': job['id'], 'cancelled': cancelled})
+
+
+def main(argv=None):
+    """
+    Run the service from the command line.
+    """
+    parser = argparse.ArgumentParser(description='FatigueDS ERS/FDS service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-queue', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    service = SpectrumService(args.host, args.port, n_workers=args.workers, max_queue=args.max_queue)
+    print(f'Serving on {service.url}')
+    service.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
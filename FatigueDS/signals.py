@@ -1,10 +1,13 @@
 import numpy as np
-import scipy.integrate
+from scipy import signal
 from scipy.special import gamma
 from tqdm import tqdm
 import rainflow
 
 from . import tools  # Local import at the end
+from . import backends
+
+SRS_TYPES = ['primary_positive', 'primary_negative', 'residual_positive', 'residual_negative', 'maximax']
 
 # tudi tukaj imam pomislek, zakaj je to ločena funkcija in ne metoda classa, saj 1. vzame v input samo class, 2. vrne vrednost nazaj v calss 3. ni uporabljena izven tega classa
 # velja tudi za vse ostale funkcije tukaj
@@ -53,26 +56,28 @@ def sine_sweep(self, output=None):
             h2 = f2 / self.f0_range[i]
 
             if output == 'FDS':
+                # integration grid in the selected precision (numpy scalars would promote it to float64)
+                h1, h2, f0_i = float(h1), float(h2), float(self.f0_range[i])
                 if self.sweep_type is None:
                     raise ValueError("You need to provide either ['linear','lin'] or ['logarithmic','log'] sweep_type.")
                 elif self.sweep_type in ['lin', 'linear']:
                     tb = (self.const_f_range[-1] - self.const_f_range[0]) / self.sweep_rate * 60  # sinusoidal sweep time [s] -> from [Hz/min]
-                    dh = (f2 - f1) * self.dt / (self.f0_range[i] * tb)
-                    h = np.arange(h1, h2, dh)
+                    dh = (f2 - f1) * self.dt / (f0_i * tb)
+                    h = h1 + np.arange(np.ceil((h2 - h1) / dh), dtype=self.dtype) * dh  # same grid as np.arange(h1, h2, dh), without accumulating the step
                     M_h = h**2 / (h2 - h1)
                 elif self.sweep_type in ['log', 'logarithmic']:
-                    tb = 60 * np.log(self.const_f_range[-1] / self.const_f_range[0]) / (self.sweep_rate * np.log(2))  # logarithmic sweep time [s] -> from [oct./min]
-                    t = np.arange(0, tb, self.dt)
-                    T1 = tb / np.log(h2 / h1)
+                    tb = float(60 * np.log(self.const_f_range[-1] / self.const_f_range[0]) / (self.sweep_rate * np.log(2)))  # logarithmic sweep time [s] -> from [oct./min]
+                    t = np.arange(0, tb, self.dt, dtype=self.dtype)
+                    T1 = tb / float(np.log(h2 / h1))
                     f_t = f1 * np.exp(t / T1)
-                    dh = f1 / (T1 * self.f0_range[i]) * np.exp(t / T1) * self.dt
-                    h = f_t / self.f0_range[i]
-                    M_h = h / (np.log(h2 / h1))
+                    dh = f1 / (T1 * f0_i) * np.exp(t / T1) * self.dt
+                    h = f_t / f0_i
+                    M_h = h / float(np.log(h2 / h1))
                 else:
                     raise ValueError(f"Invalid method `method`='{self.sweep_type}'. Supported sweep types: 'lin' and 'log'.")
             
                 const = self.p**self.k / self.C * self.f0_range[i] * tb * amp**self.k * omega_0i**(self.k * (self.a - 2))
-                integral = scipy.integrate.trapezoid(M_h * h**(self.a * self.k - 1) / ((1 - h**2)**2 + (h / self.Q)**2)**(self.k / 2), x=h)
+                integral = backends.get('sweep_integral')(h, M_h, self.a, self.k, self.Q)
                 fds[i] += const * integral
 
             elif output == 'ERS':
@@ -130,10 +135,105 @@ def random_psd(self, output=None):
         z_rms *= self.unit_scale
         dz_rms *= self.unit_scale
         n0 = 1 / np.pi * dz_rms / z_rms
-        fds = self.p**self.k / self.C * n0 * self.T * (z_rms * np.sqrt(2))**self.k * gamma(1 + self.k / 2)
+        spectral_method = getattr(self, 'spectral_method', 'narrowband')
+        if spectral_method == 'narrowband':
+            fds = self.p**self.k / self.C * n0 * self.T * (z_rms * np.sqrt(2))**self.k * gamma(1 + self.k / 2)
+        else:
+            # broadband spectral methods need the response spectral moments, including m1
+            moments = tools.spectral_moments(f_0=self.f0_range, psd_freq=self.psd_freq, psd_data=self.psd_data * self.unit_scale**2, damp=self.damp)
+            d = tools.spectral_damage_intensity(*moments, k=self.k, method=spectral_method)
+            fds = self.p**self.k / self.C * 2 * self.T * d  # *2, because fds theory is defined for half cycles (as ``n0`` above)
         return fds
 
 
+def random_psd_sensitivity(self, output=None):
+    """
+    Internal function for calculating ERS or FDS of a random signal in frequency domain, together with its derivatives
+    with respect to the PSD values (sensitivity matrix of shape (n_f0, n_bins)).
+
+    The response moments are linear in the PSD, ``m = W @ psd_data`` (see `tools.integral_weights`), so the derivatives 
+    of the spectrum follow from the chain rule with the weight matrices ``W``, which are calculated once for the spectrum
+    and its derivatives. The derivatives of the ERS and of the narrowband FDS with respect to the moments are in closed
+    form; the derivatives of the damage intensity of the broadband spectral methods (see `tools.spectral_damage_intensity`)
+    with respect to the four moments are central differences.
+    """
+    omega_0 = 2 * np.pi * self.f0_range
+    C0 = np.pi / (4 * self.damp)
+    # squared RMS of the relative displacement and velocity, W @ psd_data
+    W_disp = (C0 / ((2 * np.pi)**4 * self.f0_range**3))[:, None] * tools.integral_weights(self.f0_range, self.psd_freq, self.damp, 0)
+    W_vel = (C0 / ((2 * np.pi)**2 * self.f0_range))[:, None] * tools.integral_weights(self.f0_range, self.psd_freq, self.damp, 2)
+    z_rms_2 = W_disp @ self.psd_data
+    dz_rms_2 = W_vel @ self.psd_data
+
+    if output == 'ERS':
+        # ers = omega_0**2 * z_rms * sqrt(2 * log(n0 * T)), n0 = 1 / pi * dz_rms / z_rms
+        log_n0_T = np.log(1 / np.pi * np.sqrt(dz_rms_2 / z_rms_2) * self.T)
+        ers = omega_0**2 * np.sqrt(z_rms_2) * np.sqrt(2 * log_n0_T)
+        d_z_rms_2 = omega_0**2 / (2 * np.sqrt(z_rms_2)) * (np.sqrt(2 * log_n0_T) - 1 / np.sqrt(2 * log_n0_T))
+        d_dz_rms_2 = omega_0**2 * np.sqrt(z_rms_2) / (2 * dz_rms_2 * np.sqrt(2 * log_n0_T))
+        return ers, d_z_rms_2[:, None] * W_disp + d_dz_rms_2[:, None] * W_vel
+
+    elif output == 'FDS':
+        spectral_method = getattr(self, 'spectral_method', 'narrowband')
+        if spectral_method == 'narrowband':
+            # fds = p**k / C * n0 * T * (sqrt(2) * z_rms)**k * gamma(1 + k / 2), proportional to dz_rms_2**(1/2) * z_rms_2**((k-1)/2)
+            n0 = 1 / np.pi * np.sqrt(dz_rms_2 / z_rms_2)
+            fds = self.p**self.k / self.C * n0 * self.T * (np.sqrt(2 * z_rms_2) * self.unit_scale)**self.k * gamma(1 + self.k / 2)
+            return fds, (fds * (self.k - 1) / (2 * z_rms_2))[:, None] * W_disp + (fds / (2 * dz_rms_2))[:, None] * W_vel
+        
+        W = [self.unit_scale**2 * tools.spectral_moment_scale(self.f0_range, self.damp, b)[:, None] 
+             * tools.integral_weights(self.f0_range, self.psd_freq, self.damp, b) for b in [0, 1, 2, 4]]
+        moments = [W_b @ self.psd_data for W_b in W]
+        K = self.p**self.k / self.C * 2 * self.T  # *2, because fds theory is defined for half cycles (see `random_psd`)
+        fds = K * tools.spectral_damage_intensity(*moments, k=self.k, method=spectral_method)
+        sensitivity = np.zeros((len(self.f0_range), len(self.psd_data)))
+        for j, W_j in enumerate(W):
+            step = 1e-5 * moments[j]
+            plus, minus = list(moments), list(moments)
+            plus[j] = moments[j] + step
+            minus[j] = moments[j] - step
+            d_moment = K * (tools.spectral_damage_intensity(*plus, k=self.k, method=spectral_method)
+                            - tools.spectral_damage_intensity(*minus, k=self.k, method=spectral_method)) / (2 * step)
+            sensitivity += d_moment[:, None] * W_j
+        return fds, sensitivity
+
+
+def shock(self):
+    """
+    Internal function for calculating the shock response spectra (SRS) of a set of transient events.
+
+    The relative displacement responses of all events are calculated at once with the recursive SDOF filter 
+    (see `tools.sdof_filter_coefficients`), applied along the time axis of blocks of events. The residual response 
+    (free vibration after the event) is obtained by continuing the filter from its final state with zero input over one 
+    natural period, where its maxima occur. Maxima are given as equivalent accelerations ``-omega_0**2 * z`` in the unit 
+    of the load, so a positive base pulse gives a positive primary SRS (Lalanne's convention); negative maxima are given
+    as magnitudes. The maximax SRS is the largest of the four maxima.
+    """
+    shock_data = self.shock_data
+    n_events, N = shock_data.shape
+    b, a = tools.sdof_filter_coefficients(self.f0_range, self.dt, self.damp)
+    block = max(1, tools.BLOCK_SIZE // N)
+
+    srs = {name: np.zeros((n_events, len(self.f0_range))) for name in SRS_TYPES}
+    for start in range(0, n_events, block):
+        x = tools.scaled_signal(shock_data[start:start + block], dtype=self.dtype)
+        events = slice(start, start + len(x))
+        for i, f_0 in enumerate(self.f0_range):
+            b_i, a_i = b[i].astype(self.dtype), a[i].astype(self.dtype)
+            z, z_f = signal.lfilter(b_i, a_i, x, axis=1, zi=np.zeros((len(x), 2), dtype=self.dtype))
+            n_residual = int(np.ceil(1 / (f_0 * self.dt))) + 1
+            z_residual, _ = signal.lfilter(b_i, a_i, np.zeros((len(x), n_residual), dtype=self.dtype), axis=1, zi=z_f)
+
+            omega_0_2 = (2 * np.pi * f_0)**2
+            srs['primary_positive'][events, i] = -np.min(z, axis=1) * omega_0_2
+            srs['primary_negative'][events, i] = np.max(z, axis=1) * omega_0_2
+            srs['residual_positive'][events, i] = -np.min(z_residual, axis=1) * omega_0_2
+            srs['residual_negative'][events, i] = np.max(z_residual, axis=1) * omega_0_2
+    
+    srs['maximax'] = np.max([srs[name] for name in SRS_TYPES[:4]], axis=0)
+    return srs
+
+
 def random_time(self, output=None):
     """
     Internal function for calculating ERS and FDS of a sine random signal in time domain.
@@ -141,8 +241,11 @@ def random_time(self, output=None):
 
     if output == 'ERS':
         ers = np.zeros(len(self.f0_range))
-        for i in tqdm(range(len(self.f0_range))):               
-            z = tools.response_relative_displacement(self.time_data, self.dt, f_0=self.f0_range[i], damp=self.damp)
+        for i in tqdm(range(len(self.f0_range)), disable=not self.progress_bar):               
+            if self.repeat > 1:
+                z = np.concatenate(tools.repeated_turning_points(self, self.f0_range[i])[:2])
+            else:
+                z = tools.response_turning_points(self, self.f0_range[i])
             R_i = np.max(z) * (2 * np.pi * self.f0_range[i])**2 
             ers[i] = R_i
         return ers
@@ -150,12 +253,14 @@ def random_time(self, output=None):
     if output == 'FDS':
         fds = np.zeros(len(self.f0_range))
         
-        for i in tqdm(range(len(self.f0_range))):                    
-            z = tools.response_relative_displacement(self.time_data * self.unit_scale, self.dt, f_0=self.f0_range[i], damp=self.damp)
+        for i in tqdm(range(len(self.f0_range)), disable=not self.progress_bar):                    
+            if self.repeat > 1:
+                # rainflow residue of the repetitions is counted, the damage is extrapolated to all repetitions
+                cyc_sum = tools.repeated_rainflow_damage(*tools.repeated_turning_points(self, self.f0_range[i]), self.k)
+            else:
+                cyc_sum = backends.get('rainflow_damage')(tools.response_turning_points(self, self.f0_range[i]), self.k)
             
-            rf = rainflow.count_cycles(z)
-            rf = np.asarray(rf)
-            cyc_sum = np.sum(rf[:,1] * 2 * (rf[:,0] / 2)**self.k)  # *2 and /2 because rainflow returns cycles and ranges, fds theory is defined for half cycles and amplitudes
+            cyc_sum *= self.unit_scale**self.k  # response is linear in the load
             D_i = self.p**self.k / (self.C) * cyc_sum
             fds[i] = D_i
         return fds
@@ -4,14 +4,17 @@ from scipy.special import gamma
 import rainflow
 
 from . import tools
-from . import signals
+from . import compute
+from . import jobs
+from . import planner
+from .cache import ResponseCache
 
 
 class SpecificationDevelopment:
     # mislim, da je v tej obliki paketa poimenovanje classa SpecificationDevelopment zavajajoče. Specifikacij ni nikjer omenjenih, mogoče bi 
     # preimenovali v nekaj, kar je bolj vezano na FatigueDS. Mogoče parent FDS in ERS, ki je enostavno Spectrum?
 
-    def __init__(self, freq_data=(10, 2000, 5), damp=None, Q=10):
+    def __init__(self, freq_data=(10, 2000, 5), damp=None, Q=10, cache_size=256 * 1024**2, dtype=np.float64, progress_bar=True, filter_bank=None):
         """
         Initialize the SpecificationDevelopment class. Frequency range and damping ratio/Q-factor must be provided.
         Only one of the damping ratio or Q-factor must be provided. If both are provided, damping ratio will be used. If None, Q=10 will be used.
@@ -19,8 +22,24 @@ class SpecificationDevelopment:
         :param freq_data: tuple containing (f0_start, f0_stop, f0_step) [Hz] or a frequency vector, defining the range where the ERS and FDS will be calculated
         :param damp: damping ratio [/]
         :param Q: damping Q-factor [/] (default: Q=10)
+        :param cache_size: memory budget for caching SDOF responses of random time signals between ``get_ers`` and ``get_fds`` calls [bytes] (default: 256 MB). Use 0 to disable caching.
+        :param dtype: floating point precision of the SDOF responses (random time signal) and sweep integration grids (sine sweep signal), 
+            ``np.float64`` or ``np.float32`` (default: np.float64). Damage sums are always accumulated in ``np.float64``. 
+            With ``np.float32`` the memory footprint of these arrays is halved; the ERS and FDS typically deviate from the ``np.float64`` result by
+            less than 1e-4 (relative), except for FDS values that underflow the ``np.float32`` range (e.g. natural frequencies far below the sweep range).
+        :param progress_bar: show a progress bar for the time domain (convolution) calculation (default: True)
+        :param filter_bank: precomputed `FilterBank` for random time signals. If provided, ``freq_data``, ``damp`` and ``Q`` 
+            are taken from the filter bank (default: None)
         """
 
+        self.progress_bar = progress_bar
+
+        if dtype not in [np.float32, np.float64]:
+            raise ValueError('Invalid ``dtype``. Supported types: ``np.float32`` and ``np.float64``')
+        self.dtype = dtype
+
+        self._response_cache = ResponseCache(max_bytes=cache_size)
+
         # check freq_data input
         if (isinstance(freq_data, tuple) and len(freq_data) == 3) or (
             isinstance(freq_data, np.ndarray) and freq_data.ndim == 1
@@ -33,6 +52,22 @@ class SpecificationDevelopment:
         if isinstance(damp, (int, float)) or isinstance(Q, (int, float)):
             tools.convert_Q_damp(self, Q=Q, damp=damp)
 
+        self.filter_bank = filter_bank
+        if filter_bank is not None:
+            self.f0_range = filter_bank.f0_range.copy()
+            tools.convert_Q_damp(self, damp=filter_bank.damp)
+
+
+    def __getattr__(self, name):
+        """
+        Load parameters (e.g. ``signal_type``, ``time_data``, ``T``) are read from the immutable load object ``self.load``,
+        set by the ``set_*_load`` methods (see `compute.Load`).
+        """
+        load = self.__dict__.get('load')
+        if load is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return getattr(load, name)
+
 
     def set_sine_load(self, sine_freq=None, amp=None, t_total=None, exc_type='acc', unit='ms2'):
         """
@@ -45,36 +80,7 @@ class SpecificationDevelopment:
         :param unit: unit of the signal (supported: 'g' and 'ms2') Parameter only needed for fds calculation
         """
 
-        self.signal_type = 'sine'
-
-        if all([sine_freq, amp, exc_type]):
-            self.sine_freq = sine_freq
-            self.amp = amp
-            self.exc_type = exc_type
-        else:    
-            raise ValueError('Missing parameter(s). ``sine_freq`` and ``amp`` must be provided')
-        
-        if isinstance(t_total, (int, float)):
-            self.t_total = t_total
-
-            
-        if self.exc_type in ['acc', 'vel', 'disp']:            
-            if self.exc_type == 'acc':
-                self.a = 0
-            elif self.exc_type == 'vel':
-                self.a = 1
-            elif self.exc_type == 'disp':
-                self.a = 2
-        else:
-            raise ValueError(f"Invalid excitation type. Supported types: ``acc``, ``vel`` and ``disp``.")
-        
-        if unit == 'g':
-            self.unit_scale = 9.81
-        elif unit == 'ms2':
-            self.unit_scale = 1
-        else:
-            raise ValueError("Invalid unit selected. Supported units: 'g' and 'ms2'.")
-
+        self.load = compute.sine_load(sine_freq=sine_freq, amp=amp, t_total=t_total, exc_type=exc_type, unit=unit)
 
 
     def set_sine_sweep_load(self, const_amp=None, const_f_range=None, exc_type='acc', dt=1, sweep_type=None, sweep_rate=None, unit='ms2'):
@@ -90,118 +96,96 @@ class SpecificationDevelopment:
         :param unit: unit of the signal (supported: 'g' and 'ms2') Parameter only needed for fds calculation
         """
         
-        self.signal_type = 'sine_sweep'
-        if None not in [const_amp, const_f_range, exc_type, dt, sweep_type, sweep_rate]:
-            # necessary parameters
-            self.const_amp = const_amp
-            self.const_f_range = const_f_range
-            self.sweep_type = sweep_type
-            self.sweep_rate = sweep_rate
-            # optional parameters
-            self.exc_type = exc_type
-            self.dt = dt
-        else:
-            raise ValueError('Missing parameter(s). ``const_amp``, ``const_f_range``, ``sweep_type`` and ``sweep_rate`` must be provided')
-
-        if self.exc_type in ['acc','vel','disp']:   
-            if self.exc_type == 'acc':
-                self.a = 0
-            elif self.exc_type == 'vel':
-                self.a = 1
-            elif self.exc_type == 'disp':
-                self.a = 2
-        else:
-            raise ValueError(f"Invalid excitation type. Supported types: ``acc``, ``vel`` and ``disp``.")
-
-        if unit == 'g':
-            self.unit_scale = 9.81
-        elif unit == 'ms2':
-            self.unit_scale = 1        
-        else:
-            raise ValueError("Invalid unit selected. Supported units: 'g' and 'ms2'.")
+        self.load = compute.sine_sweep_load(const_amp=const_amp, const_f_range=const_f_range, exc_type=exc_type, dt=dt, 
+                                            sweep_type=sweep_type, sweep_rate=sweep_rate, unit=unit)
                 
 
-    def set_random_load(self, signal_data=None, T=None, unit='ms2', method='convolution', bins=None):
+    def set_random_load(self, signal_data=None, T=None, unit='ms2', method='convolution', bins=None, multirate=False, window='boxcar', overlap=0.5, scale=1, offset=0,
+                        repeat=1):
         """
         Set random signal load parameters
 
         :param signal_data: tuple containing (time history data, dt) or (psd data, frequency vector)
         :param T: time duration [s]
         :param unit: unit of the signal (supported: 'g' and 'ms2') Parameter only needed for fds calculation
-        :param method: method to calculate ERS and FDS (supported: 'convolution' and 'psd_averaging'). Only needed for random time signal
-        :param bins: number of bins for PSD averaging method. Only neede for psd averaging method
+        :param method: method to calculate ERS and FDS (supported: 'convolution', 'psd_averaging' and 'segmented'). Only needed for random time signal.
+            The 'segmented' method splits a piecewise stationary time history (e.g. a drive recording) into stationary segments, 
+            calculates the ERS and FDS of each segment from its PSD, sums the FDS and takes the envelope of the ERS (see `tools.segmented_psd`)
+        :param bins: number of bins for PSD averaging method. Only neede for psd averaging method (and the window length ``len(time_data) // bins`` of the segmented method)
+        :param multirate: compute SDOF responses of low natural frequencies on decimated copies of the time history (see `tools.multirate_factor`). Only used for convolution method (default: False)
+        :param window: window of the segments for PSD averaging method, see `scipy.signal.get_window` (default: 'boxcar')
+        :param overlap: overlap of the segments for PSD averaging method, as a fraction of the segment length (default: 0.5)
+        :param scale: calibration factor of raw time history data, the signal is ``scale * time_data + offset`` (default: 1)
+        :param offset: offset of raw time history data (default: 0)
+        :param repeat: number of repetitions of the time history, e.g. of a durability drive file that is looped in a test (default: 1).
+            With the convolution method, the responses are calculated for the first repetitions and one steady-state repetition, and the 
+            damage is extrapolated to all repetitions (see `tools.repeated_turning_points`), so the cost does not depend on ``repeat``. 
+            Not supported with the multirate scheme.
+
+        Time history data can be an integer array (e.g. raw DAQ counts) or a memory-mapped file (``np.memmap``, ``np.load(..., mmap_mode='r')``).
+        It is not copied: the conversion to floating point and the scaling are applied block by block when the SDOF responses 
+        are calculated (see `tools.filtered_turning_points`).
         """
 
-        # Signal data must be a tuple
-        if isinstance(signal_data, tuple) and len(signal_data) == 2:
-        
         # If input is time signal
-            if isinstance(signal_data[0], np.ndarray) and isinstance(signal_data[1], (int, float)):
-                self.signal_type = 'random_time'
-                self.time_data = signal_data[0]  # time-history
-                self.dt = signal_data[1] # Sampling interval
-
-                if method in ['convolution', 'psd_averaging']:
-                    self.method = method
-
-                else:
-                    raise ValueError('Invalid method. Supported methods: ``convolution`` and ``psd_averaging``')
-
-                if isinstance(bins, int):
-                    self.bins = bins
-                if isinstance(T, (int, float)):
-                    print('Time duration ``T`` is not needed for random time signal')
-                self.T = len(self.time_data) * self.dt
-        
-        # If input is PSD
-            elif isinstance(signal_data[0], np.ndarray) and isinstance(signal_data[1], np.ndarray):
-                self.signal_type = 'random_psd'
-                self.psd_data = signal_data[0]
-                self.psd_freq = signal_data[1]
-                
-                if isinstance(T, (int, float)):
-                    self.T = T
-                else:
-                    raise ValueError('Time duration ``T`` must be provided')
-
-            else:
-                raise ValueError('Invalid input. Expected a tuple containing (time history data, fs) or (psd data, frequency vector)')
+        if isinstance(signal_data, tuple) and len(signal_data) == 2 and isinstance(signal_data[0], np.ndarray) and isinstance(signal_data[1], (int, float)):
+            if self.filter_bank is not None and not self.filter_bank.matches(signal_data[1], self.damp):
+                raise ValueError('Time step ``dt`` and damping of the load must match the filter bank')
             
+            # new load invalidates the cached responses
+            self._response_cache.clear()
 
-        if unit == 'g':
-            self.unit_scale = 9.81
-        elif unit == 'ms2':
-            self.unit_scale = 1
-        else:
-            raise ValueError("Invalid unit selected. Supported units: 'g' and 'ms2'.")
+        self.load = compute.random_load(signal_data=signal_data, T=T, unit=unit, method=method, bins=bins, multirate=multirate, window=window, 
+                                        overlap=overlap, scale=scale, offset=offset, repeat=repeat)
+
+
+    def set_shock_load(self, shock_data=None, dt=None, unit='ms2'):
+        """
+        Set shock load: a set of transient events (e.g. pyroshocks or drops) of equal length, sampled with the time step ``dt``.
+        The events are calculated together with `get_srs`.
+
+        :param shock_data: acceleration time history of one event (1D array) or of many events (2D array of shape (n_events, n_samples))
+        :param dt: time step [s]
+        :param unit: unit of the signal (supported: 'g' and 'ms2')
+        """
+        self.load = compute.shock_load(shock_data=shock_data, dt=dt, unit=unit)
 
 
-    def get_ers(self):
+    def get_ers(self, adaptive=False, tol=1e-2, sensitivity=False):
         """
         get extreme response spectrum (ERS) of a signal.
 
         The unit of the ERS corresponds to the unit of the signal, no scaling is applied.
 
+        If ``adaptive`` is True, the uniform frequency range is replaced by a non-uniform one: the ERS is first calculated
+        on a coarse logarithmic grid between the first and the last natural frequency, which is then refined only where the 
+        log-log interpolation error exceeds ``tol`` (see `tools.adaptive_freq_range`). The refined grid is stored in ``f0_range``.
+
+        If ``sensitivity`` is True (random PSD loads only), the derivatives of the ERS with respect to the PSD values 
+        (e.g. for gradient-based optimisation of a test PSD) are calculated together with the ERS and stored in 
+        ``ers_sensitivity``, an array of shape (n_f0, n_bins).
+
+        :param adaptive: adaptively refine the natural frequency range (default: False)
+        :param tol: relative interpolation error tolerance of the adaptive refinement (default: 1e-2)
+        :param sensitivity: calculate the sensitivity matrix (default: False)
+
+        :return: sensitivity matrix, if ``sensitivity`` is True
         """        
-        if self.signal_type == 'sine':
-            self.ers = signals.sine(self, output='ERS')
-        
-        if self.signal_type == 'sine_sweep':
-            self.ers = signals.sine_sweep(self, output='ERS')
-        
-        if self.signal_type == 'random_psd':
-            self.ers = signals.random_psd(self, output='ERS')
-        
-        if self.signal_type == 'random_time':
-            if self.method == 'convolution':
-                self.ers = signals.random_time(self, output='ERS')   
-            elif self.method == 'psd_averaging':
-                tools.psd_averaging(self)
-                self.ers = signals.random_psd(self, output='ERS')
-                
+        if sensitivity:
+            if adaptive:
+                raise ValueError('Sensitivities are not available with the adaptive natural frequency range')
+            self.ers, self.ers_sensitivity = self._spectrum('ERS', sensitivity=True)
+            return self.ers_sensitivity
+
+        if hasattr(self, 'ers_sensitivity'):
+            del self.ers_sensitivity  # no longer matches the recalculated ERS
+        if adaptive:
+            self._set_adaptive_spectrum('ERS', tol)
+        else:
+            self.ers = self._spectrum('ERS')
 
 
-    def get_fds(self, k, C=1, p=1):
+    def get_fds(self, k, C=1, p=1, spectral_method='narrowband', adaptive=False, tol=1e-2, sensitivity=False):
         """
         get fatigue damage spectrum (FDS) of a signal.
 
@@ -233,83 +217,240 @@ class SpecificationDevelopment:
         :param k: S-N curve slope from Basquin equation
         :param C: material constant from Basquin equation (default: C=1)
         :param p: constant of proportionality between stress and deformation (default: p=1)
+        :param spectral_method: damage estimator for PSD-based calculation (random PSD, ``psd_averaging`` and ``segmented`` methods); supported: 
+            'narrowband', 'dirlik', 'tovo_benasciutti' and 'zhao_baker' (default: 'narrowband'). See `tools.spectral_damage_intensity`.
+        :param adaptive: adaptively refine the natural frequency range, see `get_ers` (default: False)
+        :param tol: relative interpolation error tolerance of the adaptive refinement (default: 1e-2)
+        :param sensitivity: calculate the derivatives of the FDS with respect to the PSD values (random PSD loads only), stored in 
+            ``fds_sensitivity``, see `get_ers` (default: False)
+
+        :return: sensitivity matrix, if ``sensitivity`` is True
         """
         
-        if all(isinstance(attr, (int, float)) for attr in [k, C, p]):
-            self.k = k
-            self.C = C
-            self.p = p
+        compute.check_fds_parameters(k, C, p, spectral_method)
+        self.k = k
+        self.C = C
+        self.p = p
+        self.spectral_method = spectral_method
+
+        if sensitivity:
+            if adaptive:
+                raise ValueError('Sensitivities are not available with the adaptive natural frequency range')
+            self.fds, self.fds_sensitivity = self._spectrum('FDS', sensitivity=True)
+            return self.fds_sensitivity
+
+        if hasattr(self, 'fds_sensitivity'):
+            del self.fds_sensitivity  # no longer matches the recalculated FDS
+        if adaptive:
+            self._set_adaptive_spectrum('FDS', tol)
+        else:
+            self.fds = self._spectrum('FDS')
+
+
+    def get_srs(self):
+        """
+        get shock response spectra (SRS) of the events of a shock load (see `set_shock_load`).
+
+        The SRS are stored in ``srs``, a dictionary with the primary (during the event) and residual (after the event) 
+        positive and negative maxima and the maximax SRS (keys ``'primary_positive'``, ``'primary_negative'``, 
+        ``'residual_positive'``, ``'residual_negative'`` and ``'maximax'``), arrays of shape (n_events, n_f0). The maxima 
+        are equivalent accelerations ``-omega_0**2 * z`` in the unit of the signal, so a positive pulse gives a positive 
+        primary SRS; negative maxima are given as magnitudes.
+        """
+        self.srs = compute.srs(self.load, self.f0_range, self.damp, dtype=self.dtype)
+
+
+    def submit_ers(self, executor=None, chunk_size=8, progress=None, time_budget=None):
+        """
+        Submit the calculation of the extreme response spectrum (ERS) to an executor, without blocking. 
+        The result is not stored in ``ers``; it is returned by the returned job (see `jobs.submit_ers`).
+
+        :param executor: ``concurrent.futures`` executor running the job (default: None, shared thread pool)
+        :param chunk_size: number of natural frequencies calculated between progress events and cancellation checks (default: 8)
+        :param progress: callback receiving progress events (default: None)
+        :param time_budget: time budget [s], after which the partially completed spectrum is returned (default: None, no limit)
+
+        :return: `jobs.Job`
+        """
+        return jobs.submit_ers(self.load, self.f0_range.copy(), self.damp, executor=executor, chunk_size=chunk_size, progress=progress,
+                               time_budget=time_budget, dtype=self.dtype, cache=self._response_cache, filter_bank=self.filter_bank)
+
+
+    def submit_fds(self, k, C=1, p=1, spectral_method='narrowband', executor=None, chunk_size=8, progress=None, time_budget=None):
+        """
+        Submit the calculation of the fatigue damage spectrum (FDS) to an executor, without blocking. 
+        The result is not stored in ``fds``; it is returned by the returned job (see `jobs.submit_fds`).
+
+        :param k: S-N curve slope from Basquin equation
+        :param C: material constant from Basquin equation (default: C=1)
+        :param p: constant of proportionality between stress and deformation (default: p=1)
+        :param spectral_method: damage estimator for PSD-based calculation, see `get_fds` (default: 'narrowband')
+        :param executor: ``concurrent.futures`` executor running the job (default: None, shared thread pool)
+        :param chunk_size: number of natural frequencies calculated between progress events and cancellation checks (default: 8)
+        :param progress: callback receiving progress events (default: None)
+        :param time_budget: time budget [s], after which the partially completed spectrum is returned (default: None, no limit)
+
+        :return: `jobs.Job`
+        """
+        return jobs.submit_fds(self.load, self.f0_range.copy(), self.damp, k, C=C, p=p, spectral_method=spectral_method, executor=executor,
+                               chunk_size=chunk_size, progress=progress, time_budget=time_budget, dtype=self.dtype,
+                               cache=self._response_cache, filter_bank=self.filter_bank)
+
+
+    def plan(self, output='ERS', k=None, C=1, p=1, spectral_method='narrowband', tol=1e-6, memory_budget=None):
+        """
+        Estimate the runtime and memory of the calculation paths of the ERS or FDS and select the fastest path that meets 
+        the tolerance and the memory budget (see `planner.Plan`). Nothing is calculated until ``run`` is called on the plan::
+
+            plan = sd.plan('FDS', k=5, tol=1e-2, memory_budget=2 * 1024**3)
+            print(plan.dry_run())
+            sd.fds = plan.run()
+
+        :param output: 'ERS' or 'FDS' (default: 'ERS')
+        :param k: S-N curve slope from Basquin equation, required for the FDS (default: None)
+        :param C: material constant from Basquin equation (default: C=1)
+        :param p: constant of proportionality between stress and deformation (default: p=1)
+        :param spectral_method: damage estimator for PSD-based calculation, see `get_fds` (default: 'narrowband')
+        :param tol: accepted nominal relative error of the calculation path (default: 1e-6, exact paths only)
+        :param memory_budget: memory budget [bytes] (default: None, no limit)
+
+        :return: `planner.Plan`
+        """
+        return planner.Plan(self.load, self.f0_range, self.damp, output=output, k=k, C=C, p=p, spectral_method=spectral_method,
+                            dtype=self.dtype, tol=tol, memory_budget=memory_budget)
+
+
+    def add_frequencies(self, freq_data):
+        """
+        Extend the natural frequency range ``f0_range`` of an existing object.
+
+        Already calculated spectra (ERS and/or FDS) are only calculated at the new natural frequencies and merged 
+        into ``ers``/``fds``; the frequency range stays sorted. Frequencies already in ``f0_range`` are ignored.
+        Sensitivity matrices (``ers_sensitivity``/``fds_sensitivity``) are extended with the rows of the new frequencies.
+
+        :param freq_data: tuple containing (f0_start, f0_stop, f0_step) [Hz] or a frequency vector of the added natural frequencies
+        """
+        if (isinstance(freq_data, tuple) and len(freq_data) == 3) or (
+            isinstance(freq_data, np.ndarray) and freq_data.ndim == 1
+        ):
+            f0_new = np.setdiff1d(tools.get_freq_range(self, freq_data), self.f0_range)
         else:
-            raise ValueError('Material parameters: k, C and p must be provided')
+            raise ValueError('``freq_data`` should be a tuple containing (f0_start, f0_stop, f0_step) [Hz] or a frequency vector')
 
-        if self.signal_type == 'sine':
-            self.fds = signals.sine(self, output='FDS')
+        if len(f0_new) == 0:
+            return
         
-        if self.signal_type == 'sine_sweep':
-            self.fds = signals.sine_sweep(self, output='FDS')
+        f0_range = np.concatenate((self.f0_range, f0_new))
+        order = np.argsort(f0_range, kind='stable')
+
+        for attr, output in [('ers', 'ERS'), ('fds', 'FDS')]:
+            if hasattr(self, attr + '_sensitivity'):
+                spectrum_new, sensitivity_new = self._spectrum(output, f0_new, sensitivity=True)
+                sensitivity = np.concatenate((getattr(self, attr + '_sensitivity'), sensitivity_new))
+                setattr(self, attr + '_sensitivity', sensitivity[order])
+            elif hasattr(self, attr):
+                spectrum_new = self._spectrum(output, f0_new)
+            else:
+                continue
+            spectrum = np.concatenate((getattr(self, attr), spectrum_new))
+            setattr(self, attr, spectrum[order])
         
-        if self.signal_type == 'random_psd':
-            self.fds = signals.random_psd(self, output='FDS')
+        self.f0_range = f0_range[order]
+
+
+    def _spectrum(self, output, f0_range=None, sensitivity=False):
+        """
+        Internal method for calculating the ERS or FDS (``output``) on the natural frequencies ``f0_range`` (default: ``self.f0_range``).
+        """
+        if f0_range is None:
+            f0_range = self.f0_range
+        options = dict(dtype=self.dtype, cache=self._response_cache, filter_bank=self.filter_bank, progress_bar=self.progress_bar,
+                       sensitivity=sensitivity)
+
+        if output == 'ERS':
+            return compute.ers(self.load, f0_range, self.damp, **options)
+        elif output == 'FDS':
+            return compute.fds(self.load, f0_range, self.damp, self.k, self.C, self.p, self.spectral_method, **options)
 
-        if self.signal_type == 'random_time':
-            if self.method == 'convolution':
-                self.fds = signals.random_time(self, output='FDS')   
-            elif self.method == 'psd_averaging':
-                tools.psd_averaging(self)
-                self.fds = signals.random_psd(self, output='FDS')
+
+    def _set_adaptive_spectrum(self, output, tol):
+        """
+        Internal method for calculating the ERS or FDS on an adaptively refined natural frequency range.
+        A previously calculated spectrum of the other type (and its sensitivity matrix) is removed, as it no longer matches 
+        ``f0_range``.
+        """
+        f0_range, spectrum = tools.adaptive_freq_range(self, output, self.f0_range[0], self.f0_range[-1], tol=tol, max_points=len(self.f0_range))
+
+        if not np.array_equal(f0_range, self.f0_range):
+            for attr in ['ers', 'fds', 'ers_sensitivity', 'fds_sensitivity']:
+                if hasattr(self, attr):
+                    delattr(self, attr)
+        
+        self.f0_range = f0_range
+        setattr(self, output.lower(), spectrum)
 
 
-    def plot_ers(self, new_figure=True, grid=True, *args, **kwargs):
+    def plot_ers(self, new_figure=True, grid=True, *args, ax=None, **kwargs):
         """
         Plot the extreme response spectrum (ERS) of the signal
 
         :param new_figure: create a new figure. Choose False for adding plot to existing Figure (default: True)
         :param grid: show grid (default: True)	
+        :param ax: matplotlib axes to plot on, without using the pyplot state; ``new_figure`` is ignored (default: None)
 
+        For collections of many spectra, see `plotting.plot_spectra` and `plotting.plot_percentile_bands`.
         """
         if hasattr(self, 'ers'):
-            if new_figure:
-                plt.figure()
-            plt.plot(self.f0_range, self.ers, *args, **kwargs)
-            plt.xlabel('Frequency [Hz]')
+            ax = self._plot_axes(new_figure, ax)
+            ax.plot(self.f0_range, self.ers, *args, **kwargs)
+            ax.set_xlabel('Frequency [Hz]')
             if self.unit_scale == 9.81:
-                plt.ylabel(f'ERS [g]')
+                ax.set_ylabel(f'ERS [g]')
             elif self.unit_scale == 1:
-                plt.ylabel(f'ERS [m/s²]')
-            plt.title('Extreme Response Spectrum')
+                ax.set_ylabel(f'ERS [m/s²]')
+            ax.set_title('Extreme Response Spectrum')
             # check if there are is label in kwargs and add legend
             if 'label' in kwargs:
-                plt.legend()
+                ax.legend()
 
             if grid:
-                plt.grid(visible=True)
+                ax.grid(visible=True)
             else:
-                plt.grid(visible=False)
+                ax.grid(visible=False)
         else:
             raise ValueError('ERS not calculated. Run get_ers method first')         
 
 
-    def plot_fds(self, new_figure=True, grid=True, *args, **kwargs):
+    def plot_fds(self, new_figure=True, grid=True, *args, ax=None, **kwargs):
         """
         Plot the fatigue damage spectrum (FDS) of the signal
+
+        :param new_figure: create a new figure. Choose False for adding plot to existing Figure (default: True)
+        :param grid: show grid (default: True)
+        :param ax: matplotlib axes to plot on, without using the pyplot state; ``new_figure`` is ignored (default: None)
         """
         if hasattr(self, 'fds'):
-            if new_figure:
-                plt.figure()
-            plt.semilogy(self.f0_range, self.fds, *args, **kwargs)
-            plt.xlabel('Frequency [Hz]')
-            plt.ylabel('FDS [Damage]')
+            ax = self._plot_axes(new_figure, ax)
+            ax.semilogy(self.f0_range, self.fds, *args, **kwargs)
+            ax.set_xlabel('Frequency [Hz]')
+            ax.set_ylabel('FDS [Damage]')
             if 'label' in kwargs:
-                plt.legend()
-            plt.title('Fatigue Damage Spectrum')    
+                ax.legend()
+            ax.set_title('Fatigue Damage Spectrum')    
             if grid:
-                plt.grid(visible=True)          
+                ax.grid(visible=True)          
             else:
-                plt.grid(visible=False)
+                ax.grid(visible=False)
         else:  
             raise ValueError('FDS not calculated. Run get_fds method first')  
 
 
-
-
-        
+    def _plot_axes(self, new_figure, ax):
+        """
+        Internal method returning the axes of a plot: ``ax``, or the current axes of a new or the current pyplot figure.
+        """
+        if ax is not None:
+            return ax
+        if new_figure:
+            plt.figure()
+        return plt.gca()
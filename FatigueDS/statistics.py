@@ -0,0 +1,140 @@
+from collections import Counter
+
+import numpy as np
+
+
+class SpectrumStatistics:
+    """
+    Running statistics of spectra (ERS or FDS) over many realizations or measured runs, in memory independent of their number.
+
+    Envelope (``max``, ``min``) and damage sum (``sum``) are updated directly, mean and variance with Welford's algorithm. 
+    Percentiles are estimated from a logarithmic histogram (DDSketch [1]) of each natural frequency, so every estimated 
+    percentile is within ``relative_accuracy`` of a value that lies between the neighbouring order statistics.
+
+    Statistics of different parts of a collection (e.g. calculated in different worker processes) can be combined with 
+    `merge`; the result is the same as if all spectra were added to one object (percentiles are merged exactly, mean and 
+    variance up to rounding).
+
+    References
+    ----------
+    1. C. Masson, J. E. Rim, H. K. Lee, DDSketch: A fast and fully-mergeable quantile sketch with relative-error guarantees,
+       Proceedings of the VLDB Endowment, 12(12), 2019
+    """
+
+    def __init__(self, n_f0, relative_accuracy=0.01):
+        """
+        :param n_f0: number of natural frequencies of the spectra
+        :param relative_accuracy: relative accuracy of the percentile estimates (default: 0.01)
+        """
+        self.n_f0 = n_f0
+        self.relative_accuracy = relative_accuracy
+        self.count = 0
+        self.mean = np.zeros(n_f0)
+        self._m2 = np.zeros(n_f0)
+        self.max = np.full(n_f0, -np.inf)
+        self.min = np.full(n_f0, np.inf)
+        self.sum = np.zeros(n_f0)
+
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self._gamma)
+        self._buckets = [Counter() for _ in range(n_f0)]
+        self._zero_count = np.zeros(n_f0, dtype=int)  # values <= 0 can not be binned logarithmically
+
+    def update(self, spectrum):
+        """
+        Add one realization of the spectrum.
+
+        :param spectrum: spectrum values at all natural frequencies
+        """
+        spectrum = np.asarray(spectrum, dtype=float)
+        if spectrum.shape != (self.n_f0,):
+            raise ValueError(f'Spectrum must have {self.n_f0} values.')
+
+        np.maximum(self.max, spectrum, out=self.max)
+        np.minimum(self.min, spectrum, out=self.min)
+        self.sum += spectrum
+
+        self.count += 1
+        delta = spectrum - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (spectrum - self.mean)
+
+        positive = spectrum > 0
+        self._zero_count += ~positive
+        keys = np.ceil(np.log(spectrum[positive]) / self._log_gamma).astype(int)
+        for i, key in zip(np.flatnonzero(positive), keys):
+            self._buckets[i][key] += 1
+
+    def merge(self, other):
+        """
+        Add the statistics of another `SpectrumStatistics` object (e.g. a partial result of another process) to this one.
+
+        :param other: `SpectrumStatistics` with the same ``n_f0`` and ``relative_accuracy``
+
+        :return: self
+        """
+        if other.n_f0 != self.n_f0 or other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Only statistics with the same ``n_f0`` and ``relative_accuracy`` can be merged.')
+        if other.count == 0:
+            return self
+
+        # parallel variant of Welford's algorithm (Chan et al.)
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self._m2 = self._m2 + other._m2 + delta**2 * self.count * other.count / count
+        self.count = count
+
+        np.maximum(self.max, other.max, out=self.max)
+        np.minimum(self.min, other.min, out=self.min)
+        self.sum += other.sum
+
+        self._zero_count += other._zero_count
+        for buckets, other_buckets in zip(self._buckets, other._buckets):
+            buckets.update(other_buckets)
+
+        return self
+
+    @property
+    def var(self):
+        """
+        Sample variance (``ddof=1``) at each natural frequency.
+        """
+        if self.count < 2:
+            return np.full(self.n_f0, np.nan)
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        """
+        Sample standard deviation (``ddof=1``) at each natural frequency.
+        """
+        return np.sqrt(self.var)
+
+    def percentile(self, q):
+        """
+        Estimate the ``q``-th percentile at each natural frequency.
+
+        :param q: percentile or sequence of percentiles [0-100]
+
+        :return: array of shape ``(n_f0,)`` or ``(len(q), n_f0)``
+        """
+        if self.count == 0:
+            raise ValueError('No realizations added.')
+
+        q_array = np.atleast_1d(q)
+        result = np.zeros((len(q_array), self.n_f0))
+
+        for i in range(self.n_f0):
+            keys = sorted(self._buckets[i])
+            cumulative = self._zero_count[i] + np.cumsum([self._buckets[i][key] for key in keys])
+            values = 2 * self._gamma**np.array(keys, dtype=float) / (self._gamma + 1)
+
+            for j, q_j in enumerate(q_array):
+                rank = q_j / 100 * (self.count - 1)
+                if rank < self._zero_count[i]:
+                    result[j, i] = 0
+                else:
+                    result[j, i] = values[np.searchsorted(cumulative, rank, side='right')]
+
+        return result[0] if np.ndim(q) == 0 else result
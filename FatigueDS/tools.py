@@ -1,7 +1,20 @@
 import numpy as np
+import scipy.integrate
 from scipy import signal
+from scipy.special import gamma
+import rainflow
 from FLife.tools import basquin_to_sn
 
+from . import backends
+
+# minimum number of samples per natural period of the SDOF system in the multirate scheme
+MULTIRATE_SAMPLES_PER_PERIOD = 20
+# number of samples converted to floating point at once when filtering raw (integer or scaled) time histories
+BLOCK_SIZE = 2**18
+# change-point detection of the ``segmented`` method: penalty factor (of the BIC penalty) and minimum number of windows per segment
+SEGMENT_PENALTY = 2
+SEGMENT_MIN_WINDOWS = 4
+
 def convert_Q_damp(self, Q=None, damp=None):  
     # bi bilo smiselneje spremeniti funkcije, vezane na class FatigueDS (convert_Q_damp, get_freq_range, psd_averaging), v metode class-a? 
     """
@@ -19,6 +32,10 @@ def convert_Q_damp(self, Q=None, damp=None):
         self.Q = Q
         self.damp = 1 / (2 * self.Q)
 
+    # cached SDOF responses are only valid for the damping they were computed with
+    if hasattr(self, '_response_cache'):
+        self._response_cache.clear()
+
 def get_freq_range(self, freq_data):
     """
     Function for generating frequency ranges-> X-axis of MRS/FDS plot from freq_data tuple.
@@ -39,6 +56,80 @@ def get_freq_range(self, freq_data):
     return f0_range
 
 
+def adaptive_freq_range(self, output, f0_start, f0_stop, tol=1e-2, n_start=32, max_points=1000):
+    """
+    Function for generating an adaptive (non-uniform) frequency range for the ERS or FDS of the loaded signal.
+
+    The spectrum is first calculated on ``n_start`` logarithmically spaced natural frequencies. Each interval is then
+    bisected (in logarithmic scale) and the spectrum is calculated at the midpoint. If the midpoint value differs from the 
+    log-log linear interpolation of its neighbours by more than ``tol`` (relative), both new intervals are refined further.
+    Refinement stops when all intervals meet the tolerance or the number of points reaches ``max_points``.
+
+    :param output: spectrum used for refinement ('ERS' or 'FDS')
+    :param f0_start: first natural frequency [Hz]
+    :param f0_stop: last natural frequency [Hz]
+    :param tol: relative interpolation error tolerance [/] (default: 1e-2)
+    :param n_start: number of points of the initial logarithmic grid (default: 32)
+    :param max_points: maximum number of points (default: 1000)
+
+    :return: frequency range, spectrum at the frequency range
+    """
+    tiny = np.finfo(float).tiny
+
+    f0_range = np.geomspace(f0_start, f0_stop, min(n_start, max_points))
+    spectrum = self._spectrum(output, f0_range)
+    refine = np.ones(len(f0_range) - 1, dtype=bool)
+
+    while np.any(refine) and len(f0_range) < max_points:
+        idx = np.flatnonzero(refine)[:max_points - len(f0_range)]
+
+        f_mid = np.sqrt(f0_range[idx] * f0_range[idx + 1])
+        spectrum_mid = self._spectrum(output, f_mid)
+
+        log_spectrum = np.log(np.maximum(np.abs(spectrum), tiny))
+        log_interp = (log_spectrum[idx] + log_spectrum[idx + 1]) / 2  # midpoint is the center of the interval in log scale
+        error = np.abs(np.log(np.maximum(np.abs(spectrum_mid), tiny)) - log_interp)
+        inaccurate = error > np.log1p(tol)
+
+        f0_range = np.insert(f0_range, idx + 1, f_mid)
+        spectrum = np.insert(spectrum, idx + 1, spectrum_mid)
+
+        # each refined interval is split in two; both halves are checked again if the midpoint was inaccurate
+        left = idx + np.arange(len(idx))
+        refine = np.zeros(len(f0_range) - 1, dtype=bool)
+        refine[left[inaccurate]] = True
+        refine[left[inaccurate] + 1] = True
+
+    return f0_range, spectrum
+
+
+def integral_weights(f_0, psd_freq, damp, b):
+    """
+    Returns the integrals I_b (see `integrals_b`) over the frequency bins of a PSD, for SDOF systems with natural 
+    frequencies ``f_0``. The PSD is treated as constant over each frequency bin (Vol.3, equation [8.86]), so the integral
+    over a PSD is linear in the PSD: ``integral_weights(f_0, psd_freq, damp, b) @ psd_data``.
+
+    :param f_0: system natural frequencies [Hz]
+    :param psd_freq: PSD frequency range [Hz]
+    :param damp: damping ratio [/]
+    :param b: exponent b [/]
+
+    :return: array of shape (len(f_0), len(psd_freq))
+    """
+    f_0 = np.atleast_1d(np.asarray(f_0, dtype=float))[:, None]
+
+    df = np.diff(psd_freq)[0]
+    f1 = psd_freq - df / 2
+    f2 = psd_freq + df / 2
+
+    # Adjust first and last elements for f1 and f2 respectively
+    f1[0] = psd_freq[0]
+    f2[-1] = psd_freq[-1]
+
+    integrals_b = backends.get('integrals_b')
+    return integrals_b(h=f2 / f_0, b=b, damp=damp) - integrals_b(h=f1 / f_0, b=b, damp=damp)
+
+
 def rms_sum(f_0, psd_freq, psd_data, damp, motion='rel_disp'):
     """
     This function calculates the response RMS (either relative displacement, velocity or acceleration) for a given 
@@ -52,41 +143,107 @@ def rms_sum(f_0, psd_freq, psd_data, damp, motion='rel_disp'):
 
     :return: RMS sum value
     """
-    
-    df = np.diff(psd_freq)[0]
-    rms_sum = 0
+    if motion not in ['rel_disp', 'rel_vel', 'rel_acc']:
+        raise ValueError('Invalid ``motion``. Supported motions: ``rel_disp``, ``rel_vel`` and ``rel_acc``')
+    b = {'rel_disp': 0, 'rel_vel': 2, 'rel_acc': 4}[motion]
 
-    f1 = psd_freq - df / 2
-    f2 = psd_freq + df / 2
+    # the integrals of all frequency bins are evaluated at once, for blocks of natural frequencies
+    f_0 = np.asarray(f_0, dtype=float)
+    f_0_flat = f_0.reshape(-1)
+    rms_sum = np.empty(len(f_0_flat))
+    rows = max(BLOCK_SIZE // len(psd_data), 1)
+    for start in range(0, len(f_0_flat), rows):
+        rms_sum[start:start + rows] = integral_weights(f_0_flat[start:start + rows], psd_freq, damp, b) @ psd_data
 
-    # Adjust first and last elements for f1 and f2 respectively
-    f1[0] = psd_freq[0]
-    f2[-1] = psd_freq[-1]
+    return rms_sum.reshape(f_0.shape)[()]
 
-    for j in range(len(psd_data)):
 
-        h1 = f1[j] / f_0
-        h2 = f2[j] / f_0
+def spectral_moments(f_0, psd_freq, psd_data, damp):
+    """
+    This function calculates the spectral moments ``m0, m1, m2, m4`` of the relative displacement response of SDOF systems 
+    with natural frequencies ``f_0`` (vectorized), for the excitation PSD ``psd_data``. Moments are defined with frequency 
+    in Hz: ``m_i = int f**i * G_z(f) df``. The PSD is treated as constant over each frequency bin, as in `rms_sum`.
 
-        # Case where the excitation is defined by PSD comprising "n" straight line segments (Vol.3, equation [8.86])
-        
-        
-        
+    :param f_0: system natural frequencies [Hz]
+    :param psd_freq: PSD frequency range [Hz]
+    :param psd_data: PSD data [(m/s^2)^2/Hz]
+    :param damp: damping ratio [/]
 
-        if motion == 'rel_disp':
-            z_rms = psd_data[j] * (integrals_b(h=h2, b=0, damp=damp) - integrals_b(h=h1, b=0, damp=damp))
-            rms_sum += z_rms
+    :return: m0, m1, m2, m4
+    """
+    f_0 = np.atleast_1d(f_0)
+    return tuple(spectral_moment_scale(f_0, damp, b) * (integral_weights(f_0, psd_freq, damp, b) @ psd_data) for b in [0, 1, 2, 4])
+
+
+def spectral_moment_scale(f_0, damp, b):
+    """
+    Returns the factor between the spectral moment ``m_b`` of the relative displacement response and the integral of the 
+    PSD weighted with I_b (see `integral_weights`).
 
-        elif motion == 'rel_vel':
-            dz_rms = psd_data[j] * (integrals_b(h=h2, b=2, damp=damp) - integrals_b(h=h1, b=2, damp=damp))
-            rms_sum += dz_rms
-            
-        elif motion == 'rel_acc':
-            ddz_rms = psd_data[j] * (integrals_b(h=h2, b=4, damp=damp) - integrals_b(h=h1, b=4, damp=damp))
-            rms_sum += ddz_rms
-       
-    return rms_sum
+    :param f_0: system natural frequencies [Hz]
+    :param damp: damping ratio [/]
+    :param b: exponent b [/]
 
+    :return: factor
+    """
+    return np.pi / (4 * damp) * f_0**(b + 1) / (2 * np.pi * f_0)**4
+
+
+def spectral_damage_intensity(m0, m1, m2, m4, k, method='narrowband'):
+    """
+    This function calculates the expected fatigue damage per unit time (for ``C=1``) of a stationary Gaussian process, 
+    defined by its spectral moments, using a spectral method [5, 6]. Cycles are counted as full cycles with amplitude ``s``
+    and damage ``s**k`` per cycle. All arguments can be arrays (vectorized).
+
+    Supported methods:
+        - ``narrowband``: Rayleigh distributed amplitudes at the rate of zero up-crossings,
+        - ``dirlik``: Dirlik's empirical mixture of exponential and Rayleigh distributions [5],
+        - ``tovo_benasciutti``: Tovo-Benasciutti (2005 improved weighting parameter) [5],
+        - ``zhao_baker``: Zhao-Baker mixture of Weibull and Rayleigh distributions (method 1) [5].
+
+    Literature:
+        [5] A. Zorman, J. Slavič, M. Boltežar, Vibration fatigue by spectral methods - A review with open-source support, 
+            Mechanical Systems and Signal Processing, 2023
+        [6] FLife <https://github.com/ladisk/FLife>
+
+    :param m0, m1, m2, m4: spectral moments (frequency in Hz)
+    :param k: S-N curve slope from Basquin equation
+    :param method: spectral method (default: narrowband)
+
+    :return: damage intensity [1/s]
+    """
+    nu_0 = np.sqrt(m2 / m0)  # rate of zero up-crossings
+    nu_p = np.sqrt(m4 / m2)  # rate of peaks
+    alpha_1 = m1 / np.sqrt(m0 * m2)
+    alpha_2 = m2 / np.sqrt(m0 * m4)
+    d_NB = np.sqrt(2 * m0)**k * gamma(1 + k / 2)  # damage per cycle for Rayleigh distributed amplitudes
+
+    if method == 'narrowband':
+        d = nu_0 * d_NB
+    
+    elif method == 'dirlik':
+        x_m = m1 / m0 * np.sqrt(m2 / m4)
+        G1 = 2 * (x_m - alpha_2**2) / (1 + alpha_2**2)
+        R = (alpha_2 - x_m - G1**2) / (1 - alpha_2 - G1 + G1**2)
+        G2 = (1 - alpha_2 - G1 + G1**2) / (1 - R)
+        G3 = 1 - G1 - G2
+        Q = 1.25 * (alpha_2 - G3 - G2 * R) / G1
+        d = nu_p * np.sqrt(m0)**k * (G1 * Q**k * gamma(1 + k) + np.sqrt(2)**k * gamma(1 + k / 2) * (G2 * np.abs(R)**k + G3))
+    
+    elif method == 'tovo_benasciutti':
+        b = (alpha_1 - alpha_2) * (1.112 * (1 + alpha_1 * alpha_2 - (alpha_1 + alpha_2)) * np.exp(2.11 * alpha_2) + (alpha_1 - alpha_2)) / (alpha_2 - 1)**2
+        d = nu_0 * d_NB * (b + (1 - b) * alpha_2**(k - 1))
+
+    elif method == 'zhao_baker':
+        a = 8 - 7 * alpha_2
+        b = np.where(alpha_2 < 0.9, 1.1, 1.1 + 9 * (alpha_2 - 0.9))
+        w = (1 - alpha_2) / (1 - np.sqrt(2 / np.pi) * gamma(1 + 1 / b) * a**(-1 / b))
+        d = nu_p * np.sqrt(m0)**k * (w * a**(-k / b) * gamma(1 + k / b) + (1 - w) * 2**(k / 2) * gamma(1 + k / 2))
+    
+    else:
+        raise ValueError(f"Invalid spectral method ``{method}``. Supported methods: 'narrowband', 'dirlik', 'tovo_benasciutti' and 'zhao_baker'.")
+
+    return d
 
 
 def integrals_b(h, b, damp):
@@ -94,6 +251,9 @@ def integrals_b(h, b, damp):
     This function calculates integrals I_b described in [3] and [4]. See equations (A1-74), (A1-75), (A1-76) in [3]
     or [A6.20], [A6.22], [A6.24] in [4] or [8.52], [8.53], [8.54] [4].
 
+    Integral I_1 (needed for the first spectral moment) is obtained with the substitution ``u = h**2``, using the same
+    normalization: ``I_b(h) = 4 * damp / pi * int_0^h x**b / ((1 - x**2)**2 + (2 * damp * x)**2) dx``.
+
     Literature:
         [3] Mechanical Environment Test Specification Development Method - Christian LALANNE
         [4] Christian Lalanne(auth.) Random Vibration Mechanical Vibration and Shock Analysis, Volume 3, Second Edition
@@ -120,6 +280,10 @@ def integrals_b(h, b, damp):
     if b == 0:
         Ib = C0 * np.log(C1) + 1 / np.pi * C5  # 84/198 eq. (A1-74) and 560/610 eq. [A6.20]
     
+    elif b == 1:
+        C6 = damp * alpha  # square root of the denominator discriminant in ``u = h**2``
+        Ib = 2 / (np.pi * alpha) * (np.arctan((h**2 - beta / 2) / C6) + np.arctan(beta / 2 / C6))
+
     elif b == 2:
         Ib = C0*np.log(1 / C1) + 1 / np.pi * C5  # 84/198 eq. (A1-75) and 560/610 eq. [A6.22] 
     
@@ -129,12 +293,12 @@ def integrals_b(h, b, damp):
         Ib = C4 * h + beta * I2 - I0  # 84/198 eq. (A1-76) and 560/610 eq. [A6.24]
 
     else:
-        raise ValueError(f"Invalid exponent ``b``='{b}'. Supported exponents: 0, 2 and 4.")
+        raise ValueError(f"Invalid exponent ``b``='{b}'. Supported exponents: 0, 1, 2 and 4.")
     
     return Ib
 
 
-def response_relative_displacement(time_data, dt, f_0, damp):
+def response_relative_displacement(time_data, dt, f_0, damp, dtype=np.float64):
     """
     Returns relative response displacement of a linear SDOF system by performing the convolution of a signal and impulse response 
     function, defined in [1]. The function is used in calculation of the extreme response spectrum (ERS) of a random time signal.
@@ -146,14 +310,16 @@ def response_relative_displacement(time_data, dt, f_0, damp):
     :param dt: time step [s]
     :param f_0: system natural frequency [Hz]
     :param damp: damping ratio [/]
+    :param dtype: floating point precision of the impulse response and the convolution (default: np.float64)
 
     :return: relative response displacement [m]
     """
+    dt, f_0, damp = float(dt), float(f_0), float(damp)  # python scalars keep the precision of ``dtype`` arrays
     n = len(time_data)
-    time = np.arange(n) * dt
+    time = np.arange(n, dtype=dtype) * dt
     
     omega_0 = 2 * np.pi * f_0
-    omega_0d = omega_0 * np.sqrt(1 - damp**2)
+    omega_0d = omega_0 * (1 - damp**2)**0.5
     
     impulse_resp_func = -1 / omega_0d * np.exp(-damp * omega_0 * time) * np.sin(omega_0d * time)
 
@@ -162,24 +328,635 @@ def response_relative_displacement(time_data, dt, f_0, damp):
     return z
 
 
+def sdof_filter_coefficients(f_0, dt, damp):
+    """
+    Returns the coefficients of the recursive (IIR) filter that is equivalent to the discrete convolution with the impulse 
+    response function in `response_relative_displacement`. The sampled impulse response ``h[j] = -1/omega_0d * r**j * sin(j * theta)`` 
+    (``r = exp(-damp * omega_0 * dt)``, ``theta = omega_0d * dt``) satisfies ``h[j] = 2 * r * cos(theta) * h[j-1] - r**2 * h[j-2]``, 
+    so ``signal.lfilter(b, a, time_data)`` gives the same response in O(N) without building the impulse response.
+
+    :param f_0: system natural frequency (or array of frequencies) [Hz]
+    :param dt: time step [s]
+    :param damp: damping ratio [/]
+
+    :return: b (shape (..., 2)), a (shape (..., 3))
+    """
+    omega_0 = 2 * np.pi * np.asarray(f_0, dtype=float)
+    omega_0d = omega_0 * np.sqrt(1 - damp**2)
+    r = np.exp(-damp * omega_0 * dt)
+    theta = omega_0d * dt
+
+    b = np.stack([np.zeros_like(r), -dt / omega_0d * r * np.sin(theta)], axis=-1)
+    a = np.stack([np.ones_like(r), -2 * r * np.cos(theta), r**2], axis=-1)
+    
+    return b, a
+
+
+def warm_up_samples(f_0, damp, dt, eps=1e-12):
+    """
+    Returns the number of samples after which the free response of a SDOF system has decayed by the factor ``eps``:
+    ``ln(1/eps) / (damp * omega_0 * dt)``.
+
+    :param f_0: system natural frequency [Hz]
+    :param damp: damping ratio [/]
+    :param dt: time step [s]
+    :param eps: relative error of the response (default: 1e-12)
+
+    :return: number of samples
+    """
+    return int(np.ceil(np.log(1 / eps) / (damp * 2 * np.pi * f_0 * dt)))
+
+
+def turning_points(z):
+    """
+    Returns the turning points (local extrema) of a signal, including its first and last sample. 
+    Rainflow counting and the signal maximum are unchanged when the signal is replaced by its turning points.
+
+    :param z: signal
+
+    :return: turning points of the signal
+    """
+    z = np.asarray(z)
+    if len(z) < 3:
+        return z.copy()
+
+    dz = np.diff(z)
+    nonzero = np.flatnonzero(dz)  # flat segments do not change direction
+    if len(nonzero) == 0:
+        return z[[0, -1]]
+
+    direction = np.sign(dz[nonzero])
+    reversal = np.flatnonzero(direction[1:] != direction[:-1])
+    idx = nonzero[reversal + 1]  # direction changes at the start of the next non-flat step
+    
+    return np.concatenate(([z[0]], z[idx], [z[-1]]))
+
+
+def sdof_turning_points(time_data, dt, f_0, damp, dtype=np.float64, interpolate_peak=False, scale=1, offset=0):
+    """
+    Returns the turning points of the relative response displacement of a SDOF system (reference implementation of the 
+    ``sdof_turning_points`` kernel, see `backends`) to the signal ``scale * time_data + offset``.
+
+    Raw signals (integer data, ``dtype`` different from the precision of the data or non-default ``scale``/``offset``) are 
+    filtered block by block (see `filtered_turning_points`), so no full-length floating point copy of the signal or of 
+    the response is made.
+
+    :param time_data: signal time data [m/s^2] or raw counts
+    :param dt: time step [s]
+    :param f_0: system natural frequency [Hz]
+    :param damp: damping ratio [/]
+    :param dtype: floating point precision of the response (default: np.float64)
+    :param interpolate_peak: replace the maximum turning point with the parabolic interpolation of the peak, see `interpolated_peak` (default: False)
+    :param scale: scale of the raw signal (default: 1)
+    :param offset: offset of the raw signal (default: 0)
+
+    :return: turning points of the relative response displacement [m]
+    """
+    if scale != 1 or offset != 0 or time_data.dtype != dtype:
+        b, a = sdof_filter_coefficients(f_0, dt, damp)
+        return filtered_turning_points(time_data, b, a, dtype=dtype, scale=scale, offset=offset, interpolate_peak=interpolate_peak)
+
+    z = response_relative_displacement(time_data, dt, f_0=f_0, damp=damp, dtype=dtype)
+    tp = turning_points(z)
+    if interpolate_peak:
+        tp[np.argmax(tp)] = interpolated_peak(z)
+    
+    return tp
+
+
+def signal_blocks(time_data, dtype=np.float64, scale=1, offset=0, block_size=BLOCK_SIZE):
+    """
+    Yields consecutive blocks of the signal ``scale * time_data + offset``, converted to ``dtype``. Only one block is 
+    converted at a time, so integer data or memory-mapped files are never converted as a whole.
+
+    :param time_data: signal time data or raw counts (array or memmap)
+    :param dtype: floating point precision of the blocks (default: np.float64)
+    :param scale: scale of the raw signal (default: 1)
+    :param offset: offset of the raw signal (default: 0)
+    :param block_size: number of samples in a block (default: ``BLOCK_SIZE``)
+    """
+    for start in range(0, len(time_data), block_size):
+        yield scaled_signal(time_data[start:start + block_size], dtype=dtype, scale=scale, offset=offset)
+
+
+def scaled_signal(time_data, dtype=np.float64, scale=1, offset=0):
+    """
+    Returns the signal ``scale * time_data + offset``, converted to ``dtype``.
+    """
+    x = np.asarray(time_data, dtype=dtype)
+    if scale != 1:
+        x = x * float(scale)  # python scalars keep the precision of ``dtype`` arrays
+    if offset != 0:
+        x = x + float(offset)
+    return x
+
+
+def filtered_turning_points(time_data, b, a, dtype=np.float64, scale=1, offset=0, interpolate_peak=False, block_size=BLOCK_SIZE, zi=None, 
+                            return_state=False):
+    """
+    Returns the turning points of the signal ``scale * time_data + offset``, filtered with the recursive filter ``b, a``.
+
+    The signal is converted, scaled and filtered block by block (``signal.lfilter`` with the filter state carried 
+    between blocks), and the turning points of every block are joined with the last two turning points of the previous
+    blocks, which is equivalent to calculating the turning points of the whole response (see `turning_points`).
+
+    :param time_data: signal time data or raw counts (array or memmap)
+    :param b: numerator coefficients of the filter
+    :param a: denominator coefficients of the filter
+    :param dtype: floating point precision of the response (default: np.float64)
+    :param scale: scale of the raw signal (default: 1)
+    :param offset: offset of the raw signal (default: 0)
+    :param interpolate_peak: replace the maximum turning point with the parabolic interpolation of the peak, see `interpolated_peak` (default: False)
+    :param block_size: number of samples filtered at once (default: ``BLOCK_SIZE``)
+    :param zi: initial state of the filter, see `scipy.signal.lfilter` (default: None, at rest)
+    :param return_state: also return the final state of the filter (default: False)
+
+    :return: turning points of the filtered signal (and the final state of the filter, if ``return_state`` is True)
+    """
+    b = np.asarray(b, dtype=dtype)
+    a = np.asarray(a, dtype=dtype)
+    zi = np.zeros(max(len(a), len(b)) - 1, dtype=dtype) if zi is None else np.asarray(zi, dtype=dtype)
+
+    parts = []
+    carry = np.zeros(0, dtype=dtype)  # last two turning points, which can still change
+    peak = None  # [previous sample, maximum, next sample]
+    last = None
+    for x in signal_blocks(time_data, dtype=dtype, scale=scale, offset=offset, block_size=block_size):
+        z, zi = signal.lfilter(b, a, x, zi=zi)
+
+        if peak is not None and peak[2] is None:
+            peak[2] = z[0]
+        i = np.argmax(z)
+        if peak is None or z[i] > peak[1]:
+            peak = [z[i - 1] if i > 0 else last, z[i], z[i + 1] if i < len(z) - 1 else None]
+        last = z[-1]
+
+        tp = turning_points(np.concatenate((carry, z)))
+        parts.append(tp[:-2])
+        carry = tp[-2:]
+    
+    tp = np.concatenate(parts + [carry]).astype(dtype, copy=False)
+
+    if interpolate_peak and peak is not None and peak[0] is not None and peak[2] is not None:
+        tp[np.argmax(tp)] = interpolated_peak(np.array(peak))
+    
+    if return_state:
+        return tp, zi
+    return tp
+
+
+def rainflow_damage(z, k):
+    """
+    Returns the rainflow damage sum ``sum(n_i * s_i**k)`` of a signal, where ``s_i`` are half-cycle amplitudes and ``n_i`` 
+    are the numbers of half cycles (reference implementation of the ``rainflow_damage`` kernel, see `backends`). 
+    Residual reversals are counted as half cycles.
+
+    :param z: signal (or its turning points)
+    :param k: S-N curve slope from Basquin equation
+
+    :return: damage sum
+    """
+    rf = np.asarray(rainflow.count_cycles(z), dtype=np.float64)
+    if len(rf) == 0:
+        return 0.0
+    
+    return np.sum(rf[:,1] * 2 * (rf[:,0] / 2)**k)  # *2 and /2 because rainflow returns cycles and ranges, fds theory is defined for half cycles and amplitudes
+
+
+def rainflow_residue(z, k):
+    """
+    Four-point rainflow counting of a part of a signal (reference implementation of the ``rainflow_residue`` kernel, see
+    `backends`). Returns the damage sum of the closed cycles and the residue (unclosed reversals). The residues of
+    consecutive parts can be joined (see `turning_points`) and counted again, so a signal can be counted part by part; the
+    final residue is counted as half cycles, see `residue_damage`.
+
+    :param z: turning points of the signal
+    :param k: S-N curve slope from Basquin equation
+
+    :return: damage sum of the closed cycles, number of closed cycles, residue
+    """
+    residue = []
+    damage = 0.0
+    n_cycles = 0
+    for x in np.asarray(z, dtype=np.float64):
+        residue.append(x)
+        while len(residue) >= 4:
+            a, b, c, d = residue[-4:]
+            s = abs(c - b)
+            if s > abs(b - a) or s > abs(d - c):
+                break
+            damage += 2 * (s / 2)**k
+            n_cycles += 1
+            del residue[-3:-1]
+
+    return damage, n_cycles, np.array(residue)
+
+
+def residue_damage(residue, k):
+    """
+    Returns the damage sum of the residue of rainflow counting (see `rainflow_residue`), counted as half cycles.
+
+    :param residue: residue
+    :param k: S-N curve slope from Basquin equation
+
+    :return: damage sum
+    """
+    return np.sum((np.abs(np.diff(residue)) / 2)**k)
+
+
+def repeated_rainflow_damage(transient, steady, n_steady, k):
+    """
+    Returns the rainflow damage sum (see `rainflow_damage`) of the turning points ``transient``, followed by ``n_steady``
+    repetitions of the turning points ``steady`` (see `repeated_turning_points`).
+
+    The cycles are counted incrementally (see `rainflow_residue`): the residue of the preceding repetitions is joined with
+    the next repetition. Once the residue is unchanged by a repetition, every following repetition closes the same cycles,
+    and their damage is multiplied by the number of remaining repetitions, so the cost does not depend on ``n_steady``.
+
+    :param transient: turning points of the start of the signal
+    :param steady: turning points of one repetition
+    :param n_steady: number of repetitions
+    :param k: S-N curve slope from Basquin equation
+
+    :return: damage sum
+    """
+    rainflow_residue = backends.get('rainflow_residue')
+    damage, n_cycles, residue = rainflow_residue(transient, k)
+    for j in range(n_steady):
+        d, n, next_residue = rainflow_residue(turning_points(np.concatenate((residue, steady))), k)
+        damage += d
+        n_cycles += n
+        if np.array_equal(next_residue, residue):
+            damage += (n_steady - j - 1) * d
+            n_cycles += (n_steady - j - 1) * n
+            break
+        residue = next_residue
+    
+    if n_cycles > 0 or len(residue) > 2:  # as in `rainflow_damage`, a monotonic signal has no cycles
+        damage += residue_damage(residue, k)
+    return damage
+
+
+def sweep_integral(h, M_h, a, k, Q):
+    """
+    Returns the integral over the frequency ratio ``h`` of the sine sweep damage integrand (reference implementation of the 
+    ``sweep_integral`` kernel, see `backends`), using the trapezoidal rule.
+
+    :param h: frequency ratio grid [/]
+    :param M_h: sweep weighting function at ``h``
+    :param a: excitation type exponent (0: acceleration, 1: velocity, 2: displacement)
+    :param k: S-N curve slope from Basquin equation
+    :param Q: damping Q-factor [/]
+
+    :return: integral value
+    """
+    return scipy.integrate.trapezoid(M_h * h**(a * k - 1) / ((1 - h**2)**2 + (h / Q)**2)**(k / 2), x=h)
+
+
+def interpolated_peak(z):
+    """
+    Returns the maximum of a sampled signal, corrected by fitting a parabola through the maximum sample and its neighbours.
+    The correction is bounded to 1/8 of the difference between the neighbouring samples.
+
+    :param z: signal
+
+    :return: interpolated maximum
+    """
+    i = np.argmax(z)
+    if i == 0 or i == len(z) - 1:
+        return z[i]
+    
+    curvature = z[i - 1] - 2 * z[i] + z[i + 1]
+    if curvature == 0:
+        return z[i]
+    
+    return z[i] - (z[i - 1] - z[i + 1])**2 / (8 * curvature)
+
+
+def multirate_factor(f_0, dt):
+    """
+    Returns the decimation factor of the multirate scheme for the natural frequency ``f_0``. 
+    
+    The factor is the largest power of 2 that keeps at least ``MULTIRATE_SAMPLES_PER_PERIOD`` samples per natural period, 
+    so the natural frequencies are grouped into octave bands that share one decimated copy of the signal.
+
+    :param f_0: system natural frequency [Hz]
+    :param dt: time step of the signal [s]
+
+    :return: decimation factor
+    """
+    return int(2**max(np.floor(np.log2(1 / (dt * MULTIRATE_SAMPLES_PER_PERIOD * f_0))), 0))
+
+
+def decimate_by_2(time_data, dtype=np.float64, scale=1, offset=0, block_size=BLOCK_SIZE):
+    """
+    Returns the signal ``scale * time_data + offset``, decimated by 2 with ``signal.resample_poly(x, 1, 2)``. 
+    The signal is converted and decimated block by block (with overlapping margins longer than the anti-aliasing filter), 
+    so only the decimated signal is allocated in full length.
+
+    :param time_data: signal time data or raw counts (array or memmap)
+    :param dtype: floating point precision of the decimated signal (default: np.float64)
+    :param scale: scale of the raw signal (default: 1)
+    :param offset: offset of the raw signal (default: 0)
+    :param block_size: number of samples decimated at once, must be even (default: ``BLOCK_SIZE``)
+
+    :return: decimated signal
+    """
+    N = len(time_data)
+    margin = 64  # even, longer than half of the anti-aliasing filter of ``resample_poly`` (20 samples)
+    decimated = np.empty((N + 1) // 2, dtype=dtype)
+    
+    for start in range(0, N, block_size):
+        stop = min(start + block_size, N)
+        padded_start = max(start - margin, 0)
+        x = scaled_signal(time_data[padded_start:stop + margin], scale=scale, offset=offset)
+        y = signal.resample_poly(x, 1, 2)
+        j = (start - padded_start) // 2
+        decimated[start // 2:(stop + 1) // 2] = y[j:j + (stop + 1) // 2 - start // 2]
+    
+    return decimated
+
+
+def decimated_load(self, q):
+    """
+    Returns the random time load decimated by the factor ``q`` (power of 2). Decimated copies are obtained by repeated 
+    anti-aliased halving (see `decimate_by_2`) and are stored in the precision ``self.dtype``, with the scale and offset of 
+    the raw load applied, so each octave band is decimated only once per load. For ``q=1`` the raw load is returned.
+
+    :param q: decimation factor
+
+    :return: decimated time history
+    """
+    with self._lock:
+        q_available = max(q_i for q_i in self._decimated_data if q_i <= q)
+        while q_available < q:
+            data = self._decimated_data[q_available]
+            if q_available == 1:
+                data = decimate_by_2(data, dtype=self.dtype, scale=self.scale, offset=self.offset)
+            else:
+                data = decimate_by_2(data, dtype=self.dtype)
+            q_available *= 2
+            self._decimated_data[q_available] = data
+    
+    return self._decimated_data[q]
+
+
+def response_turning_points(self, f_0):
+    """
+    Returns the turning points of the relative displacement response of a SDOF system to the random time load,
+    with no unit scaling applied. Results are memoized in the response cache ``self._response_cache``.
+
+    If a `FilterBank` is set (``self.filter_bank``), the response is computed with its recursive filters.
+    If the multirate scheme is enabled, the response is computed on a decimated copy of the load (see `multirate_factor`)
+    and its maximum is corrected by parabolic interpolation. With the default ``MULTIRATE_SAMPLES_PER_PERIOD`` the ERS and
+    FDS typically deviate from the full-rate result by about 1 % or less.
+
+    :param f_0: system natural frequency [Hz]
+
+    :return: turning points of the relative response displacement [m]
+    """
+    key = (self._load_id, f_0, self.damp, np.dtype(self.dtype).str)
+    tp = self._response_cache.get(key)
+    if tp is None:
+        q = multirate_factor(f_0, self.dt) if self.multirate else 1
+        # scale and offset of the raw load are applied when filtering, decimated copies are already scaled
+        scale, offset = (self.scale, self.offset) if q == 1 else (1, 0)
+        if q == 1 and self.filter_bank is not None and f_0 in self.filter_bank and self.filter_bank.matches(self.dt, self.damp):
+            tp = self.filter_bank.turning_points(decimated_load(self, 1), f_0, dtype=self.dtype, scale=scale, offset=offset)
+        else:
+            # the peak of the coarsely sampled (decimated) response falls between samples
+            tp = backends.get('sdof_turning_points')(decimated_load(self, q), self.dt * q, f_0=f_0, damp=self.damp, dtype=self.dtype, 
+                                                     interpolate_peak=q > 1, scale=scale, offset=offset)
+        self._response_cache.put(key, tp)
+    
+    return tp
+
+
+def repeated_turning_points(self, f_0):
+    """
+    Returns the turning points of the relative displacement response of a SDOF system to the random time load, repeated
+    ``self.repeat`` times (e.g. a looped durability drive file), with no unit scaling applied. Results are memoized in the
+    response cache ``self._response_cache``.
+
+    The response to the first repetitions is calculated, with the filter state carried from one repetition to the next,
+    until the free response to the start of the load has decayed (see `warm_up_samples`). All following repetitions have 
+    the same steady-state response, which is calculated once, so the cost does not depend on the number of repetitions.
+
+    :param f_0: system natural frequency [Hz]
+
+    :return: turning points of the response to the first repetitions, turning points of the steady-state response to one
+        repetition (empty if there are no further repetitions), number of steady-state repetitions
+    """
+    n_transient = min(self.repeat, 1 + -(-warm_up_samples(f_0, self.damp, self.dt) // len(self.time_data)))
+    key = (self._load_id, f_0, self.damp, np.dtype(self.dtype).str)
+    transient = self._response_cache.get(key + ('transient',))
+    steady = self._response_cache.get(key + ('steady',))
+    if transient is None or steady is None:
+        b, a = sdof_filter_coefficients(f_0, self.dt, self.damp)
+        options = dict(dtype=self.dtype, scale=self.scale, offset=self.offset)
+        parts = []
+        zi = None
+        for _ in range(n_transient):
+            tp, zi = filtered_turning_points(self.time_data, b, a, zi=zi, return_state=True, **options)
+            parts.append(tp)
+        transient = turning_points(np.concatenate(parts))
+        steady = filtered_turning_points(self.time_data, b, a, zi=zi, **options) if n_transient < self.repeat else transient[:0]
+        self._response_cache.put(key + ('transient',), transient)
+        self._response_cache.put(key + ('steady',), steady)
+    
+    return transient, steady, self.repeat - n_transient
+
+
+def welch_psd(time_data, fs, nperseg, window='boxcar', noverlap=None, block_size=2**20):
+    """
+    Welch's PSD estimate (one-sided density, constant detrend, mean averaging), accumulated segment by segment.
+
+    The result equals ``scipy.signal.welch``, but the signal is never loaded into memory at once: ``time_data`` can be a 
+    (memory-mapped) array, which is read in blocks of ``block_size`` samples, or an iterable of consecutive chunks of the signal.
+
+    :param time_data: signal time data (array, memmap or iterable of chunks)
+    :param fs: sampling frequency [Hz]
+    :param nperseg: length of each segment
+    :param window: window of the segments, see `scipy.signal.get_window` (default: 'boxcar')
+    :param noverlap: number of samples shared by consecutive segments (default: ``nperseg // 2``)
+    :param block_size: number of samples read at once from an array (default: 2**20)
+
+    :return: frequency vector, PSD data
+    """
+    if noverlap is None:
+        noverlap = nperseg // 2
+    if not 0 <= noverlap < nperseg:
+        raise ValueError('``noverlap`` must be smaller than ``nperseg``')
+    step = nperseg - noverlap
+
+    if isinstance(time_data, np.ndarray):
+        block_size = max(block_size, nperseg)
+        chunks = (time_data[i:i + block_size] for i in range(0, len(time_data), block_size))
+    else:
+        chunks = iter(time_data)
+
+    win = signal.get_window(window, nperseg)
+    psd_sum = np.zeros(nperseg // 2 + 1)
+    n_segments = 0
+    buffer = np.zeros(0)
+    for chunk in chunks:
+        buffer = np.concatenate((buffer, np.asarray(chunk, dtype=np.float64)))
+        if len(buffer) < nperseg:
+            continue
+        
+        n = (len(buffer) - nperseg) // step + 1
+        segments = np.lib.stride_tricks.sliding_window_view(buffer, nperseg)[::step][:n]
+        segments = (segments - segments.mean(axis=1, keepdims=True)) * win
+        psd_sum += np.sum(np.abs(np.fft.rfft(segments, axis=1))**2, axis=0)
+        n_segments += n
+        buffer = buffer[n * step:]
+
+    if n_segments == 0:
+        raise ValueError('The signal is shorter than one segment ``nperseg``.')
+
+    psd = psd_sum / n_segments / (fs * np.sum(win**2))
+    psd[1:-1 if nperseg % 2 == 0 else None] *= 2  # one-sided, the DC and Nyquist components are not doubled
+
+    return np.fft.rfftfreq(nperseg, 1 / fs), psd
+
+
 def psd_averaging(self):
     """
-    PSD averaging method: Welch's method for calculating PSD of a random signal frm time data.
+    PSD averaging method: Welch's method for calculating PSD of a random signal frm time data (see `welch_psd`).
+
+    The PSD is calculated once per (``bins``, ``window``, ``overlap``) and stored in the load, so the ERS and FDS 
+    calculations reuse it.
+
+    :return: tuple (frequency vector, PSD data)
     """
 
     if not hasattr(self, 'bins'):
         raise ValueError('Number of bins ``bins`` must be provided for PSD averaging method.')
     
-    freq_avg, psd_avg = signal.welch(
-        self.time_data, 
-        fs=1 / self.dt, 
-        nperseg=len(self.time_data) // self.bins, 
-        window='boxcar', 
-        scaling='density',
-        )
+    key = (self.bins, self.window, self.overlap)
+    psd = self._psd_cache.get(key)
+    if psd is None:
+        nperseg = len(self.time_data) // self.bins
+        freq, psd = welch_psd(self.time_data, fs=1 / self.dt, nperseg=nperseg, window=self.window, noverlap=int(self.overlap * nperseg))
+        psd = freq, psd * self.scale**2  # the offset is removed by the (constant) detrend of the segments
+        self._psd_cache[key] = psd
+
+    return psd
+
+
+def window_features(time_data, nperseg, n_bands=8, block_size=BLOCK_SIZE):
+    """
+    Returns the logarithms of the band powers of consecutive non-overlapping windows of the signal, used to detect changes 
+    of the RMS level and of the spectral shape (see `stationary_segments`). The frequency range of a window is split into
+    at most ``n_bands`` logarithmically spaced bands. The signal is read block by block.
+
+    :param time_data: signal time data or raw counts (array or memmap)
+    :param nperseg: window length [samples]
+    :param n_bands: number of frequency bands (default: 8)
+    :param block_size: number of samples read at once (default: ``BLOCK_SIZE``)
+
+    :return: array of shape (n_windows, number of bands)
+    """
+    n_windows = len(time_data) // nperseg
+    n_freq = nperseg // 2 + 1
+    edges = np.unique(np.geomspace(1, n_freq, n_bands + 1).astype(int))
+    
+    rows = max(block_size // nperseg, 1)
+    features = []
+    for start in range(0, n_windows, rows):
+        stop = min(start + rows, n_windows)
+        x = np.asarray(time_data[start * nperseg:stop * nperseg], dtype=np.float64).reshape(-1, nperseg)
+        power = np.abs(np.fft.rfft(x - x.mean(axis=1, keepdims=True), axis=1))**2
+        band_power = np.add.reduceat(power[:, edges[0]:], edges[:-1] - edges[0], axis=1) / np.diff(np.append(edges[:-1], n_freq))
+        features.append(np.log(band_power + np.finfo(float).tiny))
+    
+    return np.concatenate(features)
+
+
+def change_points(features, penalty=SEGMENT_PENALTY, min_size=SEGMENT_MIN_WINDOWS):
+    """
+    Detects changes of the mean of a sequence of feature vectors by binary segmentation. The features are normalized 
+    by their noise level (estimated from the differences of consecutive values), and a segment is split where the 
+    decrease of the sum of squared deviations exceeds the penalty ``penalty * n_features * log(n)`` (BIC for ``penalty=1``).
+
+    :param features: array of shape (n, n_features)
+    :param penalty: penalty factor (default: ``SEGMENT_PENALTY``)
+    :param min_size: minimum segment length (default: ``SEGMENT_MIN_WINDOWS``)
+
+    :return: sorted indices of the change points
+    """
+    features = np.asarray(features, dtype=float).reshape(len(features), -1)
+    n, d = features.shape
+    if n < 2 * min_size:
+        return []
+
+    sigma = np.std(np.diff(features, axis=0), axis=0) / np.sqrt(2)
+    f = features / np.where(sigma > 0, sigma, 1)
+
+    cumsum = np.vstack((np.zeros(d), np.cumsum(f, axis=0)))
+    cumsum_2 = np.concatenate(([0], np.cumsum(np.sum(f**2, axis=1))))
+    def cost(a, b):
+        # sum of squared deviations from the mean of the segments [a, b)
+        return cumsum_2[b] - cumsum_2[a] - np.sum((cumsum[b] - cumsum[a])**2, axis=-1) / (b - a)
+
+    threshold = penalty * d * np.log(n)
+    points = []
+    segments = [(0, n)]
+    while segments:
+        a, b = segments.pop()
+        if b - a < 2 * min_size:
+            continue
+        k = np.arange(a + min_size, b - min_size + 1)
+        gain = cost(a, b) - cost(a, k) - cost(k, b)
+        i = np.argmax(gain)
+        if gain[i] > threshold:
+            points.append(int(k[i]))
+            segments += [(a, int(k[i])), (int(k[i]), b)]
     
-    self.psd_data = psd_avg
-    self.psd_freq = freq_avg
+    return sorted(points)
+
+
+def stationary_segments(time_data, nperseg, penalty=SEGMENT_PENALTY, min_windows=SEGMENT_MIN_WINDOWS):
+    """
+    Splits a piecewise stationary signal into stationary segments, at the changes of the RMS level or of the spectral 
+    shape of consecutive windows of ``nperseg`` samples (see `window_features` and `change_points`).
+
+    :param time_data: signal time data or raw counts (array or memmap)
+    :param nperseg: window length [samples]
+    :param penalty: penalty factor of the change-point detection (default: ``SEGMENT_PENALTY``)
+    :param min_windows: minimum number of windows per segment (default: ``SEGMENT_MIN_WINDOWS``)
+
+    :return: array of segment boundaries [samples], from 0 to ``len(time_data)``
+    """
+    points = change_points(window_features(time_data, nperseg), penalty=penalty, min_size=min_windows)
+    return np.array([0] + [p * nperseg for p in points] + [len(time_data)])
+
+
+def segmented_psd(self):
+    """
+    Segmented PSD averaging method: the time history is split into stationary segments (see `stationary_segments`,
+    windows of ``nperseg = len(time_data) // bins`` samples) and Welch's PSD is calculated for each segment, with the 
+    window length ``nperseg`` (see `welch_psd`). The segments are stored in the load, as in `psd_averaging`.
+
+    :return: list of tuples (duration of the segment [s], frequency vector, PSD data)
+    """
+    if not hasattr(self, 'bins'):
+        raise ValueError('Number of bins ``bins`` must be provided for the segmented method.')
+    
+    key = ('segmented', self.bins, self.window, self.overlap)
+    segments = self._psd_cache.get(key)
+    if segments is None:
+        nperseg = len(self.time_data) // self.bins
+        bounds = stationary_segments(self.time_data, nperseg)
+        segments = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            freq, psd = welch_psd(self.time_data[start:stop], fs=1 / self.dt, nperseg=nperseg, window=self.window, 
+                                  noverlap=int(self.overlap * nperseg))
+            segments.append(((stop - start) * self.dt, freq, psd * self.scale**2))
+        self._psd_cache[key] = segments
+    
+    return segments
+
 
 def material_parameters_convert(sigma_f, b, range = False):
     """
@@ -0,0 +1,202 @@
+"""
+Splitting the ERS and FDS calculation of random time loads into self-contained work units for distributed runs.
+
+A calculation is split (`split`) into work units of natural frequency slices and time segments. Every unit contains its
+part of the time history and all parameters, can be written to a file (`export`) and calculated independently on any
+machine (`run_unit`, `run_file`), without the package state of the process that created it. The partial results (maxima of
+the responses, damage sums of closed rainflow cycles and rainflow residues) are combined with `merge`::
+
+    units = work_units.split(sd.load, sd.f0_range, sd.damp, k=5, n_f0=4, n_segments=8)
+    files = work_units.export(units, 'units')
+    results = work_units.run_local(files, 'results')  # or run ``run_file`` for every file on a cluster
+    f0_range, ers, fds = work_units.merge(results)
+
+Time segments start from rest ``warm_up_samples`` before the segment, so the response at the start of the segment is
+the response to the whole time history up to the relative error ``eps``. The rainflow residues of the segments are joined
+and counted in order, so the merged FDS equals the single-process result (see `signals.random_time`), up to ``eps`` and
+rounding.
+"""
+import os
+import glob
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import signal
+
+from . import tools
+from . import backends
+from .tools import warm_up_samples
+
+
+def split(load, f0_range, damp, k=None, C=1, p=1, n_f0=1, n_segments=1, eps=1e-12):
+    """
+    Split the ERS and FDS calculation of a random time load into ``n_f0 * n_segments`` work units.
+
+    :param load: `compute.Load` of a random time signal (``method='convolution'``, without the multirate scheme and repetitions)
+    :param f0_range: natural frequencies [Hz]
+    :param damp: damping ratio [/]
+    :param k: S-N curve slope from Basquin equation; if None, only the ERS is calculated (default: None)
+    :param C: material constant from Basquin equation (default: C=1)
+    :param p: constant of proportionality between stress and deformation (default: p=1)
+    :param n_f0: number of natural frequency slices (default: 1)
+    :param n_segments: number of time segments (default: 1)
+    :param eps: relative error of the response at the start of a time segment, see `warm_up_samples` (default: 1e-12)
+
+    :return: list of work units (dictionaries)
+    """
+    if load.signal_type != 'random_time' or load.method != 'convolution' or load.multirate or load.repeat != 1:
+        raise ValueError('Work units are supported for random time loads with the ``convolution`` method, without the multirate scheme and repetitions')
+    f0_range = np.asarray(f0_range, dtype=float)
+    if np.any(f0_range <= 0):
+        raise ValueError('Natural frequencies must be positive')
+    N = len(load.time_data)
+    if not 1 <= n_segments <= N:
+        raise ValueError('``n_segments`` must be between 1 and the length of the time history')
+
+    bounds = np.linspace(0, N, n_segments + 1).astype(int)
+    units = []
+    for i, f0_slice in enumerate(np.array_split(f0_range, min(n_f0, len(f0_range)))):
+        warm_up = warm_up_samples(f0_slice.min(), damp, load.dt, eps)
+        for j in range(n_segments):
+            start = max(bounds[j] - warm_up, 0)
+            units.append(dict(f0_slice=i, segment=j, n_segments=n_segments, f0=f0_slice, time_data=load.time_data[start:bounds[j + 1]],
+                              skip=bounds[j] - start, dt=load.dt, damp=damp, scale=load.scale, offset=load.offset,
+                              unit_scale=load.unit_scale, k=k, C=C, p=p))
+    return units
+
+
+def run_unit(unit, dtype=np.float64):
+    """
+    Calculate a work unit.
+
+    :param unit: work unit (see `split`)
+    :param dtype: floating point precision of the response (default: np.float64)
+
+    :return: partial result (dictionary), see `merge`
+    """
+    b, a = tools.sdof_filter_coefficients(unit['f0'], unit['dt'], unit['damp'])
+    x = tools.scaled_signal(unit['time_data'], dtype=dtype, scale=unit['scale'], offset=unit['offset'])
+
+    n = len(unit['f0'])
+    z_max = np.zeros(n)
+    damage = np.zeros(n)
+    n_cycles = np.zeros(n, dtype=int)
+    residues = []
+    for i in range(n):
+        z = signal.lfilter(b[i].astype(dtype), a[i].astype(dtype), x)[unit['skip']:]
+        z_max[i] = np.max(z)
+        if unit['k'] is not None:
+            damage[i], n_cycles[i], residue = backends.get('rainflow_residue')(tools.turning_points(z), unit['k'])
+            residues.append(residue)
+
+    result = {name: unit[name] for name in ['f0_slice', 'segment', 'n_segments', 'f0', 'unit_scale', 'k', 'C', 'p']}
+    result.update(z_max=z_max, damage=damage, n_cycles=n_cycles, residue=np.concatenate(residues) if residues else np.zeros(0),
+                  residue_lengths=np.array([len(r) for r in residues], dtype=int))
+    return result
+
+
+def merge(results):
+    """
+    Merge the partial results of all work units of a calculation.
+
+    :param results: partial results (dictionaries, see `run_unit`, or file names, see `run_file`)
+
+    :return: f0_range, ERS, FDS (None if ``k`` was not given)
+    """
+    results = [load_file(r) if isinstance(r, (str, os.PathLike)) else r for r in results]
+    slices = {}
+    for result in results:
+        slices.setdefault(result['f0_slice'], []).append(result)
+
+    f0_range, ers, fds = [], [], []
+    for i in sorted(slices):
+        parts = sorted(slices[i], key=lambda r: r['segment'])
+        if [r['segment'] for r in parts] != list(range(parts[0]['n_segments'])):
+            raise ValueError(f'Missing or duplicate work units of the natural frequency slice {i}')
+        f_0 = parts[0]['f0']
+        k, C, p, unit_scale = (parts[0][name] for name in ['k', 'C', 'p', 'unit_scale'])
+
+        f0_range.append(f_0)
+        ers.append(np.max([r['z_max'] for r in parts], axis=0) * (2 * np.pi * f_0)**2)
+        if k is None:
+            continue
+
+        residues = [np.split(r['residue'], np.cumsum(r['residue_lengths'])[:-1]) for r in parts]
+        damage = np.zeros(len(f_0))
+        for j in range(len(f_0)):
+            # residues of consecutive segments are joined and counted in order
+            total = sum(r['damage'][j] for r in parts)
+            n_cycles = sum(r['n_cycles'][j] for r in parts)
+            residue = np.zeros(0)
+            for part_residues in residues:
+                residue = tools.turning_points(np.concatenate((residue, part_residues[j])))
+                d, n, residue = backends.get('rainflow_residue')(residue, k)
+                total += d
+                n_cycles += n
+            if n_cycles > 0 or len(residue) > 2:  # as in `tools.rainflow_damage`, a monotonic signal has no cycles
+                total += tools.residue_damage(residue, k)
+            damage[j] = total
+        fds.append(p**k / C * damage * unit_scale**k)
+
+    return np.concatenate(f0_range), np.concatenate(ers), np.concatenate(fds) if fds else None
+
+
+def save_file(filename, data):
+    """
+    Write a work unit or a partial result to a ``.npz`` file.
+    """
+    np.savez(filename, **{name: np.nan if value is None else value for name, value in data.items()})
+
+
+def load_file(filename):
+    """
+    Read a work unit or a partial result from a ``.npz`` file.
+    """
+    with np.load(filename) as f:
+        data = {name: f[name][()] if f[name].ndim == 0 else f[name] for name in f.files}
+    if np.isnan(data['k']):
+        data['k'] = None
+    return data
+
+
+def export(units, directory):
+    """
+    Write work units to the files ``<directory>/unit_<f0 slice>_<segment>.npz``.
+
+    :return: file names
+    """
+    os.makedirs(directory, exist_ok=True)
+    filenames = []
+    for unit in units:
+        filename = os.path.join(directory, f"unit_{unit['f0_slice']:04d}_{unit['segment']:04d}.npz")
+        save_file(filename, unit)
+        filenames.append(filename)
+    return filenames
+
+
+def run_file(filename, output):
+    """
+    Calculate the work unit stored in ``filename`` and write the partial result to the directory ``output``.
+
+    :return: file name of the partial result
+    """
+    os.makedirs(output, exist_ok=True)
+    result_filename = os.path.join(output, os.path.basename(filename))
+    save_file(result_filename, run_unit(load_file(filename)))
+    return result_filename
+
+
+def run_local(filenames, output, max_workers=None):
+    """
+    Calculate work unit files in a local pool of worker processes (a stand-in for a cluster, see `run_file`).
+
+    :param filenames: file names of work units, or a directory
+    :param output: output directory of the partial results
+    :param max_workers: number of worker processes (default: number of CPUs)
+
+    :return: file names of the partial results
+    """
+    if isinstance(filenames, (str, os.PathLike)):
+        filenames = sorted(glob.glob(os.path.join(filenames, 'unit_*.npz')))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_file, filenames, [output] * len(filenames)))
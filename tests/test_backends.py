@@ -0,0 +1,99 @@
+import os
+import sys
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import backends
+
+from test_data import *
+
+
+@pytest.fixture
+def backend(request):
+    backends.set_backend(request.param)
+    yield request.param
+    backends.set_backend(None)
+
+
+class TestBackends:
+    """ Testing the conformance of all available compute backends with the reference implementation """
+
+    @pytest.mark.parametrize('backend', backends.available('sweep_integral'), indirect=True)
+    def test_sine_sweep(self, backend):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(0, 2000, 5))
+        sd.set_sine_sweep_load(const_amp=[5,10,20], const_f_range=[20,100,500,1000], exc_type='acc', sweep_type='log', sweep_rate=1)
+        sd.get_fds(k=5, C=1, p=1)
+
+        assert np.allclose(sd.fds, sine_sweep_fds_true)
+
+    @pytest.mark.parametrize('backend', backends.available('integrals_b'), indirect=True)
+    def test_random_psd(self, backend):
+        _psd_data = np.load('test_data/test_psd.npy', allow_pickle=True)
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 5))
+        sd.set_random_load((_psd_data[:,1], _psd_data[:,0]), unit='g', T=133.5711234541)
+        sd.get_ers()
+        sd.get_fds(k=5, C=1, p=1)
+
+        assert np.allclose(sd.ers, random_psd_ers_true)
+        assert np.allclose(sd.fds, random_psd_fds_true)
+
+    @pytest.mark.parametrize('name', backends.available('sdof_turning_points'))
+    def test_turning_points(self, name):
+        rng = np.random.default_rng(0)
+        time_data = rng.normal(size=5000)
+        for f_0 in [20, 150, 400]:
+            tp = backends.get('sdof_turning_points', name)(time_data, 1e-3, f_0, 0.05, interpolate_peak=True)
+            tp_ref = FatigueDS.tools.sdof_turning_points(time_data, 1e-3, f_0, 0.05, interpolate_peak=True)
+            assert np.allclose(tp, tp_ref, rtol=1e-8, atol=1e-12 * np.max(np.abs(tp_ref)))
+
+        raw = np.round(time_data * 1000).astype(np.int16)
+        tp = backends.get('sdof_turning_points', name)(raw, 1e-3, 150, 0.05, scale=0.001, offset=0.5)
+        tp_ref = FatigueDS.tools.sdof_turning_points(raw * 0.001 + 0.5, 1e-3, 150, 0.05)
+        assert np.allclose(tp, tp_ref, rtol=1e-8, atol=1e-12 * np.max(np.abs(tp_ref)))
+
+    @pytest.mark.parametrize('name', backends.available('rainflow_damage'))
+    def test_rainflow_damage(self, name):
+        rng = np.random.default_rng(0)
+        z = np.cumsum(rng.normal(size=2000))
+        for signal in [z, np.round(z), z[:2], z[:3]]:
+            assert np.isclose(backends.get('rainflow_damage', name)(signal, 5), FatigueDS.tools.rainflow_damage(signal, 5))
+
+    @pytest.mark.parametrize('name', backends.available('rainflow_residue'))
+    def test_rainflow_residue(self, name):
+        rng = np.random.default_rng(0)
+        z = FatigueDS.tools.turning_points(np.cumsum(rng.normal(size=2000)))
+        damage, n_cycles, residue = backends.get('rainflow_residue', name)(z, 5)
+        damage_ref, n_cycles_ref, residue_ref = FatigueDS.tools.rainflow_residue(z, 5)
+        assert np.isclose(damage, damage_ref) and n_cycles == n_cycles_ref
+        assert np.array_equal(residue, residue_ref)
+        assert np.isclose(damage + FatigueDS.tools.residue_damage(residue, 5), FatigueDS.tools.rainflow_damage(z, 5))
+
+    @pytest.mark.parametrize('backend', backends.available('rainflow_damage'), indirect=True)
+    def test_random_time(self, backend):
+        rng = np.random.default_rng(0)
+        time_data = rng.normal(size=5000)
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 10), progress_bar=False)
+        sd.set_random_load((time_data, 1e-3), unit='g')
+        sd.get_ers()
+        sd.get_fds(k=5)
+
+        sd_ref = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 10), progress_bar=False)
+        sd_ref.set_random_load((time_data, 1e-3), unit='g')
+        backends.set_backend('numpy')
+        sd_ref.get_ers()
+        sd_ref.get_fds(k=5)
+
+        assert np.allclose(sd.ers, sd_ref.ers)
+        assert np.allclose(sd.fds, sd_ref.fds)
+
+    def test_set_backend(self):
+        with pytest.raises(ValueError):
+            backends.set_backend('unknown', kernel='rainflow_damage')
+        backends.set_backend('numpy', kernel='rainflow_damage')
+        assert backends.get('rainflow_damage') is backends.get('rainflow_damage', 'numpy')
+        backends.set_backend(None)
+        assert backends.get('rainflow_damage') is backends.get('rainflow_damage', backends.available('rainflow_damage')[0])
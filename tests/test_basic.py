@@ -2,6 +2,8 @@ import pytest
 import numpy as np
 import sys
 import os
+import types
+import FLife
 
 my_path = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, my_path + '/../')
@@ -86,3 +88,92 @@ class TestCore:
         assert np.allclose(sd_averaging.fds, random_time_averaging_fds_true)
 
 
+
+    def test_adaptive_freq_range(self):
+        """ Test the adaptive refinement of the natural frequency range """
+        sd_adaptive = FatigueDS.SpecificationDevelopment(freq_data=(10, 2000, 1))
+        sd_adaptive.set_sine_load(sine_freq=500, amp=10, t_total=3600)
+        sd_adaptive.get_ers(adaptive=True, tol=1e-3)
+
+        sd_dense = FatigueDS.SpecificationDevelopment(freq_data=np.geomspace(10, 2000, 20000))
+        sd_dense.set_sine_load(sine_freq=500, amp=10, t_total=3600)
+        sd_dense.get_ers()
+
+        ers_interp = np.exp(np.interp(np.log(sd_dense.f0_range), np.log(sd_adaptive.f0_range), np.log(sd_adaptive.ers)))
+
+        assert len(sd_adaptive.f0_range) < 1991 / 5
+        assert np.all(np.diff(sd_adaptive.f0_range) > 0)
+        assert np.allclose(ers_interp, sd_dense.ers, rtol=1e-2)
+
+    def test_add_frequencies(self):
+        """ Test extending the natural frequency range of a calculated spectrum """
+        _psd_data = np.load('test_data/test_psd.npy', allow_pickle=True)
+        psd_freq = _psd_data[:,0]
+        psd_data = _psd_data[:,1]
+
+        sd_extended = FatigueDS.SpecificationDevelopment(freq_data=(100, 200, 5))
+        sd_extended.set_random_load((psd_data, psd_freq), unit='g', T=133.5711234541)
+        sd_extended.get_ers()
+        sd_extended.get_fds(k=5, C=1, p=1)
+        sd_extended.add_frequencies((20, 100, 5))
+        sd_extended.add_frequencies(np.array([112.5, 137.5]))
+
+        sd_full = FatigueDS.SpecificationDevelopment(freq_data=np.sort(np.r_[np.arange(20, 205, 5), 112.5, 137.5]))
+        sd_full.set_random_load((psd_data, psd_freq), unit='g', T=133.5711234541)
+        sd_full.get_ers()
+        sd_full.get_fds(k=5, C=1, p=1)
+
+        assert np.allclose(sd_extended.f0_range, sd_full.f0_range)
+        assert np.allclose(sd_extended.ers, sd_full.ers)
+        assert np.allclose(sd_extended.fds, sd_full.fds)
+
+    def test_float32(self):
+        """ Test the single-precision compute mode against the reference data """
+        sd_sine_sweep = FatigueDS.SpecificationDevelopment(freq_data=(0, 2000, 5), dtype=np.float32)
+        sd_sine_sweep.set_sine_sweep_load(const_amp=[5,10,20], const_f_range=[20,100,500,1000], exc_type='acc', sweep_type='log', sweep_rate=1)
+        sd_sine_sweep.get_ers()
+        sd_sine_sweep.get_fds(k=5, C=1, p=1)
+
+        assert np.allclose(sd_sine_sweep.ers, sine_sweep_ers_true, rtol=1e-4)
+        assert np.allclose(sd_sine_sweep.fds, sine_sweep_fds_true, rtol=1e-4)
+
+        rng = np.random.default_rng(0)
+        time_history_data = rng.normal(size=10000)
+        sd_64 = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 5))
+        sd_32 = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 5), dtype=np.float32)
+        for sd in [sd_64, sd_32]:
+            sd.set_random_load((time_history_data, 1e-3), unit='g')
+            sd.get_ers()
+            sd.get_fds(k=5, C=1, p=1)
+
+        assert sd_32.fds.dtype == np.float64
+        assert np.allclose(sd_32.ers, sd_64.ers, rtol=1e-4)
+        assert np.allclose(sd_32.fds, sd_64.fds, rtol=1e-4, atol=0)
+
+    def test_spectral_methods(self):
+        """ Test the broadband spectral methods of the random psd function """
+        _psd_data = np.load('test_data/test_psd.npy', allow_pickle=True)
+        psd_freq = _psd_data[:,0]
+        psd_data = _psd_data[:,1]
+
+        sd_PSD = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 5))
+        sd_PSD.set_random_load((psd_data, psd_freq), unit='g', T=133.5711234541)
+
+        moments = FatigueDS.tools.spectral_moments(sd_PSD.f0_range, psd_freq, psd_data * 9.81**2, sd_PSD.damp)
+        fds_narrowband = 2 * 133.5711234541 * FatigueDS.tools.spectral_damage_intensity(*moments, k=5, method='narrowband')
+        assert np.allclose(fds_narrowband, random_psd_fds_true, rtol=1e-6, atol=0)
+
+        # reference: FLife estimators evaluated with the same spectral moments at every natural frequency
+        estimators = {'dirlik': (FLife.Dirlik, {}), 'tovo_benasciutti': (FLife.TovoBenasciutti, {'method': 'method 2'}),
+                      'zhao_baker': (FLife.ZhaoBaker, {'method': 'method 1'})}
+        spectral_data = []
+        for m0, m1, m2, m4 in zip(*moments):
+            spectral_data.append(types.SimpleNamespace(moments=(m0, m1, m2, None, m4), nu=np.sqrt(m2 / m0), m_p=np.sqrt(m4 / m2),
+                                                       alpha1=m1 / np.sqrt(m0 * m2), alpha2=m2 / np.sqrt(m0 * m4)))
+
+        for method, (estimator, kwargs) in estimators.items():
+            sd_PSD.get_fds(k=5, C=1, p=1, spectral_method=method)
+            life = np.array([estimator(data).get_life(C=1, k=5, **kwargs) for data in spectral_data])
+            np.testing.assert_allclose(sd_PSD.fds, 2 * 133.5711234541 / life, rtol=1e-10)
+            assert np.all(sd_PSD.fds <= random_psd_fds_true * 1.01)
+            assert np.all(sd_PSD.fds > 0.5 * random_psd_fds_true)
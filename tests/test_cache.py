@@ -0,0 +1,101 @@
+import os
+import sys
+import pytest
+import numpy as np
+import rainflow
+import scipy.signal
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS.cache import ResponseCache
+
+
+def random_time_signal(N=4000, dt=1/2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=N), dt
+
+
+class TestResponseCache:
+    """ Testing the memoization of SDOF responses """
+
+    def test_turning_points_rainflow(self):
+        x, dt = random_time_signal()
+        z = FatigueDS.tools.response_relative_displacement(x, dt, f_0=100, damp=0.05)
+        tp = FatigueDS.tools.turning_points(z)
+
+        assert len(tp) < len(z)
+        assert np.max(tp) == np.max(z)
+        assert np.allclose(rainflow.count_cycles(tp), rainflow.count_cycles(z))
+
+    def test_repeated_calls(self):
+        x, dt = random_time_signal()
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20))
+        sd_ref = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20), cache_size=0)
+        sd.set_random_load((x, dt), unit='g')
+        sd_ref.set_random_load((x, dt), unit='g')
+
+        sd.get_ers()
+        sd.get_fds(k=5)
+        sd.get_fds(k=8)
+        sd_ref.get_fds(k=8)
+
+        assert sd._response_cache.misses == len(sd.f0_range)
+        assert sd._response_cache.hits == 2 * len(sd.f0_range)
+        assert len(sd_ref._response_cache) == 0
+        assert np.allclose(sd.fds, sd_ref.fds)
+
+    def test_invalidation(self):
+        x, dt = random_time_signal()
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20))
+        sd.set_random_load((x, dt))
+        sd.get_ers()
+        ers_1 = sd.ers
+
+        sd.set_random_load((2 * x, dt))
+        assert len(sd._response_cache) == 0
+        sd.get_ers()
+        assert np.allclose(sd.ers, 2 * ers_1)
+
+        FatigueDS.tools.convert_Q_damp(sd, Q=20)
+        assert len(sd._response_cache) == 0
+
+    def test_memory_cap(self):
+        cache = ResponseCache(max_bytes=3 * 800)
+        for i in range(5):
+            assert cache.put(i, np.zeros(100))
+        assert not cache.put('large', np.zeros(400))
+        cache.get(2)
+        cache.put(5, np.zeros(100))
+
+        assert cache.nbytes <= cache.max_bytes
+        assert 2 in cache and 5 in cache
+        assert 3 not in cache
+
+    def test_add_frequencies(self):
+        x, dt = random_time_signal()
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20))
+        sd.set_random_load((x, dt))
+        sd.get_fds(k=5)
+        sd.add_frequencies((30, 190, 20))
+
+        assert sd._response_cache.misses == len(sd.f0_range)
+        assert len(sd.fds) == len(sd.f0_range) == 19
+
+    def test_multirate(self):
+        x, dt = random_time_signal(N=40000, dt=1/10000)
+        x = scipy.signal.lfilter(*scipy.signal.butter(4, 0.2), x)  # content up to 1 kHz
+
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(10, 200, 10))
+        sd_multirate = FatigueDS.SpecificationDevelopment(freq_data=(10, 200, 10))
+        sd.set_random_load((x, dt))
+        sd_multirate.set_random_load((x, dt), multirate=True)
+        for _sd in [sd, sd_multirate]:
+            _sd.get_ers()
+            _sd.get_fds(k=5)
+
+        assert sorted(sd_multirate._decimated_data) == [1, 2, 4, 8, 16, 32]
+        # documented accuracy of the multirate scheme: about 1 % (see `tools.response_turning_points`)
+        np.testing.assert_allclose(sd_multirate.ers, sd.ers, rtol=1e-2)
+        np.testing.assert_allclose(sd_multirate.fds, sd.fds, rtol=1.5e-2)
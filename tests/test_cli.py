@@ -0,0 +1,111 @@
+import os
+import sys
+import json
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import cli
+
+
+class TestCLI:
+    """ Testing the batch command line tool """
+
+    def test_time_histories(self, tmp_path):
+        rng = np.random.default_rng(0)
+        input_dir = tmp_path / 'recordings'
+        input_dir.mkdir()
+        for i in range(3):
+            np.save(input_dir / f'run_{i}.npy', rng.normal(size=4000))
+        (np.round(rng.normal(size=4000) * 1000).astype(np.int16)).tofile(input_dir / 'run_raw.bin')
+
+        config = tmp_path / 'config.json'
+        config.write_text(json.dumps({'f0': [20, 200, 20], 'Q': 10, 'k': 5, 'fs': 2000, 'scale': 0.001}))
+        output = tmp_path / 'spectra'
+        assert cli.main([str(input_dir), '--config', str(config), '-o', str(output), '--workers', '2']) == 0
+
+        ers = []
+        for name in ['run_0', 'run_1', 'run_2', 'run_raw']:
+            with np.load(output / f'{name}.npz') as data:
+                ers.append(data['ers'])
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20))
+        sd.set_random_load((np.load(input_dir / 'run_1.npy'), 1 / 2000))
+        sd.get_ers()
+        assert np.allclose(ers[1], sd.ers)
+
+        with np.load(output / 'envelope.npz') as envelope:
+            assert envelope['count'] == 4
+            assert np.allclose(envelope['ers_max'], np.max(ers, axis=0))
+            assert 'fds_sum' in envelope
+
+        # resume: processed files are skipped
+        mtime = os.path.getmtime(output / 'run_0.npz')
+        os.remove(output / 'run_2.npz')
+        cli.main([str(input_dir / '*.npy'), str(input_dir / '*.bin'), '--config', str(config), '-o', str(output), '--workers', '1'])
+        assert os.path.getmtime(output / 'run_0.npz') == mtime
+        assert os.path.isfile(output / 'run_2.npz')
+        with np.load(output / 'envelope.npz') as envelope:
+            assert envelope['count'] == 4
+
+    def test_changed_settings(self, tmp_path):
+        np.save(tmp_path / 'run.npy', np.random.default_rng(2).normal(size=4000))
+        output = tmp_path / 'spectra'
+        options = [str(tmp_path / 'run.npy'), '-o', str(output), '--fs', '2000', '--f0', '20', '200', '20', '--workers', '1']
+
+        cli.main([*options, '--k', '5'])
+        mtime = os.path.getmtime(output / 'run.npz')
+        cli.main([*options, '--k', '5'])
+        assert os.path.getmtime(output / 'run.npz') == mtime
+
+        for changed in [['--k', '6'], ['--k', '6', '--damp', '0.02'], ['--k', '6', '--damp', '0.02', '--spectral-method', 'dirlik']]:
+            os.utime(output / 'run.npz', (0, 0))
+            cli.main([*options, *changed])
+            assert os.path.getmtime(output / 'run.npz') > 0
+
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20), damp=0.02, progress_bar=False)
+        sd.set_random_load((np.load(tmp_path / 'run.npy'), 1 / 2000))
+        sd.get_fds(k=6)
+        with np.load(output / 'run.npz') as data:
+            np.testing.assert_allclose(data['fds'], sd.fds)
+
+    def test_config_values(self, tmp_path):
+        # values from the config file are converted as command line values, so both give the same settings
+        config = tmp_path / 'config.json'
+        config.write_text(json.dumps({'f0': [20, 200, 20], 'fs': 2000, 'k': 5}))
+        args = cli.parse_args([str(tmp_path), '-o', str(tmp_path / 'out'), '--config', str(config)])
+        args_cli = cli.parse_args([str(tmp_path), '-o', str(tmp_path / 'out'), '--f0', '20', '200', '20', '--fs', '2000', '--k', '5'])
+        assert cli.spectrum_settings(vars(args)) == cli.spectrum_settings(vars(args_cli))
+
+        config.write_text(json.dumps({'fs': 2000, 'spectral_method': 'dirlk'}))
+        with pytest.raises(SystemExit):
+            cli.parse_args([str(tmp_path), '-o', str(tmp_path / 'out'), '--config', str(config)])
+        with pytest.raises(SystemExit):
+            cli.parse_args([str(tmp_path), '-o', str(tmp_path / 'out'), '--fs', '2000', '--spectral-method', 'dirlk'])
+
+    def test_prefetch(self, tmp_path):
+        rng = np.random.default_rng(1)
+        for i in range(3):
+            np.save(tmp_path / f'run_{i}.npy', rng.normal(size=4000))
+        (np.round(rng.normal(size=4000) * 1000).astype(np.int16)).tofile(tmp_path / 'run_raw.bin')
+        options = ['--fs', '2000', '--f0', '20', '200', '20', '--k', '5', '--scale', '0.001', '--workers', '1']
+        cli.main([str(tmp_path), '-o', str(tmp_path / 'mapped'), *options])
+        cli.main([str(tmp_path), '-o', str(tmp_path / 'prefetched'), '--prefetch', '2', *options])
+
+        for name in ['run_0', 'run_1', 'run_2', 'run_raw']:
+            with np.load(tmp_path / 'mapped' / f'{name}.npz') as mapped, np.load(tmp_path / 'prefetched' / f'{name}.npz') as prefetched:
+                np.testing.assert_array_equal(mapped['ers'], prefetched['ers'])
+                np.testing.assert_array_equal(mapped['fds'], prefetched['fds'])
+
+    def test_psd(self, tmp_path):
+        np.save(tmp_path / 'psd.npy', np.load('test_data/test_psd.npy', allow_pickle=True).astype(float))
+        cli.main([str(tmp_path / 'psd.npy'), '--signal', 'psd', '--T', '10', '--f0', '20', '200', '20', '--k', '5', '-o', str(tmp_path / 'out'), '--workers', '1'])
+
+        with np.load(tmp_path / 'out' / 'psd.npz') as data:
+            assert data['fds'].shape == data['f0_range'].shape == (10,)
+
+    def test_missing_options(self, tmp_path):
+        with pytest.raises(SystemExit):
+            cli.main([str(tmp_path), '-o', str(tmp_path / 'out')])
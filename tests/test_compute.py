@@ -0,0 +1,121 @@
+import os
+import sys
+import pickle
+import pytest
+import numpy as np
+import scipy.signal
+from concurrent.futures import ThreadPoolExecutor
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import compute
+from FatigueDS.cache import ResponseCache
+
+from test_data import *
+
+
+class TestCompute:
+    """ Testing the stateless compute API """
+
+    def test_wrapper(self):
+        load = compute.sine_sweep_load(const_amp=[5,10,20], const_f_range=[20,100,500,1000], exc_type='acc', sweep_type='log', sweep_rate=1)
+        f0_range = FatigueDS.tools.get_freq_range(None, (0, 2000, 5))
+
+        assert np.allclose(compute.ers(load, f0_range, damp=0.05), sine_sweep_ers_true)
+        assert np.allclose(compute.fds(load, f0_range, damp=0.05, k=5), sine_sweep_fds_true)
+
+    def test_immutable_load(self):
+        rng = np.random.default_rng(0)
+        load = compute.random_load((rng.normal(size=1000), 1e-3))
+
+        with pytest.raises(AttributeError):
+            load.dt = 1
+        with pytest.raises(ValueError):
+            load.time_data[0] = 1
+
+        load_copy = pickle.loads(pickle.dumps(load))
+        assert np.array_equal(load_copy.time_data, load.time_data)
+        assert load_copy._load_id != load._load_id
+
+    def test_psd_averaging(self):
+        rng = np.random.default_rng(0)
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 10))
+        sd.set_random_load((rng.normal(size=20000), 1e-3), method='psd_averaging', bins=10)
+        sd.get_ers()
+        sd.get_fds(k=5)
+
+        assert not hasattr(sd, 'psd_data')
+        assert np.all(sd.ers > 0) and np.all(sd.fds > 0)
+
+    def test_threads(self):
+        rng = np.random.default_rng(0)
+        load = compute.random_load((rng.normal(size=20000), 1e-3), unit='g', multirate=True)
+        f0_range = np.arange(10, 210, 10, dtype=float)
+        cache = ResponseCache()
+        k_values = [3, 5, 8, 3, 5, 8]
+
+        fds_serial = [compute.fds(load, f0_range, damp=0.05, k=k) for k in k_values]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            fds_threads = list(executor.map(lambda k: compute.fds(load, f0_range, damp=0.05, k=k, cache=cache), k_values))
+
+        assert np.allclose(fds_threads, fds_serial)
+        assert len(cache) == len(f0_range)
+
+    def test_welch_psd(self, tmp_path):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=100003)
+        np.save(tmp_path / 'x.npy', x)
+        x_memmap = np.load(tmp_path / 'x.npy', mmap_mode='r')
+
+        for window, noverlap in [('boxcar', None), ('hann', 1000)]:
+            freq_ref, psd_ref = scipy.signal.welch(x, fs=1000, window=window, nperseg=4001, noverlap=noverlap)
+            freq, psd = FatigueDS.tools.welch_psd(x_memmap, 1000, 4001, window=window, noverlap=noverlap, block_size=7000)
+            _, psd_chunks = FatigueDS.tools.welch_psd(np.array_split(x, 50), 1000, 4001, window=window, noverlap=noverlap)
+
+            assert np.allclose(freq, freq_ref)
+            assert np.allclose(psd, psd_ref)
+            assert np.allclose(psd_chunks, psd_ref)
+
+    def test_psd_cache(self):
+        rng = np.random.default_rng(0)
+        load = compute.random_load((rng.normal(size=20000), 1e-3), method='psd_averaging', bins=10, window='hann', overlap=0.25)
+        compute.ers(load, np.arange(20, 210, 10), damp=0.05)
+        compute.fds(load, np.arange(20, 210, 10), damp=0.05, k=5)
+
+        assert list(load._psd_cache) == [(10, 'hann', 0.25)]
+        freq, psd = load._psd_cache[(10, 'hann', 0.25)]
+        _, psd_ref = scipy.signal.welch(load.time_data, fs=1000, window='hann', nperseg=2000, noverlap=500)
+        assert np.allclose(psd, psd_ref)
+
+    def test_raw_counts(self, tmp_path):
+        rng = np.random.default_rng(0)
+        raw = np.round(rng.normal(size=20000) * 1000).astype(np.int16)
+        np.save(tmp_path / 'raw.npy', raw)
+        raw_memmap = np.load(tmp_path / 'raw.npy', mmap_mode='r')
+        x = raw * 0.002 + 0.1
+        f0_range = np.arange(10, 210, 10, dtype=float)
+        filter_bank = FatigueDS.FilterBank(1e-3, f0_range, 0.05)
+
+        for options in [dict(), dict(multirate=True), dict(method='psd_averaging', bins=10)]:
+            load = compute.random_load((raw_memmap, 1e-3), unit='g', scale=0.002, offset=0.1, **options)
+            load_ref = compute.random_load((x, 1e-3), unit='g', **options)
+
+            assert load.time_data.dtype == np.int16
+            assert np.allclose(compute.ers(load, f0_range, 0.05), compute.ers(load_ref, f0_range, 0.05))
+            assert np.allclose(compute.fds(load, f0_range, 0.05, k=5), compute.fds(load_ref, f0_range, 0.05, k=5))
+            assert np.allclose(compute.fds(load, f0_range, 0.05, k=5, filter_bank=filter_bank), compute.fds(load_ref, f0_range, 0.05, k=5))
+
+    def test_filtered_turning_points(self):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=5001)
+        b, a = FatigueDS.tools.sdof_filter_coefficients(50, 1e-3, 0.05)
+        tp_ref = FatigueDS.tools.sdof_turning_points(x, 1e-3, 50, 0.05, interpolate_peak=True)
+
+        for block_size in [7, 100, 5001]:
+            tp = FatigueDS.tools.filtered_turning_points(x, b, a, interpolate_peak=True, block_size=block_size)
+            assert np.allclose(tp, tp_ref, rtol=1e-8, atol=1e-12 * np.max(np.abs(tp_ref)))
+            
+            x_decimated = FatigueDS.tools.decimate_by_2(x, scale=2, offset=1, block_size=2 * block_size)
+            assert np.allclose(x_decimated, scipy.signal.resample_poly(2 * x + 1, 1, 2))
@@ -0,0 +1,44 @@
+import os
+import sys
+import pickle
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+
+
+class TestFilterBank:
+    """ Testing the precomputed recursive SDOF filter bank """
+
+    def test_response(self):
+        rng = np.random.default_rng(0)
+        time_data = rng.normal(size=5000)
+        filter_bank = FatigueDS.FilterBank(dt=1e-3, f0_range=np.arange(20, 205, 5, dtype=float), damp=0.05)
+
+        for f_0 in filter_bank.f0_range[::6]:
+            z = FatigueDS.tools.response_relative_displacement(time_data, 1e-3, f_0=f_0, damp=0.05)
+            assert np.allclose(filter_bank.response(time_data, f_0), z, rtol=1e-8, atol=1e-12 * np.max(np.abs(z)))
+
+    def test_spec_dev(self, tmp_path):
+        rng = np.random.default_rng(0)
+        time_data = rng.normal(size=5000)
+        filter_bank = FatigueDS.FilterBank(dt=1e-3, f0_range=np.arange(20, 205, 5, dtype=float), damp=0.05)
+        filter_bank.save(tmp_path / 'bank.npz')
+
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 5), damp=0.05)
+        sd_bank = FatigueDS.SpecificationDevelopment(filter_bank=pickle.loads(pickle.dumps(filter_bank)))
+        sd_loaded = FatigueDS.SpecificationDevelopment(filter_bank=FatigueDS.FilterBank.load(tmp_path / 'bank.npz'))
+        for _sd in [sd, sd_bank, sd_loaded]:
+            _sd.set_random_load((time_data, 1e-3), unit='g')
+            _sd.get_ers()
+            _sd.get_fds(k=5)
+
+        assert np.allclose(sd_bank.ers, sd.ers)
+        assert np.allclose(sd_bank.fds, sd.fds, rtol=1e-8, atol=0)
+        assert np.allclose(sd_loaded.fds, sd_bank.fds, rtol=1e-12, atol=0)
+
+        with pytest.raises(ValueError):
+            sd_bank.set_random_load((time_data, 2e-3))
@@ -0,0 +1,74 @@
+import os
+import sys
+import pickle
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import tools, backends
+
+
+class TestIntegralTable:
+    """ Testing the tabulated integrals I_b of the PSD method """
+
+    @pytest.mark.parametrize('damp', [0.01, 0.05, 0.3])
+    def test_error_bound(self, damp):
+        table = FatigueDS.IntegralTable(damp)
+        assert table.max_error <= table.tol
+
+        rng = np.random.default_rng(0)
+        # resonance, table range and both asymptotic ranges
+        h = np.concatenate(([0], rng.uniform(max(1 - 5 * damp, 0), 1 + 5 * damp, 20000), np.geomspace(1e-6, 1e6, 20001)))
+        for b in [0, 1, 2, 4]:
+            np.testing.assert_allclose(table(h, b), tools.integrals_b(h, b, damp), rtol=0, atol=1.01 * table.max_error)
+            for h_i in [0, 1e-5, 0.7, 1, 1e5]:
+                assert table(h_i, b) == pytest.approx(tools.integrals_b(h_i, b, damp), rel=0, abs=1.01 * table.max_error)
+
+        with pytest.raises(ValueError):
+            table(h, 3)
+
+    def test_reuse(self, tmp_path):
+        table = FatigueDS.IntegralTable.cached(0.05)
+        assert FatigueDS.IntegralTable.cached(0.05) is table
+        assert table.matches(0.05) and not table.matches(0.04)
+
+        table.save(tmp_path / 'table.npz')
+        h = np.geomspace(1e-4, 1e4, 1000)
+        for restored in [FatigueDS.IntegralTable.load(tmp_path / 'table.npz'), pickle.loads(pickle.dumps(table))]:
+            np.testing.assert_array_equal(restored(h, 4), table(h, 4))
+
+    def test_backend(self):
+        assert backends.available('integrals_b')[-1] == 'table'
+        assert backends.selected('integrals_b') != 'table'
+
+        psd_freq = np.arange(0, 1001.)
+        psd_data = np.exp(-((psd_freq - 300) / 100)**2)
+        results = []
+        try:
+            for backend in ['numpy', 'table']:
+                backends.set_backend(backend, kernel='integrals_b')
+                sd = FatigueDS.SpecificationDevelopment(freq_data=(10, 500, 5), damp=0.05, progress_bar=False)
+                sd.set_random_load((psd_data, psd_freq), unit='g', T=3600)
+                sd.get_ers()
+                sd.get_fds(k=5, spectral_method='dirlik')
+                results.append((sd.ers, sd.fds))
+        finally:
+            backends.set_backend(None)
+
+        np.testing.assert_allclose(results[1][0], results[0][0], rtol=1e-8)
+        np.testing.assert_allclose(results[1][1], results[0][1], rtol=1e-8)
+
+    def test_rms_sum(self):
+        psd_freq = np.arange(0, 201.)
+        psd_data = np.ones_like(psd_freq)
+        f0_range = np.array([20., 50., 100.])
+        # scalar and vectorized natural frequencies
+        rms_sum = tools.rms_sum(f0_range, psd_freq, psd_data, 0.05, motion='rel_vel')
+        assert rms_sum.shape == (3,)
+        assert tools.rms_sum(50., psd_freq, psd_data, 0.05, motion='rel_vel') == pytest.approx(rms_sum[1], rel=1e-12)
+
+        with pytest.raises(ValueError):
+            tools.rms_sum(f0_range, psd_freq, psd_data, 0.05, motion='abs_acc')
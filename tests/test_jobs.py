@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import pytest
+import numpy as np
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import compute, jobs
+
+
+def random_time_load(N=20000, dt=1e-3, seed=0):
+    rng = np.random.default_rng(seed)
+    return compute.random_load((rng.normal(size=N), dt), unit='g')
+
+
+class TestJobs:
+    """ Testing the asynchronous job API """
+
+    def test_result_and_progress(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 10), progress_bar=False)
+        sd.set_random_load((np.random.default_rng(0).normal(size=20000), 1e-3), unit='g')
+        events = []
+        job = sd.submit_fds(k=5, chunk_size=4, progress=events.append)
+        fds = job.result()
+        sd.get_fds(k=5)
+
+        assert np.allclose(fds, sd.fds)
+        assert [event['completed'] for event in events] == [4, 8, 12, 16, 19]
+        assert all(event['total'] == 19 for event in events)
+        assert np.array_equal(np.concatenate([event['values'] for event in events]), fds)
+
+    def test_cancel(self):
+        load = random_time_load()
+        f0_range = np.arange(10, 410, 10, dtype=float)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            blocking = jobs.submit_ers(load, f0_range, 0.05, executor=executor, chunk_size=1,
+                                       progress=lambda event: event['job'].cancel() if event['completed'] == 3 else None)
+            queued = jobs.submit_ers(load, f0_range, 0.05, executor=executor)
+            queued.cancel()
+
+            with pytest.raises(CancelledError):
+                blocking.result()
+            with pytest.raises(CancelledError):
+                queued.result()
+        assert blocking.completed == 3
+        assert queued.completed == 0
+
+    def test_time_budget(self):
+        load = random_time_load()
+        f0_range = np.arange(10, 410, 10, dtype=float)
+        job = jobs.submit_fds(load, f0_range, 0.05, k=5, chunk_size=1, time_budget=0.1,
+                              progress=lambda event: time.sleep(0.05))
+        fds = job.result()
+
+        assert job.timed_out
+        assert 0 < job.completed < len(f0_range)
+        assert np.all(np.isfinite(fds[:job.completed]))
+        assert np.all(np.isnan(fds[job.completed:]))
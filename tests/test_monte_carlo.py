@@ -0,0 +1,64 @@
+import os
+import sys
+import pytest
+import numpy as np
+import pyExSi as es
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+
+
+class TestMonteCarlo:
+    """ Testing the Monte-Carlo scatter of ERS and FDS """
+
+    def test_spectrum_statistics(self):
+        rng = np.random.default_rng(0)
+        spectra = rng.lognormal(size=(500, 3))
+        spectra[:10, 0] = 0
+
+        stats = FatigueDS.SpectrumStatistics(n_f0=3, relative_accuracy=0.01)
+        for spectrum in spectra:
+            stats.update(spectrum)
+
+        assert np.allclose(stats.mean, np.mean(spectra, axis=0))
+        assert np.allclose(stats.var, np.var(spectra, axis=0, ddof=1))
+        q = [1, 5, 50, 95]
+        assert np.allclose(stats.percentile(q), np.percentile(spectra, q, axis=0, method='lower'), rtol=0.01)
+
+    def test_monte_carlo(self):
+        _psd_data = np.load('test_data/test_psd.npy', allow_pickle=True)
+        psd_freq = _psd_data[:,0]
+        psd_data = _psd_data[:,1]
+
+        sd_PSD = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20))
+        sd_PSD.set_random_load((psd_data, psd_freq), unit='g', T=2)
+        sd_PSD.get_ers()
+
+        results_serial = FatigueDS.monte_carlo(sd_PSD, n_realizations=6, fs=5120, k=5, seed=1, n_workers=1)
+        results_parallel = FatigueDS.monte_carlo(sd_PSD, n_realizations=6, fs=5120, k=5, seed=1, n_workers=2)
+
+        assert results_serial['ERS'].count == 6
+        assert np.allclose(results_serial['ERS'].mean, results_parallel['ERS'].mean)
+        assert np.allclose(results_serial['FDS'].percentile(50), results_parallel['FDS'].percentile(50))
+        assert np.allclose(results_serial['ERS'].mean[1:], sd_PSD.ers[1:], rtol=0.3)  # few cycles at the lowest natural frequency
+
+    def test_full_rate(self, capsys):
+        _psd_data = np.load('test_data/test_psd.npy', allow_pickle=True)
+        sd_PSD = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20), progress_bar=False)
+        sd_PSD.set_random_load((_psd_data[:,1], _psd_data[:,0]), unit='g', T=1)
+
+        results = FatigueDS.monte_carlo(sd_PSD, n_realizations=1, fs=5120, k=5, seed=2, n_workers=1, multirate=False, progress_bar=False)
+        assert capsys.readouterr().err == ''
+
+        # the same realization, calculated with the exact full-rate responses
+        freq = np.fft.rfftfreq(5120, d=1 / 5120)
+        psd = np.interp(freq, sd_PSD.psd_freq, sd_PSD.psd_data, left=0, right=0)
+        rg = np.random.default_rng(np.random.SeedSequence(2).spawn(1)[0])
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20), progress_bar=False)
+        sd.set_random_load((es.random_gaussian(5120, psd, 5120, rg=rg), 1 / 5120), unit='g')
+        sd.get_ers()
+        sd.get_fds(k=5)
+        np.testing.assert_allclose(results['ERS'].max, sd.ers, rtol=1e-10)
+        np.testing.assert_allclose(results['FDS'].max, sd.fds, rtol=1e-10)
@@ -0,0 +1,58 @@
+import os
+import sys
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import planner
+
+
+class TestPlanner:
+    """ Testing the cost model and the selection of the calculation path """
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 400, 20), Q=10, progress_bar=False)
+        self.sd.set_random_load((rng.normal(size=50000), 1e-3), unit='g')
+
+    def test_selection(self):
+        plan = self.sd.plan('FDS', k=5)
+        assert plan.selected.method == 'convolution'
+        assert {e.method for e in plan.estimates} == {'convolution', 'multirate', 'psd_averaging'}
+        assert 'convolution' in plan.dry_run()
+
+        plan = self.sd.plan('FDS', k=5, tol=0.5)
+        assert plan.selected.method == 'psd_averaging'
+        assert plan.selected.time < plan.estimates[0].time
+        assert np.all(plan.run() > 0)
+
+    def test_memory_budget(self):
+        self.sd.get_ers()
+        self.sd.get_fds(k=5)
+
+        convolution = self.sd.plan('FDS', k=5).selected
+        plan = self.sd.plan('FDS', k=5, memory_budget=convolution.memory / 2)
+        assert plan.selected.method == 'tiled' and plan.selected.memory <= convolution.memory / 2
+        np.testing.assert_allclose(plan.run(), self.sd.fds, rtol=1e-10)
+        np.testing.assert_allclose(self.sd.plan('ERS', memory_budget=convolution.memory / 2).run(), self.sd.ers, rtol=1e-10)
+
+        plan = self.sd.plan('ERS', memory_budget=100)
+        assert plan.selected is None
+        with pytest.raises(MemoryError):
+            plan.run()
+
+    def test_sine_sweep(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20), progress_bar=False)
+        sd.set_sine_sweep_load(const_amp=[5, 10], const_f_range=[20, 100, 500], sweep_type='log', sweep_rate=1, dt=0.01)
+        plan = sd.plan('FDS', k=5)
+        assert plan.selected.method == 'sweep_grid'
+        assert plan.selected.options['n_grid'] == int(np.ceil(60 * np.log(25) / np.log(2) / 0.01))
+        sd.get_fds(k=5)
+        np.testing.assert_allclose(plan.run(), sd.fds)
+        assert sd.plan('FDS', k=5, memory_budget=1000).selected is None
+
+        with pytest.raises(ValueError):
+            sd.plan('FDS')
@@ -0,0 +1,62 @@
+import os
+import sys
+import pytest
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import plotting
+
+
+class TestPlotting:
+    """ Testing the plotting of spectrum collections """
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.f0_range = np.linspace(10, 2000, 20000)
+        self.spectra = np.abs(rng.normal(size=(50, 1))) * (1 + rng.normal(size=(50, 20000))**2)
+
+    def test_decimate_minmax(self):
+        f0, y = plotting.decimate_minmax(self.f0_range, self.spectra, max_points=1000)
+        assert y.shape[0] == 50 and y.shape[1] <= 1000
+        assert np.all(np.diff(f0, axis=1) >= 0)
+        np.testing.assert_allclose(y.max(axis=1), self.spectra.max(axis=1))
+        np.testing.assert_allclose(y.min(axis=1), self.spectra.min(axis=1))
+        assert f0[0, 0] == self.f0_range[0] and f0[0, -1] == self.f0_range[-1]
+
+        f0, y = plotting.decimate_minmax(self.f0_range[:100], self.spectra[0, :100], max_points=1000)
+        assert np.array_equal(y, self.spectra[0, :100])
+
+    def test_plot_spectra(self):
+        n_figures = len(plt.get_fignums())
+        lines = plotting.plot_spectra(self.f0_range, self.spectra, output='FDS', yscale='log', colors='k')
+        assert len(lines.get_segments()) == 50 and len(lines.get_segments()[0]) <= 2000
+        assert lines.axes.get_yscale() == 'log'
+        assert len(plt.get_fignums()) == n_figures  # not managed by pyplot
+
+    def test_percentile_bands(self):
+        fig, ax = plt.subplots()
+        polygons, line = plotting.plot_percentile_bands(self.f0_range, self.spectra, ax=ax, max_points=1000, label='median')
+        assert len(polygons) == 2 and line.axes is ax
+        assert ax.get_ylim()[1] >= np.percentile(self.spectra, 95, axis=0).max()
+
+        statistics = FatigueDS.SpectrumStatistics(len(self.f0_range))
+        for spectrum in self.spectra:
+            statistics.update(spectrum)
+        polygons, line = plotting.plot_percentile_bands(self.f0_range, statistics, ax=ax, median=False)
+        assert line is None
+        plt.close(fig)
+
+    def test_plot_ers_axes(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(10, 200, 10), progress_bar=False)
+        sd.set_sine_load(sine_freq=50, amp=1)
+        sd.get_ers()
+        fig, ax = plt.subplots()
+        sd.plot_ers(ax=ax, label='sine')
+        assert len(ax.lines) == 1
+        plt.close(fig)
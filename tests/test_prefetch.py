@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import threading
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+from FatigueDS import prefetch
+from FatigueDS.prefetch import Prefetcher
+
+
+class TestPrefetch:
+    """ Testing the background reading of records """
+
+    def test_read_array(self, tmp_path):
+        data = np.random.default_rng(0).normal(size=10001)
+        np.save(tmp_path / 'data.npy', data)
+        np.testing.assert_array_equal(prefetch.read_array(tmp_path / 'data.npy', chunk_bytes=800), data)
+
+        raw = np.arange(-500, 500, dtype=np.int16)
+        raw.tofile(tmp_path / 'data.bin')
+        read = prefetch.read_array(tmp_path / 'data.bin', dtype='int16', chunk_bytes=100)
+        assert read.dtype == np.int16 and not isinstance(read, np.memmap)
+        np.testing.assert_array_equal(read, raw)
+        with pytest.raises(ValueError):
+            prefetch.read_array(tmp_path / 'data.bin')
+
+    def test_order_and_counters(self):
+        with Prefetcher(range(10), lambda i: np.full(100, i), depth=3) as records:
+            for i, (item, data) in enumerate(records):
+                assert item == i and np.all(data == i)
+        assert records.records == 10
+        assert records.nbytes == 10 * 800
+        assert 0 <= records.overlap <= 1
+
+    def test_backpressure(self):
+        read_items = []
+
+        def read(i):
+            read_items.append(i)
+            return i
+
+        records = Prefetcher(range(100), read, depth=2)
+        next(records)
+        time.sleep(0.2)
+        # one record consumed, two in the queue and one waiting for free space
+        assert len(read_items) == 4
+        assert records.blocked_time > 0
+        records.close()
+        assert not records._thread.is_alive()
+        with pytest.raises(StopIteration):
+            next(records)
+
+    def test_overlap(self):
+        # reading takes as long as processing, so only the first record is waited for
+        with Prefetcher(range(5), lambda i: time.sleep(0.05) or i, depth=1) as records:
+            for _ in records:
+                time.sleep(0.1)
+        assert records.overlap > 0.6
+        assert records.stats()['records'] == 5
+
+    def test_errors(self):
+        def read(i):
+            if i == 2:
+                raise OSError('unreadable')
+            return i
+
+        records = Prefetcher(range(5), read)
+        assert [next(records), next(records)] == [(0, 0), (1, 1)]
+        with pytest.raises(OSError):
+            next(records)
+        assert not records._thread.is_alive()
+
+        with pytest.raises(ValueError):
+            Prefetcher(range(5), read, depth=0)
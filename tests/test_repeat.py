@@ -0,0 +1,73 @@
+import os
+import sys
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import tools, work_units
+
+
+class TestRepeat:
+    """ Testing the damage extrapolation of repeated time histories """
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.dt = 1e-3
+        self.time_data = rng.normal(size=3000)
+
+    def spectra(self, time_data, **kwargs):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(5, 200, 5), damp=0.05, progress_bar=False)
+        sd.set_random_load((time_data, self.dt), unit='g', **kwargs)
+        sd.get_ers()
+        sd.get_fds(k=5)
+        return sd.ers, sd.fds
+
+    @pytest.mark.parametrize('repeat', [2, 3, 25])
+    def test_convolution(self, repeat):
+        # low natural frequencies need more than one repetition to reach the steady state
+        ers, fds = self.spectra(np.tile(self.time_data, repeat))
+        ers_repeat, fds_repeat = self.spectra(self.time_data, repeat=repeat)
+        np.testing.assert_allclose(ers_repeat, ers, rtol=1e-10)
+        np.testing.assert_allclose(fds_repeat, fds, rtol=1e-10)
+
+    def test_raw_data(self):
+        counts = np.round(self.time_data * 1000).astype(np.int16)
+        ers, fds = self.spectra(np.tile(counts, 10), scale=1e-3, offset=0.1)
+        ers_repeat, fds_repeat = self.spectra(counts, scale=1e-3, offset=0.1, repeat=10)
+        np.testing.assert_allclose(ers_repeat, ers, rtol=1e-10)
+        np.testing.assert_allclose(fds_repeat, fds, rtol=1e-10)
+
+    def test_extrapolation(self):
+        # the damage of every steady-state repetition is the same
+        fds = [self.spectra(self.time_data, repeat=repeat)[1] for repeat in [10**3, 2 * 10**3, 3 * 10**3, 10**9]]
+        np.testing.assert_allclose(fds[2] - fds[1], fds[1] - fds[0], rtol=1e-8)
+        np.testing.assert_allclose(fds[3], fds[0] + (10**9 - 10**3) / 10**3 * (fds[1] - fds[0]), rtol=1e-8)
+
+    def test_rainflow_damage(self):
+        rng = np.random.default_rng(1)
+        for _ in range(20):
+            transient = tools.turning_points(rng.normal(size=50) * rng.uniform(0.5, 3))
+            steady = tools.turning_points(rng.normal(size=40))
+            for n_steady in [0, 1, 5]:
+                z = tools.turning_points(np.concatenate([transient] + [steady] * n_steady))
+                assert tools.repeated_rainflow_damage(transient, steady, n_steady, 3) == pytest.approx(tools.rainflow_damage(z, 3), rel=1e-12)
+
+    def test_psd_averaging(self):
+        ers, fds = self.spectra(self.time_data, method='psd_averaging', bins=10)
+        ers_repeat, fds_repeat = self.spectra(self.time_data, method='psd_averaging', bins=10, repeat=4)
+        np.testing.assert_allclose(fds_repeat, 4 * fds, rtol=1e-12)
+        assert np.all(ers_repeat > ers)
+
+    def test_invalid(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(5, 200, 5), damp=0.05, progress_bar=False)
+        with pytest.raises(ValueError):
+            sd.set_random_load((self.time_data, self.dt), repeat=0)
+        with pytest.raises(ValueError):
+            sd.set_random_load((self.time_data, self.dt), repeat=2, multirate=True)
+
+        sd.set_random_load((self.time_data, self.dt), repeat=2)
+        with pytest.raises(ValueError):
+            work_units.split(sd.load, sd.f0_range, sd.damp, k=5)
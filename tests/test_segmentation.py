@@ -0,0 +1,83 @@
+import os
+import sys
+import pytest
+import numpy as np
+from scipy import signal
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import tools
+
+
+fs = 2000
+
+
+def colored_noise(rng, n, f_low, f_high, rms):
+    b, a = signal.butter(4, [f_low, f_high], btype='band', fs=fs)
+    x = signal.lfilter(b, a, rng.normal(size=n))
+    return x / np.std(x) * rms
+
+
+class TestSegmentation:
+    """ Testing the segmented PSD method for piecewise stationary time histories """
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.bounds = [0, 60000, 150000, 200000]
+        self.time_data = np.concatenate((colored_noise(rng, 60000, 20, 200, 0.5),
+                                         colored_noise(rng, 90000, 50, 400, 3),
+                                         colored_noise(rng, 50000, 100, 300, 1.5)))
+        self.stationary = colored_noise(rng, 200000, 30, 300, 1)
+
+    def test_stationary_segments(self):
+        np.testing.assert_array_equal(tools.stationary_segments(self.time_data, 400), self.bounds)
+        np.testing.assert_array_equal(tools.stationary_segments(self.stationary, 400), [0, 200000])
+        # the signal is read block by block
+        features = tools.window_features(self.time_data, 400)
+        np.testing.assert_allclose(tools.window_features(self.time_data, 400, block_size=1000), features)
+        assert features.shape[0] == 500 and 1 < features.shape[1] <= 8
+
+    def test_change_points(self):
+        rng = np.random.default_rng(1)
+        features = rng.normal(size=(100, 2))
+        assert tools.change_points(features) == []
+        features[40:] += 3
+        assert tools.change_points(features) == [40]
+        assert tools.change_points(features[:5]) == []
+
+    def test_segmented(self):
+        results = {}
+        for method in ['convolution', 'psd_averaging', 'segmented']:
+            sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 300, 20), Q=10, progress_bar=False)
+            sd.set_random_load((self.time_data, 1 / fs), method=method, bins=None if method == 'convolution' else 500)
+            sd.get_ers()
+            sd.get_fds(k=5)
+            results[method] = sd.ers, sd.fds
+
+        segments = tools.segmented_psd(sd.load)
+        assert len(segments) == 3
+        np.testing.assert_allclose([T for T, _, _ in segments], np.diff(self.bounds) / fs)
+        assert tools.segmented_psd(sd.load) is segments  # cached
+
+        ers, fds = results['convolution']
+        error = {method: np.median(np.abs(np.log(results[method][1] / fds))) for method in ['psd_averaging', 'segmented']}
+        assert error['segmented'] < 0.5 * error['psd_averaging']
+        np.testing.assert_allclose(results['segmented'][0], ers, rtol=0.3)
+
+    def test_stationary(self):
+        # a stationary record is a single segment, the result equals the PSD averaging method
+        results = []
+        for method in ['psd_averaging', 'segmented']:
+            sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 300, 20), Q=10, progress_bar=False)
+            sd.set_random_load((self.stationary, 1 / fs), method=method, bins=500)
+            sd.get_fds(k=5)
+            results.append(sd.fds)
+        np.testing.assert_allclose(results[1], results[0], rtol=1e-10)
+
+    def test_bins_required(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 300, 20), Q=10, progress_bar=False)
+        with pytest.raises(ValueError):
+            sd.set_random_load((self.time_data, 1 / fs), method='segmented')
+            sd.get_ers()
@@ -0,0 +1,82 @@
+import os
+import sys
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+
+
+class TestSensitivity:
+    """ Testing the derivatives of the ERS and FDS with respect to the PSD values """
+
+    def setup_method(self):
+        self.psd_freq = np.arange(0, 501.)
+        self.psd_data = np.exp(-((self.psd_freq - 200) / 80)**2) + 0.05
+
+    def spectrum(self, psd_data, output, **kwargs):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 400, 20), damp=0.05, progress_bar=False)
+        sd.set_random_load((psd_data, self.psd_freq), unit='g', T=3600)
+        if output == 'ERS':
+            sensitivity = sd.get_ers(**kwargs)
+            return sd.ers, sensitivity
+        sensitivity = sd.get_fds(k=5, C=1e10, p=2, **kwargs)
+        return sd.fds, sensitivity
+
+    @pytest.mark.parametrize('output, spectral_method', [('ERS', None), ('FDS', 'narrowband'), ('FDS', 'dirlik'),
+                                                         ('FDS', 'tovo_benasciutti'), ('FDS', 'zhao_baker')])
+    def test_finite_differences(self, output, spectral_method):
+        kwargs = {} if spectral_method is None else {'spectral_method': spectral_method}
+        spectrum, sensitivity = self.spectrum(self.psd_data, output, sensitivity=True, **kwargs)
+        assert sensitivity.shape == (20, len(self.psd_freq))
+        np.testing.assert_allclose(spectrum, self.spectrum(self.psd_data, output, **kwargs)[0], rtol=1e-12)
+
+        for j in [0, 50, 150, 200, 260, 500]:
+            step = 1e-3 * self.psd_data[j]
+            psd_plus, psd_minus = self.psd_data.copy(), self.psd_data.copy()
+            psd_plus[j] += step
+            psd_minus[j] -= step
+            derivative = (self.spectrum(psd_plus, output, **kwargs)[0] - self.spectrum(psd_minus, output, **kwargs)[0]) / (2 * step)
+            np.testing.assert_allclose(sensitivity[:, j], derivative, rtol=1e-6, atol=1e-7 * np.max(np.abs(derivative)))
+
+    def test_linearization(self):
+        # first-order prediction of the FDS of a scaled PSD
+        fds, sensitivity = self.spectrum(self.psd_data, 'FDS', sensitivity=True)
+        fds_scaled, _ = self.spectrum(self.psd_data * 1.001, 'FDS', sensitivity=True)
+        np.testing.assert_allclose(fds + sensitivity @ (0.001 * self.psd_data), fds_scaled, rtol=1e-5)
+
+    def test_invalid(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 400, 20), damp=0.05, progress_bar=False)
+        sd.set_random_load((self.psd_data, self.psd_freq), unit='g', T=3600)
+        with pytest.raises(ValueError):
+            sd.get_ers(adaptive=True, sensitivity=True)
+
+        sd.set_random_load((np.random.default_rng(0).normal(size=5000), 1e-3))
+        with pytest.raises(ValueError):
+            sd.get_ers(sensitivity=True)
+        with pytest.raises(ValueError):
+            sd.get_fds(k=5, sensitivity=True)
+
+    def test_frequency_changes(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 400, 20), damp=0.05, progress_bar=False)
+        sd.set_random_load((self.psd_data, self.psd_freq), unit='g', T=3600)
+        sd.get_ers(sensitivity=True)
+        sd.get_fds(k=5, sensitivity=True)
+
+        # rows of the added frequencies are merged as the spectra
+        sd.add_frequencies((30, 410, 20))
+        sd_full = FatigueDS.SpecificationDevelopment(freq_data=sd.f0_range, damp=0.05, progress_bar=False)
+        sd_full.set_random_load((self.psd_data, self.psd_freq), unit='g', T=3600)
+        np.testing.assert_allclose(sd.ers_sensitivity, sd_full.get_ers(sensitivity=True), rtol=1e-12)
+        np.testing.assert_allclose(sd.fds_sensitivity, sd_full.get_fds(k=5, sensitivity=True), rtol=1e-12)
+
+        # recalculated spectra without sensitivities
+        sd.get_fds(k=6)
+        assert not hasattr(sd, 'fds_sensitivity')
+        assert sd.ers_sensitivity.shape == (len(sd.f0_range), len(self.psd_freq))
+
+        sd.get_fds(k=5, sensitivity=True)
+        sd.get_ers(adaptive=True)
+        assert not hasattr(sd, 'ers_sensitivity') and not hasattr(sd, 'fds_sensitivity')
@@ -0,0 +1,113 @@
+import io
+import os
+import sys
+import json
+import time
+import urllib.request
+import urllib.error
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS.service import SpectrumService
+
+
+def request(url, data=None, method=None, content_type='application/json'):
+    if isinstance(data, dict):
+        data = json.dumps(data).encode()
+    req = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': content_type})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def upload(url, array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    status, body = request(url + '/arrays', buffer.getvalue(), content_type='application/octet-stream')
+    assert status == 201
+    return json.loads(body)['id']
+
+
+def wait_result(url, job_id):
+    for _ in range(600):
+        status = json.loads(request(f'{url}/jobs/{job_id}')[1])['status']
+        if status not in ['queued', 'running']:
+            break
+        time.sleep(0.05)
+    return request(f'{url}/jobs/{job_id}/result')
+
+
+class TestService:
+    """ Testing the HTTP service on localhost """
+
+    def test_random_time(self):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=5000)
+
+        with SpectrumService(n_workers=1) as service:
+            array_id = upload(service.url, x)
+            assert upload(service.url, x) == array_id
+
+            job = {'f0': [20, 200, 20], 'Q': 10, 'fds': {'k': 5},
+                   'load': {'type': 'random_time', 'time_data': {'array': array_id}, 'dt': 0.001, 'unit': 'g'}}
+            status, body = request(service.url + '/jobs', job)
+            assert status == 202
+            status, result = wait_result(service.url, json.loads(body)['id'])
+            assert status == 200
+
+            # identical request is answered from the result cache
+            status, body = request(service.url + '/jobs', job)
+            assert json.loads(body)['status'] == 'done'
+            assert request(f"{service.url}/jobs/{json.loads(body)['id']}/result")[1] == result
+
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 200, 20), Q=10, progress_bar=False)
+        sd.set_random_load((x, 0.001), unit='g')
+        sd.get_ers()
+        sd.get_fds(k=5)
+        with np.load(io.BytesIO(result)) as data:
+            np.testing.assert_allclose(data['f0_range'], sd.f0_range)
+            np.testing.assert_allclose(data['ers'], sd.ers)
+            np.testing.assert_allclose(data['fds'], sd.fds)
+
+    def test_errors(self):
+        with SpectrumService(n_workers=1, max_queue=0) as service:
+            assert request(service.url + '/health')[0] == 200
+            assert request(service.url + '/jobs/unknown')[0] == 404
+            assert request(service.url + '/jobs', {'f0': [20, 200, 20], 'load': {'type': 'unknown'}})[0] == 400
+
+            job = {'f0': [20, 200, 20], 'load': {'type': 'random_time', 'time_data': {'array': 'missing'}, 'dt': 0.001}}
+            service.max_queue = 1
+            assert request(service.url + '/jobs', job)[0] == 400
+
+            job = {'f0': [20, 200, 20], 'load': {'type': 'sine', 'sine_freq': 100, 'amp': 1}}
+            service.max_queue = 0
+            assert request(service.url + '/jobs', job)[0] == 503
+
+            service.max_queue = 1
+            status, body = request(service.url + '/jobs', dict(job, load={'type': 'sine', 'sine_freq': 100}))
+            status, body = wait_result(service.url, json.loads(body)['id'])
+            assert status == 409 and json.loads(body)['status'] == 'failed'
+
+    def test_limits(self):
+        with SpectrumService(n_workers=1, max_array_bytes=10000, max_jobs=3) as service:
+            buffer = io.BytesIO()
+            np.save(buffer, np.zeros(2000))
+            status, body = request(service.url + '/arrays', buffer.getvalue(), content_type='application/octet-stream')
+            assert status == 413
+            assert len(service.arrays) == 0
+
+            # only the most recent finished jobs are kept
+            job_ids = []
+            for sine_freq in [50, 100, 150, 200, 250]:
+                job = {'f0': [20, 200, 20], 'load': {'type': 'sine', 'sine_freq': sine_freq, 'amp': 1}}
+                job_ids.append(json.loads(request(service.url + '/jobs', job)[1])['id'])
+                assert wait_result(service.url, job_ids[-1])[0] == 200
+            assert list(service.jobs) == job_ids[-3:]
+            assert all(job['future'] is None for job in service.jobs.values())
+            assert request(f'{service.url}/jobs/{job_ids[0]}')[0] == 404
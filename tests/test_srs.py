@@ -0,0 +1,71 @@
+import os
+import sys
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import compute, tools
+
+
+class TestSRS:
+    """ Testing the shock response spectrum of sets of transient events """
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        t = np.arange(1000) * 1e-4
+        self.events = np.array([a * np.sin(2 * np.pi * f * t) * np.exp(-50 * t) for a, f in zip(rng.uniform(1, 10, 20), rng.uniform(100, 2000, 20))])
+        self.sd = FatigueDS.SpecificationDevelopment(freq_data=(100, 3000, 100), Q=10, progress_bar=False)
+        self.sd.set_shock_load(self.events, 1e-4, unit='g')
+        self.sd.get_srs()
+
+    def test_reference(self):
+        assert set(self.sd.srs) == set(compute.SRS_TYPES)
+        assert all(srs.shape == (20, len(self.sd.f0_range)) for srs in self.sd.srs.values())
+
+        for j in [0, 13]:
+            # residual response: zero input after the event
+            x = np.concatenate((self.events[j], np.zeros(5000)))
+            # equivalent acceleration -omega_0**2 * z
+            omega_0_2 = (2 * np.pi * self.sd.f0_range)**2
+            z = [tools.response_relative_displacement(x, 1e-4, f_0, self.sd.damp) for f_0 in self.sd.f0_range]
+            np.testing.assert_allclose(self.sd.srs['primary_positive'][j], [-np.min(z_i[:1000]) for z_i in z] * omega_0_2, rtol=1e-9)
+            np.testing.assert_allclose(self.sd.srs['primary_negative'][j], [np.max(z_i[:1000]) for z_i in z] * omega_0_2, rtol=1e-9)
+            np.testing.assert_allclose(self.sd.srs['residual_positive'][j], [-np.min(z_i[1000:]) for z_i in z] * omega_0_2, rtol=1e-9)
+            np.testing.assert_allclose(self.sd.srs['residual_negative'][j], [np.max(z_i[1000:]) for z_i in z] * omega_0_2, rtol=1e-9)
+
+        np.testing.assert_allclose(self.sd.srs['maximax'], np.max([self.sd.srs[name] for name in compute.SRS_TYPES[:4]], axis=0))
+
+    def test_half_sine(self):
+        # positive 100 g, 1 ms half-sine: the primary SRS peaks at about 1.7 times the amplitude near f0 * T = 0.8
+        dt, duration = 1e-6, 1e-3
+        t = np.arange(int(round(duration / dt)) + 1) * dt
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(100, 5000, 20), Q=10, progress_bar=False)
+        sd.set_shock_load(100 * np.sin(np.pi * t / duration), dt)
+        sd.get_srs()
+
+        primary_positive = sd.srs['primary_positive'][0]
+        assert 160 < np.max(primary_positive) < 180
+        assert 600 < sd.f0_range[np.argmax(primary_positive)] < 1000
+        # no negative response during the pulse below f0 * T = 1, only small oscillations above
+        primary_negative = sd.srs['primary_negative'][0]
+        assert np.max(primary_negative[sd.f0_range * duration <= 1]) < 1e-6 * np.max(primary_positive)
+        assert np.max(primary_negative) < 0.2 * np.max(primary_positive)
+        assert np.all(sd.srs['residual_positive'][0] > 0)
+
+    def test_single_event(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(100, 3000, 100), Q=10, dtype=np.float32, progress_bar=False)
+        sd.set_shock_load(self.events[3].astype(np.float32), 1e-4)
+        sd.get_srs()
+        assert sd.srs['maximax'].shape == (1, len(sd.f0_range))
+        np.testing.assert_allclose(sd.srs['maximax'][0], self.sd.srs['maximax'][3], rtol=1e-4)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            self.sd.get_ers()
+        with pytest.raises(ValueError):
+            self.sd.set_shock_load(self.events, None)
+        with pytest.raises(ValueError):
+            self.sd.set_shock_load(self.events[None], 1e-4)
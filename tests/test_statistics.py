@@ -0,0 +1,53 @@
+import os
+import sys
+import pickle
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+
+
+class TestSpectrumStatistics:
+    """ Testing the streaming envelope and aggregation of spectra """
+
+    def test_envelope(self):
+        rng = np.random.default_rng(0)
+        spectra = rng.lognormal(size=(200, 4))
+
+        stats = FatigueDS.SpectrumStatistics(n_f0=4)
+        for spectrum in spectra:
+            stats.update(spectrum)
+
+        assert np.array_equal(stats.max, np.max(spectra, axis=0))
+        assert np.array_equal(stats.min, np.min(spectra, axis=0))
+        assert np.allclose(stats.sum, np.sum(spectra, axis=0))
+        with pytest.raises(ValueError):
+            stats.update(spectra[0, :3])
+
+    def test_merge(self):
+        rng = np.random.default_rng(0)
+        spectra = rng.lognormal(size=(300, 4))
+        spectra[:5, 1] = 0
+
+        stats = FatigueDS.SpectrumStatistics(n_f0=4)
+        parts = [FatigueDS.SpectrumStatistics(n_f0=4) for _ in range(3)]
+        for i, spectrum in enumerate(spectra):
+            stats.update(spectrum)
+            parts[i % 3].update(spectrum)
+
+        merged = FatigueDS.SpectrumStatistics(n_f0=4)
+        for part in parts:
+            merged.merge(pickle.loads(pickle.dumps(part)))  # e.g. from a worker process
+
+        assert merged.count == stats.count
+        assert np.allclose(merged.mean, stats.mean)
+        assert np.allclose(merged.var, stats.var)
+        assert np.array_equal(merged.max, stats.max)
+        assert np.allclose(merged.sum, stats.sum)
+        assert np.array_equal(merged.percentile([5, 50, 95]), stats.percentile([5, 50, 95]))
+
+        with pytest.raises(ValueError):
+            merged.merge(FatigueDS.SpectrumStatistics(n_f0=3))
@@ -0,0 +1,50 @@
+import os
+import sys
+import pytest
+import numpy as np
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import FatigueDS
+from FatigueDS import work_units
+
+
+class TestWorkUnits:
+    """ Testing the split, calculation and merge of work units """
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.time_data = rng.normal(size=20000)
+        self.sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 400, 20), Q=10, progress_bar=False)
+        self.sd.set_random_load((self.time_data, 1e-3), unit='g')
+        self.sd.get_ers()
+        self.sd.get_fds(k=5, C=2, p=3)
+
+    def test_merge(self):
+        units = work_units.split(self.sd.load, self.sd.f0_range, self.sd.damp, k=5, C=2, p=3, n_f0=3, n_segments=4)
+        assert len(units) == 12
+        f0_range, ers, fds = work_units.merge([work_units.run_unit(unit) for unit in units[::-1]])
+
+        assert np.array_equal(f0_range, self.sd.f0_range)
+        np.testing.assert_allclose(ers, self.sd.ers, rtol=1e-10)
+        np.testing.assert_allclose(fds, self.sd.fds, rtol=1e-10)
+
+        with pytest.raises(ValueError):
+            work_units.merge([work_units.run_unit(unit) for unit in units[1:]])
+
+    def test_files(self, tmp_path):
+        units = work_units.split(self.sd.load, self.sd.f0_range, self.sd.damp, n_f0=2, n_segments=3)
+        work_units.export(units, tmp_path / 'units')
+        results = work_units.run_local(str(tmp_path / 'units'), tmp_path / 'results', max_workers=2)
+        assert len(results) == 6
+
+        f0_range, ers, fds = work_units.merge(results)
+        assert fds is None
+        np.testing.assert_allclose(ers, self.sd.ers, rtol=1e-10)
+
+    def test_invalid(self):
+        sd = FatigueDS.SpecificationDevelopment(freq_data=(20, 400, 20), progress_bar=False)
+        sd.set_random_load((self.time_data, 1e-3), multirate=True)
+        with pytest.raises(ValueError):
+            work_units.split(sd.load, sd.f0_range, sd.damp)